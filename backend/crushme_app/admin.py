@@ -9,13 +9,14 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django_attachments.admin import AttachmentsAdminMixin
 from .forms.product import ProductForm
+from .utils.margin_index import on_margins_changed
 
 # Import all models
 from .models import (
     User, PasswordCode, UserAddress, UserGallery, UserLink, GuestUser,
     Product, Cart, CartItem, 
     Order, OrderItem, WishList, WishListItem, FavoriteWishList,
-    Review, Feed, FavoriteProduct, DiscountCode,
+    Review, Feed, FavoriteProduct, DiscountCode, BulkEmailDispatch,
     WooCommerceCategory, WooCommerceProduct, WooCommerceProductImage,
     WooCommerceProductVariation, ProductSyncLog,
     TranslatedContent, CategoryPriceMargin, DefaultPriceMargin
@@ -428,7 +429,7 @@ class OrderAdmin(admin.ModelAdmin):
         'order_number', 'user_email', 'status_display', 
         'total_display', 'total_items_display', 'created_at'
     )
-    list_filter = ('status', 'created_at', 'shipped_at', 'delivered_at')
+    list_filter = ('status', 'post_payment_status', 'created_at', 'shipped_at', 'delivered_at')
     search_fields = ('order_number', 'user__email', 'shipping_address')
     readonly_fields = (
         'order_number', 'created_at', 'updated_at', 
@@ -491,6 +492,39 @@ class OrderAdmin(admin.ModelAdmin):
         """Display total items count"""
         return obj.total_items
     total_items_display.short_description = 'Items'
+    
+    def changelist_view(self, request, extra_context=None):
+        """
+        Add an order summary (from the hourly rollups) above the changelist
+        Honors the created_at date filter range
+        """
+        from datetime import datetime, time
+        from django.utils import timezone
+        from django.utils.dateparse import parse_date, parse_datetime
+        from .utils.order_stats import ensure_order_stats_rollups, get_order_stats
+        
+        def parse_bound(value):
+            if not value:
+                return None
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                parsed = datetime.combine(day, time.min) if day else None
+            if parsed is not None and timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            return parsed
+        
+        extra_context = extra_context or {}
+        try:
+            ensure_order_stats_rollups()
+            extra_context['order_summary'] = get_order_stats(
+                start=parse_bound(request.GET.get('created_at__gte')),
+                end=parse_bound(request.GET.get('created_at__lt'))
+            )
+        except ValueError:
+            # Malformed date filter: show the changelist without the summary
+            pass
+        return super().changelist_view(request, extra_context=extra_context)
 
 
 # ===========================
@@ -1024,6 +1058,25 @@ class ProductSyncLogAdmin(admin.ModelAdmin):
     duration_display.admin_order_field = 'duration_seconds'
 
 
+@admin.register(BulkEmailDispatch)
+class BulkEmailDispatchAdmin(admin.ModelAdmin):
+    """Admin for bulk email dispatches (sent with the send_bulk_email command)"""
+    list_display = (
+        'name', 'audience', 'lang', 'status', 'sent', 'failed',
+        'last_recipient_id', 'started_at', 'finished_at'
+    )
+    list_filter = ('audience', 'status', 'lang', 'started_at')
+    search_fields = ('name',)
+    readonly_fields = (
+        'name', 'audience', 'lang', 'status', 'last_recipient_id',
+        'sent', 'failed', 'started_at', 'updated_at', 'finished_at'
+    )
+    ordering = ('-started_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+
 # ===========================
 # TRANSLATION & PRICE MODELS ADMIN
 # ===========================
@@ -1134,30 +1187,35 @@ class CategoryPriceMarginAdmin(admin.ModelAdmin):
     def activate_margins(self, request, queryset):
         """Activate selected margins"""
         updated = queryset.update(is_active=True)
+        on_margins_changed()  # queryset.update() skips post_save signals
         self.message_user(request, f'{updated} margins activated successfully.')
     activate_margins.short_description = 'Activate selected margins'
     
     def deactivate_margins(self, request, queryset):
         """Deactivate selected margins"""
         updated = queryset.update(is_active=False)
+        on_margins_changed()  # queryset.update() skips post_save signals
         self.message_user(request, f'{updated} margins deactivated successfully.')
     deactivate_margins.short_description = 'Deactivate selected margins'
     
     def apply_20_percent(self, request, queryset):
         """Apply 20 percent margin to selected categories"""
         updated = queryset.update(margin_percentage=20, use_fixed_multiplier=False, is_active=True)
+        on_margins_changed()  # queryset.update() skips post_save signals
         self.message_user(request, f'20% margin applied to {updated} categories.')
     apply_20_percent.short_description = 'Apply 20 percent margin'
     
     def apply_30_percent(self, request, queryset):
         """Apply 30 percent margin to selected categories"""
         updated = queryset.update(margin_percentage=30, use_fixed_multiplier=False, is_active=True)
+        on_margins_changed()  # queryset.update() skips post_save signals
         self.message_user(request, f'30% margin applied to {updated} categories.')
     apply_30_percent.short_description = 'Apply 30 percent margin'
     
     def apply_40_percent(self, request, queryset):
         """Apply 40 percent margin to selected categories"""
         updated = queryset.update(margin_percentage=40, use_fixed_multiplier=False, is_active=True)
+        on_margins_changed()  # queryset.update() skips post_save signals
         self.message_user(request, f'40% margin applied to {updated} categories.')
     apply_40_percent.short_description = 'Apply 40 percent margin'
 
@@ -1385,6 +1443,7 @@ admin_site.register(WooCommerceCategory, WooCommerceCategoryAdmin)
 admin_site.register(WooCommerceProduct, WooCommerceProductAdmin)
 admin_site.register(WooCommerceProductVariation, WooCommerceProductVariationAdmin)
 admin_site.register(ProductSyncLog, ProductSyncLogAdmin)
+admin_site.register(BulkEmailDispatch, BulkEmailDispatchAdmin)
 admin_site.register(TranslatedContent, TranslatedContentAdmin)
 
 # Price Margin models (IMPORTANT!)
@@ -7,3 +7,4 @@ class CrushmeAppConfig(AppConfig):
 
     def ready(self):
         import crushme_project.tasks  # noqa: F401 — Huey periodic task discovery
+        from . import signals  # noqa: F401 — register signal handlers
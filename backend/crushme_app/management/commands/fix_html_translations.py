@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from crushme_app.models import TranslatedContent
 from crushme_app.utils.html_helpers import clean_malformed_html_translation
+from crushme_app.utils.catalog_cache import bump_catalog_generation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -112,6 +113,9 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write(self.style.WARNING('\n   DRY RUN - No changes were made'))
             self.stdout.write('   Run without --dry-run to apply changes')
+        elif stats['fixed'] or stats['retranslated']:
+            # Cached catalog responses must pick up the fixed translations
+            bump_catalog_generation()
     
     @transaction.atomic
     def _retranslate(self, trans):
@@ -126,7 +130,7 @@ class Command(BaseCommand):
             return
         
         # Re-translate
-        translator = TranslationService(target_language=trans.target_language)
+        translator = TranslationService(target_language=trans.target_language, use_memory=False)
         new_translation = translator.translate(clean_source, source_language=trans.source_language)
         
         # Update
@@ -0,0 +1,33 @@
+"""
+Django management command to recompute the per-product review summaries
+
+Usage:
+    python manage.py rebuild_review_summaries                   # every product
+    python manage.py rebuild_review_summaries --product-id 123  # one product
+"""
+from django.core.management.base import BaseCommand
+
+from crushme_app.utils.review_summary import rebuild_review_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute review summaries (count, average, star histogram) from the active reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product-id',
+            type=int,
+            action='append',
+            dest='product_ids',
+            help='WooCommerce product ID to rebuild (repeatable, default: every product)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS("⭐ Rebuilding review summaries..."))
+
+        rows = rebuild_review_summaries(options['product_ids'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Review summaries updated!\n"
+            f"   Summary rows: {rows}"
+        ))
@@ -0,0 +1,34 @@
+"""
+Django management command to refresh the product search index
+
+Usage:
+    python manage.py rebuild_search_index          # products changed since the last refresh
+    python manage.py rebuild_search_index --full   # whole catalog
+"""
+from django.core.management.base import BaseCommand
+
+from crushme_app.utils.product_search import refresh_product_search_index
+
+
+class Command(BaseCommand):
+    help = 'Refresh the product search index (incremental by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-index every product instead of only the changed ones',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            f"🔎 {'Rebuilding' if options['full'] else 'Refreshing'} product search index..."
+        ))
+
+        result = refresh_product_search_index(full=options['full'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Search index updated!\n"
+            f"   Products indexed: {result['products']}\n"
+            f"   Index rows: {result['rows']}"
+        ))
@@ -0,0 +1,97 @@
+"""
+Django management command to send bulk notification emails
+(wishlist price drops, gift reminders)
+
+Usage:
+    python manage.py send_bulk_email price_drop --name price-drop-2026-10 --lang es
+    python manage.py send_bulk_email gift_reminder --rate 2 --limit 500
+
+Re-running with the same --name resumes an interrupted dispatch.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from crushme_app.services.bulk_email_service import bulk_email_service, BulkEmailService
+
+
+class Command(BaseCommand):
+    help = 'Send a bulk notification email to an audience (resumable, rate limited)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'audience',
+            choices=BulkEmailService.AUDIENCES,
+            help='Recipients to notify',
+        )
+        parser.add_argument(
+            '--name',
+            help='Dispatch name (default: <audience>-<date>); reuse it to resume',
+        )
+        parser.add_argument(
+            '--lang',
+            default='es',
+            choices=['es', 'en'],
+            help='Email language (default: es)',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Max emails per second (default: BULK_EMAIL_RATE, 0 = unlimited)',
+        )
+        parser.add_argument(
+            '--reconnect-every',
+            type=int,
+            help='Emails sent per SMTP connection (default: BULK_EMAIL_RECONNECT_EVERY)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Stop after this many recipients (resume later with the same --name)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the recipients',
+        )
+
+    def handle(self, *args, **options):
+        audience = options['audience']
+        name = options['name'] or f"{audience}-{timezone.localdate().isoformat()}"
+        reconnect_every = options['reconnect_every']
+        if reconnect_every is not None and reconnect_every < 1:
+            raise CommandError('--reconnect-every must be at least 1')
+
+        self.stdout.write(self.style.SUCCESS(f"📨 Bulk email '{name}' ({audience}, {options['lang']})"))
+
+        def on_progress(dispatch, bulk_email, ok):
+            if not ok:
+                self.stdout.write(self.style.WARNING(f"  ❌ {bulk_email.to_email} (user {bulk_email.recipient_id})"))
+
+        result = bulk_email_service.dispatch(
+            name=name,
+            audience=audience,
+            lang=options['lang'],
+            rate=options['rate'],
+            reconnect_every=reconnect_every,
+            limit=options['limit'],
+            dry_run=options['dry_run'],
+            on_progress=on_progress,
+        )
+
+        if not result['success']:
+            raise CommandError(result['error'])
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Dry run: {result['processed']} recipients (after user {result['resumed_from']})"
+            ))
+            return
+
+        style = self.style.SUCCESS if result['status'] == 'completed' else self.style.WARNING
+        self.stdout.write(style(
+            f"\n{'✅' if result['status'] == 'completed' else '⏸️ '} Dispatch {result['status']}\n"
+            f"   Processed now: {result['processed']}"
+            f"{' (resumed after user ' + str(result['resumed_from']) + ')' if result['resumed_from'] else ''}\n"
+            f"   Sent: {result['sent']}\n"
+            f"   Failed: {result['failed']}"
+        ))
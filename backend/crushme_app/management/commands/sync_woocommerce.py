@@ -37,6 +37,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Quick sync: update only stock and prices',
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Sync only products modified since the last successful sync (run every few minutes)',
+        )
     
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🚀 Starting WooCommerce synchronization...'))
@@ -87,13 +92,47 @@ class Command(BaseCommand):
                     f"✅ Synced {count} variations"
                 ))
             
+            # Incremental sync (modified_after watermark)
+            elif options['incremental']:
+                self.stdout.write('Running incremental synchronization...')
+                result = sync_service.sync_incremental()
+                
+                if not result['success']:
+                    self.stdout.write(self.style.ERROR(
+                        f"❌ Incremental sync failed: {result['error']}"
+                    ))
+                    raise CommandError(f"Sync failed: {result['error']}")
+                
+                if 'removed' in result:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"✅ Incremental sync completed!\n"
+                        f"   Modified after: {result['modified_after']}\n"
+                        f"   Products: {result['products']}\n"
+                        f"   Variations: {result['variations']}\n"
+                        f"   Removed: {result['removed']}\n"
+                        f"   Log ID: {result['log_id']}"
+                    ))
+                else:
+                    # No watermark yet: a full sync was run instead
+                    self.stdout.write(self.style.SUCCESS(
+                        f"✅ Full sync completed (no previous watermark)!\n"
+                        f"   Categories: {result['categories']}\n"
+                        f"   Products: {result['products']}\n"
+                        f"   Variations: {result['variations']}\n"
+                        f"   Log ID: {result['log_id']}"
+                    ))
+            
             # Stock and prices quick sync
             elif options['stock']:
                 self.stdout.write('Updating stock and prices...')
-                count = sync_service.sync_stock_and_prices()
+                result = sync_service.sync_stock_and_prices()
                 self.stdout.write(self.style.SUCCESS(
-                    f"✅ Updated {count} products"
+                    f"✅ Updated {result['updated']} of {result['checked']} products"
                 ))
+                if not result['success']:
+                    self.stdout.write(self.style.WARNING(
+                        "⚠️ Some pages could not be fetched, check the logs"
+                    ))
             
             # Default: full sync
             else:
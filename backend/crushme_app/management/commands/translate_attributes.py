@@ -10,7 +10,7 @@ logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = 'Translate product attributes (names and values) for variable products'
+    help = 'Translate product attributes (names and values) and rebuild the attribute dictionary'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -42,40 +42,23 @@ class Command(BaseCommand):
                 
                 self.stdout.write(f'📦 Translating attributes for product: {product.name}')
                 translation_batch_service._translate_product_attributes(product, force)
+                # Incluir sus términos en el diccionario de atributos (invalida la caché si cambia)
+                translation_batch_service.build_attribute_dictionary()
                 self.stdout.write(self.style.SUCCESS('✅ Product attributes translated!'))
                 
             except WooCommerceProduct.DoesNotExist:
                 self.stdout.write(self.style.ERROR(f'❌ Product {product_id} not found'))
                 return
         else:
-            # Traducir todos los productos variables
-            products = WooCommerceProduct.objects.filter(
-                status='publish',
-                product_type=WooCommerceProduct.TYPE_VARIABLE
-            )
-            total = products.count()
-            
-            self.stdout.write(f'📦 Found {total} variable products')
-            
-            translated = 0
-            errors = 0
-            
-            for idx, product in enumerate(products, 1):
-                try:
-                    if idx % 10 == 0 or idx == total:
-                        self.stdout.write(f'   Progress: {idx}/{total} ({(idx/total*100):.1f}%)')
-                    
-                    translation_batch_service._translate_product_attributes(product, force)
-                    translated += 1
-                    
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(
-                        f'❌ Error translating product {product.wc_id}: {str(e)}'
-                    ))
-                    errors += 1
+            # Diccionario de todo el catálogo: cada término distinto se traduce una vez
+            result = translation_batch_service.build_attribute_dictionary(force_retranslate=force)
+            if not result['success']:
+                self.stdout.write(self.style.ERROR(f"❌ Error: {result['error']}"))
+                return
             
             self.stdout.write(self.style.SUCCESS(
                 f'\n✅ Translation completed!\n'
-                f'   Products processed: {translated}\n'
-                f'   Errors: {errors}'
+                f'   Dictionary terms: {result["terms"]}\n'
+                f'   Newly translated: {result["translated"]}\n'
+                f'   Errors: {translation_batch_service.stats["errors"]}'
             ))
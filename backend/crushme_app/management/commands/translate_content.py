@@ -22,6 +22,11 @@ class Command(BaseCommand):
             type=int,
             help='Translate only a specific product by WooCommerce ID',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Batch mode: translate unique strings across N processes (0 = all cores)',
+        )
     
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🌐 Starting content translation...'))
@@ -52,9 +57,17 @@ class Command(BaseCommand):
                 else:
                     self.stdout.write('Translating new content only (use --force to re-translate)...')
                 
-                result = translation_batch_service.translate_all(
-                    force_retranslate=force
-                )
+                if options['workers'] is not None:
+                    workers = options['workers'] or None
+                    self.stdout.write(f"Batch mode: {workers or 'all'} worker processes...")
+                    result = translation_batch_service.translate_all_batched(
+                        force_retranslate=force,
+                        workers=workers
+                    )
+                else:
+                    result = translation_batch_service.translate_all(
+                        force_retranslate=force
+                    )
                 
                 if result['success']:
                     stats = result['stats']
@@ -66,6 +79,11 @@ class Command(BaseCommand):
                         f"   ⚠️  Errors: {stats['errors']}\n"
                         f"   ⏭️  Skipped: {stats['skipped']}"
                     ))
+                    if 'strings_per_second' in stats:
+                        self.stdout.write(self.style.SUCCESS(
+                            f"   🧠 Unique strings: {stats['unique_strings']} in {stats['elapsed_seconds']}s "
+                            f"({stats['strings_per_second']} strings/sec)"
+                        ))
                 else:
                     self.stdout.write(self.style.ERROR(
                         f"❌ Translation failed: {result.get('error', 'Unknown error')}"
@@ -0,0 +1,100 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:37
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+
+
+def _apply_margin(margin, base_price):
+    """Same formula as CategoryPriceMargin/DefaultPriceMargin.calculate_price"""
+    if base_price is None:
+        return None
+    if margin is None:
+        result = float(base_price)
+    elif margin.use_fixed_multiplier:
+        result = float(base_price) * float(margin.fixed_multiplier)
+    else:
+        result = float(base_price) * (1 + float(margin.margin_percentage) / 100)
+    return Decimal(str(result)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def populate_final_prices(apps, schema_editor):
+    """
+    Materialize final prices for existing products and variations.
+    """
+    WooCommerceProduct = apps.get_model('crushme_app', 'WooCommerceProduct')
+    WooCommerceProductVariation = apps.get_model('crushme_app', 'WooCommerceProductVariation')
+    CategoryPriceMargin = apps.get_model('crushme_app', 'CategoryPriceMargin')
+    DefaultPriceMargin = apps.get_model('crushme_app', 'DefaultPriceMargin')
+    
+    category_margins = {
+        margin.category_id: margin
+        for margin in CategoryPriceMargin.objects.filter(is_active=True)
+    }
+    default_margin = DefaultPriceMargin.objects.filter(is_active=True).first()
+    
+    margins_by_product = {}
+    for product in WooCommerceProduct.objects.prefetch_related('categories'):
+        margin = default_margin
+        for category in product.categories.all():
+            if category.id in category_margins:
+                margin = category_margins[category.id]
+                break
+        margins_by_product[product.id] = margin
+        
+        product.final_price = _apply_margin(margin, product.price)
+        product.final_regular_price = _apply_margin(margin, product.regular_price if product.regular_price is not None else product.price)
+        product.final_sale_price = _apply_margin(margin, product.sale_price) if product.sale_price else None
+        product.save(update_fields=['final_price', 'final_regular_price', 'final_sale_price'])
+    
+    for variation in WooCommerceProductVariation.objects.all():
+        margin = margins_by_product.get(variation.product_id, default_margin)
+        variation.final_price = _apply_margin(margin, variation.price)
+        variation.final_regular_price = _apply_margin(margin, variation.regular_price if variation.regular_price is not None else variation.price)
+        variation.final_sale_price = _apply_margin(margin, variation.sale_price) if variation.sale_price else None
+        variation.save(update_fields=['final_price', 'final_regular_price', 'final_sale_price'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0018_order_payment_provider_order_transaction_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='woocommerceproduct',
+            name='final_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=12, null=True, verbose_name='Final Price'),
+        ),
+        migrations.AddField(
+            model_name='woocommerceproduct',
+            name='final_regular_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Final Regular Price'),
+        ),
+        migrations.AddField(
+            model_name='woocommerceproduct',
+            name='final_sale_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Final Sale Price'),
+        ),
+        migrations.AddField(
+            model_name='woocommerceproductvariation',
+            name='final_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Final Price'),
+        ),
+        migrations.AddField(
+            model_name='woocommerceproductvariation',
+            name='final_regular_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Final Regular Price'),
+        ),
+        migrations.AddField(
+            model_name='woocommerceproductvariation',
+            name='final_sale_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Final Sale Price'),
+        ),
+        migrations.AddIndex(
+            model_name='woocommerceproduct',
+            index=models.Index(fields=['status', 'final_price'], name='crushme_app_status_3a6803_idx'),
+        ),
+        migrations.RunPython(populate_final_prices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0019_woocommerceproduct_final_price_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productsynclog',
+            name='date_modified_wc',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='WC Modified Watermark'),
+        ),
+        migrations.AddField(
+            model_name='productsynclog',
+            name='products_removed',
+            field=models.IntegerField(default=0, verbose_name='Products Removed'),
+        ),
+    ]
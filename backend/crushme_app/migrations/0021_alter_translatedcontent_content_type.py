@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0020_productsynclog_date_modified_wc_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='translatedcontent',
+            name='content_type',
+            field=models.CharField(choices=[('product_name', 'Product Name'), ('product_short_desc', 'Product Short Description'), ('product_desc', 'Product Description'), ('category_name', 'Category Name'), ('category_desc', 'Category Description'), ('variation_attribute', 'Variation Attribute'), ('translation_memory', 'Translation Memory')], db_index=True, max_length=30, verbose_name='Content Type'),
+        ),
+    ]
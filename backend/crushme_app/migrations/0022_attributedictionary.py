@@ -0,0 +1,30 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0021_alter_translatedcontent_content_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttributeDictionary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_language', models.CharField(max_length=5, unique=True, verbose_name='Target Language')),
+                ('terms', models.JSONField(default=dict, verbose_name='Terms')),
+                ('term_count', models.PositiveIntegerField(default=0, verbose_name='Term Count')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Attribute Dictionary',
+                'verbose_name_plural': 'Attribute Dictionaries',
+                'ordering': ['target_language'],
+            },
+        ),
+    ]
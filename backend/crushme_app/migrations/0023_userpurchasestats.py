@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0022_attributedictionary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPurchaseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_purchases', models.PositiveIntegerField(default=0, verbose_name='Total Purchases')),
+                ('gift_purchases', models.PositiveIntegerField(default=0, verbose_name='Gift Purchases')),
+                ('received_gifts_count', models.PositiveIntegerField(default=0, verbose_name='Received Gifts')),
+                ('total_spent', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total Spent')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='purchase_stats', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'User Purchase Stats',
+                'verbose_name_plural': 'User Purchase Stats',
+            },
+        ),
+    ]
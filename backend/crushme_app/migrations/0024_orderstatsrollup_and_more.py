@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-17 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0023_userpurchasestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField(db_index=True, verbose_name='Bucket Start (hour)')),
+                ('status', models.CharField(max_length=20, verbose_name='Order Status')),
+                ('is_gift', models.BooleanField(default=False, verbose_name='Is Gift Order')),
+                ('payment_provider', models.CharField(blank=True, default='', max_length=50, verbose_name='Payment Provider')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='Orders')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Revenue')),
+                ('source_updated_at', models.DateTimeField(db_index=True, verbose_name='Source Updated At')),
+            ],
+            options={
+                'verbose_name': 'Order Stats Rollup',
+                'verbose_name_plural': 'Order Stats Rollups',
+                'ordering': ['-bucket_start'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='crushme_app_created_2969c0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at'], name='crushme_app_updated_e85cf6_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='orderstatsrollup',
+            unique_together={('bucket_start', 'status', 'is_gift', 'payment_provider')},
+        ),
+    ]
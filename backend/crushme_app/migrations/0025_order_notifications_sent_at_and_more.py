@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:03
+
+from django.db import migrations, models
+
+
+def mark_existing_orders_completed(apps, schema_editor):
+    """
+    Orders created before the post-payment tasks already went through the
+    synchronous flow: don't report them as pending.
+    """
+    Order = apps.get_model('crushme_app', 'Order')
+    Order.objects.update(post_payment_status='completed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0024_orderstatsrollup_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='notifications_sent_at',
+            field=models.DateTimeField(blank=True, help_text='When the order confirmation/gift emails were sent', null=True, verbose_name='Notifications Sent At'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='post_payment_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', help_text='Status of the post-payment tasks (confirmation emails and WooCommerce sync)', max_length=20, verbose_name='Post-Payment Status'),
+        ),
+        migrations.RunPython(mark_existing_orders_completed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0025_order_notifications_sent_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkEmailDispatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Dispatch identifier (re-running with the same name resumes it)', max_length=100, unique=True, verbose_name='Name')),
+                ('audience', models.CharField(help_text='Recipient generator (price_drop, gift_reminder)', max_length=50, verbose_name='Audience')),
+                ('lang', models.CharField(default='es', max_length=5, verbose_name='Language')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('interrupted', 'Interrupted')], default='running', max_length=20, verbose_name='Status')),
+                ('last_recipient_id', models.PositiveIntegerField(default=0, verbose_name='Last Recipient ID')),
+                ('sent', models.PositiveIntegerField(default=0, verbose_name='Sent')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Failed')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Started At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+            ],
+            options={
+                'verbose_name': 'Bulk Email Dispatch',
+                'verbose_name_plural': 'Bulk Email Dispatches',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0026_bulkemaildispatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=5, verbose_name='Language')),
+                ('term', models.CharField(max_length=64, verbose_name='Term')),
+                ('wc_id', models.IntegerField(db_index=True, verbose_name='WooCommerce Product ID')),
+                ('weight', models.PositiveSmallIntegerField(default=1, verbose_name='Weight')),
+                ('source_updated_at', models.DateTimeField(verbose_name='Source Updated At')),
+            ],
+            options={
+                'verbose_name': 'Product Search Term',
+                'verbose_name_plural': 'Product Search Terms',
+                'indexes': [models.Index(fields=['source_updated_at'], name='crushme_app_source__4e1df2_idx')],
+                'unique_together': {('language', 'term', 'wc_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0027_productsearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductPopularity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wc_id', models.IntegerField(unique=True, verbose_name='WooCommerce Product ID')),
+                ('units_sold', models.PositiveIntegerField(default=0, verbose_name='Units Sold')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='Orders')),
+                ('recent_units', models.PositiveIntegerField(default=0, verbose_name='Recent Units')),
+                ('favorites', models.PositiveIntegerField(default=0, verbose_name='Favorites')),
+                ('wishlist_adds', models.PositiveIntegerField(default=0, verbose_name='Wishlist Adds')),
+                ('score', models.FloatField(default=0, verbose_name='Score')),
+                ('source_updated_at', models.DateTimeField(db_index=True, verbose_name='Source Updated At')),
+                ('refreshed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Refreshed At')),
+            ],
+            options={
+                'verbose_name': 'Product Popularity',
+                'verbose_name_plural': 'Product Popularity',
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='favoriteproduct',
+            index=models.Index(fields=['created_at'], name='crushme_app_created_642aa1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['woocommerce_product_id'], name='crushme_app_woocomm_707b0a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['created_at'], name='crushme_app_created_8f6123_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlistitem',
+            index=models.Index(fields=['created_at'], name='crushme_app_created_e4868c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productpopularity',
+            index=models.Index(fields=['-units_sold', '-wc_id'], name='crushme_app_units_s_b4292a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productpopularity',
+            index=models.Index(fields=['-score', '-wc_id'], name='crushme_app_score_0782a0_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:22
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_review_summaries(apps, schema_editor):
+    """Summaries of the reviews that already exist"""
+    Review = apps.get_model('crushme_app', 'Review')
+    ProductReviewSummary = apps.get_model('crushme_app', 'ProductReviewSummary')
+
+    rows = Review.objects.filter(is_active=True).values('woocommerce_product_id').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'stars_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    ).order_by()
+    ProductReviewSummary.objects.bulk_create([
+        ProductReviewSummary(
+            average_rating=(Decimal(row['rating_sum']) / row['review_count']).quantize(
+                Decimal('0.01'), rounding=ROUND_HALF_UP
+            ),
+            **row
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0028_productpopularity_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductReviewSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('woocommerce_product_id', models.IntegerField(unique=True, verbose_name='WooCommerce Product ID')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Active Reviews')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Rating Sum')),
+                ('stars_1', models.PositiveIntegerField(default=0, verbose_name='1 Star')),
+                ('stars_2', models.PositiveIntegerField(default=0, verbose_name='2 Stars')),
+                ('stars_3', models.PositiveIntegerField(default=0, verbose_name='3 Stars')),
+                ('stars_4', models.PositiveIntegerField(default=0, verbose_name='4 Stars')),
+                ('stars_5', models.PositiveIntegerField(default=0, verbose_name='5 Stars')),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0, max_digits=3, verbose_name='Average Rating')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Product Review Summary',
+                'verbose_name_plural': 'Product Review Summaries',
+                'indexes': [models.Index(fields=['-average_rating', '-woocommerce_product_id'], name='crushme_app_average_b818cf_idx')],
+            },
+        ),
+        migrations.RunPython(build_review_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.5 on 2026-10-17 19:05
+
+import logging
+import zlib
+
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTE_CONTENT_TYPE = 'variation_attribute'
+
+
+def rekey_attribute_translations(apps, schema_editor):
+    """
+    Attribute translations used to be keyed per product with the salted
+    hash(); the attribute dictionary looks them up by crc32(source_text).
+    Move one old row per (text, language) onto its crc32 key (verified and
+    newest first, so no translation is lost) and drop the other copies of
+    the same text. A row whose crc32 key is held by a different text (crc32
+    collision) is kept under its old key and logged, never deleted.
+    """
+    TranslatedContent = apps.get_model('crushme_app', 'TranslatedContent')
+    rows = TranslatedContent.objects.filter(content_type=ATTRIBUTE_CONTENT_TYPE)
+
+    def stable_id(text):
+        return zlib.crc32(text.encode('utf-8')) & 0x7FFFFFFF
+
+    # {(object_id, target_language): source_text} of the rows already on their crc32 key
+    taken = {}
+    for pk, object_id, target_language, source_text in rows.values_list(
+        'id', 'object_id', 'target_language', 'source_text'
+    ).iterator():
+        if object_id == stable_id(source_text):
+            taken[(object_id, target_language)] = source_text
+
+    orphans = []
+    collisions = []
+    for pk, object_id, target_language, source_text in rows.order_by(
+        '-is_verified', '-updated_at'
+    ).values_list('id', 'object_id', 'target_language', 'source_text').iterator():
+        expected = stable_id(source_text)
+        if object_id == expected:
+            continue
+        holder = taken.get((expected, target_language))
+        if holder is None:
+            TranslatedContent.objects.filter(pk=pk).update(object_id=expected)
+            taken[(expected, target_language)] = source_text
+        elif holder == source_text:
+            # Another copy of a text that already has its row
+            orphans.append(pk)
+        else:
+            collisions.append(pk)
+            logger.warning(
+                f"Attribute translation #{pk} ({source_text!r} -> {target_language}) kept "
+                f"under its old key: crc32 {expected} is taken by {holder!r}"
+            )
+
+    for i in range(0, len(orphans), 500):
+        TranslatedContent.objects.filter(pk__in=orphans[i:i + 500]).delete()
+
+    if collisions:
+        print(f"\n  {len(collisions)} attribute translations kept under their old key (crc32 collisions): {collisions}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0029_productreviewsummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(rekey_attribute_translations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-17 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crushme_app', '0030_rekey_attribute_translations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='notification_steps',
+            field=models.JSONField(blank=True, default=dict, help_text='Notification steps already sent (step -> ISO timestamp)', verbose_name='Notification Steps'),
+        ),
+    ]
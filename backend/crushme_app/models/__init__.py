@@ -2,22 +2,26 @@
 from .user import User, PasswordCode, UserAddress, UserGallery, UserLink, GuestUser
 from .product import Product
 from .cart import Cart, CartItem
-from .order import Order, OrderItem
+from .order import Order, OrderItem, UserPurchaseStats, OrderStatsRollup
 from .wishlist import WishList, WishListItem, FavoriteWishList
-from .review import Review
+from .review import Review, ProductReviewSummary
 from .contact import Contact
 from .feed import Feed
 from .favorite_product import FavoriteProduct
 from .discount import DiscountCode
+from .bulk_email import BulkEmailDispatch
+from .product_popularity import ProductPopularity
 from .woocommerce_models import (
     WooCommerceCategory,
     WooCommerceProduct,
     WooCommerceProductImage,
     WooCommerceProductVariation,
+    ProductSearchTerm,
     ProductSyncLog
 )
 from .translation_models import (
     TranslatedContent,
+    AttributeDictionary,
     CategoryPriceMargin,
     DefaultPriceMargin
 )
@@ -26,19 +30,23 @@ __all__ = [
     'User', 'PasswordCode', 'UserAddress', 'UserGallery', 'UserLink', 'GuestUser',
     'Product',
     'Cart', 'CartItem',
-    'Order', 'OrderItem',
+    'Order', 'OrderItem', 'UserPurchaseStats', 'OrderStatsRollup',
     'WishList', 'WishListItem', 'FavoriteWishList',
-    'Review',
+    'Review', 'ProductReviewSummary',
     'Contact',
     'Feed',
     'FavoriteProduct',
     'DiscountCode',
+    'BulkEmailDispatch',
+    'ProductPopularity',
     'WooCommerceCategory',
     'WooCommerceProduct',
     'WooCommerceProductImage',
     'WooCommerceProductVariation',
+    'ProductSearchTerm',
     'ProductSyncLog',
     'TranslatedContent',
+    'AttributeDictionary',
     'CategoryPriceMargin',
     'DefaultPriceMargin',
 ]
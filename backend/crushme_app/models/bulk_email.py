@@ -0,0 +1,77 @@
+"""
+Bulk email dispatch model
+Tracks progress of bulk notification sends (price drops, gift reminders)
+so an interrupted dispatch resumes where it stopped
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class BulkEmailDispatch(models.Model):
+    """
+    One bulk email dispatch (checkpoint and counters).
+    Recipients are processed in ascending user ID order, so last_recipient_id
+    is enough to resume.
+    """
+
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_INTERRUPTED = 'interrupted'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_INTERRUPTED, 'Interrupted'),
+    ]
+
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Name",
+        help_text="Dispatch identifier (re-running with the same name resumes it)"
+    )
+    audience = models.CharField(
+        max_length=50,
+        verbose_name="Audience",
+        help_text="Recipient generator (price_drop, gift_reminder)"
+    )
+    lang = models.CharField(
+        max_length=5,
+        default='es',
+        verbose_name="Language"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_RUNNING,
+        verbose_name="Status"
+    )
+
+    # Checkpoint: last user ID processed (sent or failed)
+    last_recipient_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Last Recipient ID"
+    )
+    sent = models.PositiveIntegerField(default=0, verbose_name="Sent")
+    failed = models.PositiveIntegerField(default=0, verbose_name="Failed")
+
+    started_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Started At"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Updated At"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Finished At"
+    )
+
+    class Meta:
+        verbose_name = "Bulk Email Dispatch"
+        verbose_name_plural = "Bulk Email Dispatches"
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.audience}): {self.sent} sent, {self.failed} failed"
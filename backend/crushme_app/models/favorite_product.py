@@ -63,6 +63,8 @@ class FavoriteProduct(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['woocommerce_product_id']),
+            # Product popularity delta scan
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
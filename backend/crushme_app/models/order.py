@@ -22,6 +22,18 @@ class Order(models.Model):
         ('cancelled', 'Cancelled'),
         ('refunded', 'Refunded'),
     ]
+
+    # Post-payment side effects (emails, feed, WooCommerce push) status
+    POST_PAYMENT_PENDING = 'pending'
+    POST_PAYMENT_PROCESSING = 'processing'
+    POST_PAYMENT_COMPLETED = 'completed'
+    POST_PAYMENT_FAILED = 'failed'
+    POST_PAYMENT_STATUS_CHOICES = [
+        (POST_PAYMENT_PENDING, 'Pending'),
+        (POST_PAYMENT_PROCESSING, 'Processing'),
+        (POST_PAYMENT_COMPLETED, 'Completed'),
+        (POST_PAYMENT_FAILED, 'Failed'),
+    ]
     
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -138,6 +150,27 @@ class Order(models.Model):
         help_text="Payment provider used for this order (paypal, wompi, etc.)"
     )
 
+    # Post-payment tasks tracking (see services/post_payment_service.py)
+    post_payment_status = models.CharField(
+        max_length=20,
+        choices=POST_PAYMENT_STATUS_CHOICES,
+        default=POST_PAYMENT_PENDING,
+        verbose_name="Post-Payment Status",
+        help_text="Status of the post-payment tasks (confirmation emails and WooCommerce sync)"
+    )
+    notifications_sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Notifications Sent At",
+        help_text="When the order confirmation/gift emails were sent"
+    )
+    notification_steps = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Notification Steps",
+        help_text="Notification steps already sent (step -> ISO timestamp)"
+    )
+
     # Gift order tracking
     is_gift = models.BooleanField(
         default=False,
@@ -187,6 +220,9 @@ class Order(models.Model):
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['order_number']),
+            # Order stats rollups: live bucket (created_at) and watermark (updated_at)
+            models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -333,6 +369,9 @@ class OrderItem(models.Model):
         ordering = ['created_at']
         indexes = [
             models.Index(fields=['order', 'woocommerce_product_id']),
+            # Product popularity: per-product aggregates and delta scan
+            models.Index(fields=['woocommerce_product_id']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
@@ -342,3 +381,69 @@ class OrderItem(models.Model):
     def subtotal(self):
         """Calculate subtotal for this order item"""
         return self.quantity * self.unit_price
+
+
+class UserPurchaseStats(models.Model):
+    """
+    Purchase statistics of a user (purchase history and received gifts)
+    Created on first read and kept up to date incrementally when orders are
+    added to / removed from a user's history (see utils.purchase_stats)
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='purchase_stats',
+        verbose_name="User"
+    )
+    total_purchases = models.PositiveIntegerField(default=0, verbose_name="Total Purchases")
+    gift_purchases = models.PositiveIntegerField(default=0, verbose_name="Gift Purchases")
+    received_gifts_count = models.PositiveIntegerField(default=0, verbose_name="Received Gifts")
+    total_spent = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Total Spent"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Updated At"
+    )
+    
+    class Meta:
+        verbose_name = "User Purchase Stats"
+        verbose_name_plural = "User Purchase Stats"
+    
+    def __str__(self):
+        return f"{self.user} - {self.total_purchases} purchases"
+    
+    @property
+    def regular_purchases(self):
+        return self.total_purchases - self.gift_purchases
+
+
+class OrderStatsRollup(models.Model):
+    """
+    Hourly order statistics (by status, gift flag and payment provider)
+    Filled by the rollup_order_stats Huey task (utils.order_stats); only
+    buckets before today are materialized, today is computed live
+    """
+    bucket_start = models.DateTimeField(db_index=True, verbose_name="Bucket Start (hour)")
+    status = models.CharField(max_length=20, verbose_name="Order Status")
+    is_gift = models.BooleanField(default=False, verbose_name="Is Gift Order")
+    payment_provider = models.CharField(max_length=50, blank=True, default='', verbose_name="Payment Provider")
+    
+    orders = models.PositiveIntegerField(default=0, verbose_name="Orders")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Revenue")
+    
+    # Latest Order.updated_at folded into this bucket (incremental watermark)
+    source_updated_at = models.DateTimeField(db_index=True, verbose_name="Source Updated At")
+    
+    class Meta:
+        verbose_name = "Order Stats Rollup"
+        verbose_name_plural = "Order Stats Rollups"
+        ordering = ['-bucket_start']
+        unique_together = [['bucket_start', 'status', 'is_gift', 'payment_provider']]
+    
+    def __str__(self):
+        return f"{self.bucket_start:%Y-%m-%d %H:00} {self.status}: {self.orders}"
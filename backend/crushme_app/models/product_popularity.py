@@ -0,0 +1,44 @@
+"""
+Product popularity model
+Per-product sales and engagement counters for the "popular" sort and the
+trending list, refreshed incrementally by a Huey task (utils.product_popularity)
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class ProductPopularity(models.Model):
+    """
+    Popularity counters of one WooCommerce product.
+    Cancelled orders don't count; products without sales, favorites or
+    wishlist adds have no row.
+    """
+
+    wc_id = models.IntegerField(unique=True, verbose_name="WooCommerce Product ID")
+
+    units_sold = models.PositiveIntegerField(default=0, verbose_name="Units Sold")
+    orders = models.PositiveIntegerField(default=0, verbose_name="Orders")
+    # Units sold in the last POPULARITY_WINDOW_DAYS (sales velocity)
+    recent_units = models.PositiveIntegerField(default=0, verbose_name="Recent Units")
+    favorites = models.PositiveIntegerField(default=0, verbose_name="Favorites")
+    wishlist_adds = models.PositiveIntegerField(default=0, verbose_name="Wishlist Adds")
+
+    # Weighted mix of the counters (trending order)
+    score = models.FloatField(default=0, verbose_name="Score")
+
+    # Latest source change folded into this row (incremental watermark)
+    source_updated_at = models.DateTimeField(db_index=True, verbose_name="Source Updated At")
+    refreshed_at = models.DateTimeField(default=timezone.now, verbose_name="Refreshed At")
+
+    class Meta:
+        verbose_name = "Product Popularity"
+        verbose_name_plural = "Product Popularity"
+        ordering = ['-score']
+        indexes = [
+            # ORDER BY for sort_by=popular and the trending list
+            models.Index(fields=['-units_sold', '-wc_id']),
+            models.Index(fields=['-score', '-wc_id']),
+        ]
+
+    def __str__(self):
+        return f"Product {self.wc_id}: {self.units_sold} sold, score {self.score:.1f}"
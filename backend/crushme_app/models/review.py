@@ -2,7 +2,7 @@
 Review model for WooCommerce products
 Reviews are tied to WooCommerce product IDs, not local Product model
 """
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from .user import User
@@ -108,6 +108,19 @@ class Review(models.Model):
         user_display = self.user.email if self.user else self.anonymous_name or "Anónimo"
         return f"Review de {user_display} - Producto {self.woocommerce_product_id} ({self.rating}★)"
     
+    def save(self, *args, **kwargs):
+        """Save and update the product review summaries in the same transaction"""
+        from ..utils.review_summary import apply_review_change
+        
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Review.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'woocommerce_product_id', 'rating', 'is_active'
+                ).first()
+            super().save(*args, **kwargs)
+            apply_review_change(previous, (self.woocommerce_product_id, self.rating, self.is_active))
+    
     @property
     def reviewer_name(self):
         """Get the username of the reviewer (user or anonymous)"""
@@ -132,38 +145,72 @@ class Review(models.Model):
     
     @classmethod
     def get_product_average_rating(cls, woocommerce_product_id):
-        """Calculate average rating for a WooCommerce product"""
-        from django.db.models import Avg
-        result = cls.objects.filter(
-            woocommerce_product_id=woocommerce_product_id,
-            is_active=True
-        ).aggregate(avg_rating=Avg('rating'))
-        return result['avg_rating'] or 0
+        """Average rating for a WooCommerce product (from its review summary)"""
+        summary = ProductReviewSummary.objects.filter(
+            woocommerce_product_id=woocommerce_product_id
+        ).values_list('average_rating', flat=True).first()
+        return float(summary or 0)
     
     @classmethod
     def get_product_stats(cls, woocommerce_product_id):
-        """Get review statistics for a WooCommerce product"""
-        from django.db.models import Count, Avg
-        reviews = cls.objects.filter(
-            woocommerce_product_id=woocommerce_product_id,
-            is_active=True
-        )
-        
-        stats = reviews.aggregate(
-            total_reviews=Count('id'),
-            average_rating=Avg('rating')
-        )
-        
-        # Count by rating (1-5 stars)
-        rating_counts = {}
-        for i in range(1, 6):
-            rating_counts[f'stars_{i}'] = reviews.filter(rating=i).count()
+        """Get review statistics for a WooCommerce product (from its review summary)"""
+        summary = ProductReviewSummary.objects.filter(
+            woocommerce_product_id=woocommerce_product_id
+        ).first()
+        if summary is None:
+            summary = ProductReviewSummary(woocommerce_product_id=woocommerce_product_id)
         
         return {
-            'total_reviews': stats['total_reviews'] or 0,
-            'average_rating': round(stats['average_rating'] or 0, 2),
-            'rating_distribution': rating_counts
+            'total_reviews': summary.review_count,
+            'average_rating': float(summary.average_rating),
+            'rating_distribution': summary.rating_distribution
         }
 
 
-
+class ProductReviewSummary(models.Model):
+    """
+    Active review aggregates of a WooCommerce product (count, sum and 1-5 star
+    histogram). Updated in the same transaction as every review write (see
+    utils.review_summary); rebuild with `manage.py rebuild_review_summaries`.
+    """
+    
+    woocommerce_product_id = models.IntegerField(
+        unique=True,
+        verbose_name="WooCommerce Product ID"
+    )
+    
+    review_count = models.PositiveIntegerField(default=0, verbose_name="Active Reviews")
+    rating_sum = models.PositiveIntegerField(default=0, verbose_name="Rating Sum")
+    stars_1 = models.PositiveIntegerField(default=0, verbose_name="1 Star")
+    stars_2 = models.PositiveIntegerField(default=0, verbose_name="2 Stars")
+    stars_3 = models.PositiveIntegerField(default=0, verbose_name="3 Stars")
+    stars_4 = models.PositiveIntegerField(default=0, verbose_name="4 Stars")
+    stars_5 = models.PositiveIntegerField(default=0, verbose_name="5 Stars")
+    
+    # rating_sum / review_count, stored for ORDER BY
+    average_rating = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        verbose_name="Average Rating"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Updated At"
+    )
+    
+    class Meta:
+        verbose_name = "Product Review Summary"
+        verbose_name_plural = "Product Review Summaries"
+        indexes = [
+            # Rating sort
+            models.Index(fields=['-average_rating', '-woocommerce_product_id']),
+        ]
+    
+    def __str__(self):
+        return f"Producto {self.woocommerce_product_id}: {self.review_count} reviews ({self.average_rating}★)"
+    
+    @property
+    def rating_distribution(self):
+        return {f'stars_{i}': getattr(self, f'stars_{i}') for i in range(1, 6)}
@@ -19,6 +19,8 @@ class TranslatedContent(models.Model):
     CONTENT_TYPE_CATEGORY_NAME = 'category_name'
     CONTENT_TYPE_CATEGORY_DESC = 'category_desc'
     CONTENT_TYPE_VARIATION_ATTRIBUTE = 'variation_attribute'
+    # Translation memory: object_id is derived from the source text hash
+    CONTENT_TYPE_TRANSLATION_MEMORY = 'translation_memory'
     
     CONTENT_TYPE_CHOICES = [
         (CONTENT_TYPE_PRODUCT_NAME, 'Product Name'),
@@ -27,6 +29,7 @@ class TranslatedContent(models.Model):
         (CONTENT_TYPE_CATEGORY_NAME, 'Category Name'),
         (CONTENT_TYPE_CATEGORY_DESC, 'Category Description'),
         (CONTENT_TYPE_VARIATION_ATTRIBUTE, 'Variation Attribute'),
+        (CONTENT_TYPE_TRANSLATION_MEMORY, 'Translation Memory'),
     ]
     
     # Identificación del contenido
@@ -70,6 +73,32 @@ class TranslatedContent(models.Model):
         return f"{self.get_content_type_display()} #{self.object_id} → {self.target_language}"
 
 
+class AttributeDictionary(models.Model):
+    """
+    Diccionario de atributos de variaciones (nombres y opciones) por idioma.
+    Vocabulario pequeño y cerrado: se construye una vez al traducir/sincronizar
+    y cada worker lo carga completo en memoria.
+    """
+    
+    target_language = models.CharField(max_length=5, unique=True, verbose_name="Target Language")
+    
+    # {texto original: texto traducido}
+    terms = models.JSONField(default=dict, verbose_name="Terms")
+    term_count = models.PositiveIntegerField(default=0, verbose_name="Term Count")
+    
+    # Timestamps
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    
+    class Meta:
+        verbose_name = "Attribute Dictionary"
+        verbose_name_plural = "Attribute Dictionaries"
+        ordering = ['target_language']
+    
+    def __str__(self):
+        return f"Attributes → {self.target_language} ({self.term_count} terms)"
+
+
 class CategoryPriceMargin(models.Model):
     """
     Márgenes de precio por categoría.
@@ -315,6 +315,8 @@ class WishListItem(models.Model):
             models.Index(fields=['wishlist', 'woocommerce_product_id']),
             models.Index(fields=['woocommerce_product_id']),
             models.Index(fields=['priority']),
+            # Product popularity delta scan
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
@@ -110,6 +110,11 @@ class WooCommerceProduct(models.Model):
     sale_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Sale Price")
     on_sale = models.BooleanField(default=False, verbose_name="On Sale")
     
+    # Final prices with margin applied (materialized by sync and margin changes)
+    final_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, db_index=True, verbose_name="Final Price")
+    final_regular_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name="Final Regular Price")
+    final_sale_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name="Final Sale Price")
+    
     # Stock info (stored for reference, but always fetch fresh from WooCommerce)
     stock_status = models.CharField(max_length=20, default='instock', verbose_name="Stock Status")
     stock_quantity = models.IntegerField(null=True, blank=True, verbose_name="Stock Quantity")
@@ -166,6 +171,7 @@ class WooCommerceProduct(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['featured']),
             models.Index(fields=['on_sale']),
+            models.Index(fields=['status', 'final_price']),
         ]
     
     def __str__(self):
@@ -186,31 +192,27 @@ class WooCommerceProduct(models.Model):
         """Get all images ordered by position"""
         return self.images.all().order_by('position')
     
-    @property
-    def final_price(self):
-        """
-        Precio final con margen aplicado (SIEMPRE usar este).
-        Este es el precio que se debe mostrar al cliente.
-        """
-        return self.get_price_with_margin()
-    
-    @property
-    def final_regular_price(self):
-        """Precio regular final con margen aplicado"""
-        return self.get_regular_price_with_margin()
-    
-    @property
-    def final_sale_price(self):
-        """Precio de oferta final con margen aplicado"""
-        return self.get_sale_price_with_margin()
-    
     def get_categories_list(self):
         """Get list of category names"""
         return [cat.name for cat in self.categories.all()]
     
+    def get_category_wc_ids(self):
+        """
+        WooCommerce IDs of this product's categories (in category order).
+        Uses the prefetch cache when available, otherwise one query cached on the instance.
+        """
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('categories')
+        if prefetched is not None:
+            return [category.wc_id for category in prefetched]
+        
+        if not hasattr(self, '_category_wc_ids'):
+            self._category_wc_ids = list(self.categories.values_list('wc_id', flat=True))
+        return self._category_wc_ids
+    
     def get_price_with_margin(self, base_price=None):
         """
         Calcula el precio con margen de categoría aplicado.
+        Usa el índice de márgenes en memoria (sin consultas de márgenes).
         
         Args:
             base_price: Precio base. Si es None, usa self.price
@@ -218,31 +220,21 @@ class WooCommerceProduct(models.Model):
         Returns:
             Precio con margen aplicado
         """
+        from ..utils.margin_index import get_margin_index
+        
         if base_price is None:
             base_price = self.price
         
         if base_price is None:
             return None
         
-        # Intentar obtener margen de la primera categoría del producto
-        from .translation_models import CategoryPriceMargin, DefaultPriceMargin
-        
-        category_margin = None
-        for category in self.categories.all():
-            try:
-                category_margin = category.price_margin
-                if category_margin and category_margin.is_active:
-                    return category_margin.calculate_price(base_price)
-            except CategoryPriceMargin.DoesNotExist:
-                continue
-        
-        # Si no hay margen de categoría, usar margen por defecto
-        default_margin = DefaultPriceMargin.get_active()
-        if default_margin:
-            return default_margin.calculate_price(base_price)
-        
-        # Si no hay ningún margen configurado, retornar precio base
-        return float(base_price)
+        # Primera categoría con margen activo, luego margen por defecto
+        return get_margin_index().apply(base_price, self.get_category_wc_ids())
+    
+    def get_margin_label(self):
+        """Descripción del margen aplicado (ej: 'Juguetes: +30%')"""
+        from ..utils.margin_index import get_margin_index
+        return get_margin_index().label_for(self.get_category_wc_ids())
     
     def get_regular_price_with_margin(self):
         """Calcula el precio regular con margen aplicado"""
@@ -319,6 +311,11 @@ class WooCommerceProductVariation(models.Model):
     sale_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Sale Price")
     on_sale = models.BooleanField(default=False, verbose_name="On Sale")
     
+    # Final prices with margin applied (materialized by sync and margin changes)
+    final_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name="Final Price")
+    final_regular_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name="Final Regular Price")
+    final_sale_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name="Final Sale Price")
+    
     # Stock (stored for reference, but always fetch fresh from WooCommerce)
     stock_status = models.CharField(max_length=20, default='instock', verbose_name="Stock Status")
     stock_quantity = models.IntegerField(null=True, blank=True, verbose_name="Stock Quantity")
@@ -363,21 +360,6 @@ class WooCommerceProductVariation(models.Model):
         """Get human-readable attribute description"""
         return ", ".join([f"{k}: {v}" for k, v in self.attributes.items()])
     
-    @property
-    def final_price(self):
-        """Precio final con margen aplicado (SIEMPRE usar este)"""
-        return self.get_price_with_margin()
-    
-    @property
-    def final_regular_price(self):
-        """Precio regular final con margen aplicado"""
-        return self.get_regular_price_with_margin()
-    
-    @property
-    def final_sale_price(self):
-        """Precio de oferta final con margen aplicado"""
-        return self.get_sale_price_with_margin()
-    
     def get_price_with_margin(self, base_price=None):
         """
         Calcula el precio con margen de categoría aplicado.
@@ -398,6 +380,10 @@ class WooCommerceProductVariation(models.Model):
         # Usar el método del producto padre
         return self.product.get_price_with_margin(base_price)
     
+    def get_margin_label(self):
+        """Descripción del margen aplicado (heredado del producto padre)"""
+        return self.product.get_margin_label()
+    
     def get_regular_price_with_margin(self):
         """Calcula el precio regular con margen aplicado"""
         return self.get_price_with_margin(self.regular_price)
@@ -409,6 +395,32 @@ class WooCommerceProductVariation(models.Model):
         return None
 
 
+
+class ProductSearchTerm(models.Model):
+    """
+    Índice invertido de búsqueda: un término normalizado (sin acentos, en
+    minúsculas y con el plural recortado) por producto e idioma.
+    Mantenido por utils/product_search.py.
+    """
+    language = models.CharField(max_length=5, verbose_name="Language")
+    term = models.CharField(max_length=64, verbose_name="Term")
+    wc_id = models.IntegerField(db_index=True, verbose_name="WooCommerce Product ID")
+    weight = models.PositiveSmallIntegerField(default=1, verbose_name="Weight")
+    
+    # Latest product/translation change folded into this row (index watermark)
+    source_updated_at = models.DateTimeField(verbose_name="Source Updated At")
+    
+    class Meta:
+        verbose_name = "Product Search Term"
+        verbose_name_plural = "Product Search Terms"
+        unique_together = [['language', 'term', 'wc_id']]
+        indexes = [
+            models.Index(fields=['source_updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.language}:{self.term} -> {self.wc_id} ({self.weight})"
+
 class ProductSyncLog(models.Model):
     """
     Log de sincronizaciones para tracking y debugging.
@@ -448,6 +460,10 @@ class ProductSyncLog(models.Model):
     variations_synced = models.IntegerField(default=0, verbose_name="Variations Synced")
     images_synced = models.IntegerField(default=0, verbose_name="Images Synced")
     
+    # Incremental sync high-watermark (latest WooCommerce date_modified seen)
+    date_modified_wc = models.DateTimeField(null=True, blank=True, verbose_name="WC Modified Watermark")
+    products_removed = models.IntegerField(default=0, verbose_name="Products Removed")
+    
     errors_count = models.IntegerField(default=0, verbose_name="Errors Count")
     error_details = models.TextField(blank=True, default='', verbose_name="Error Details")
     
@@ -475,6 +491,19 @@ class ProductSyncLog(models.Model):
         self.status = status
         self.save()
     
+    @classmethod
+    def get_watermark(cls):
+        """
+        High-watermark for incremental syncs: date_modified_wc of the latest
+        successful full/incremental sync.
+        """
+        last_sync = cls.objects.filter(
+            sync_type__in=[cls.SYNC_TYPE_FULL, cls.SYNC_TYPE_INCREMENTAL],
+            status=cls.STATUS_SUCCESS,
+            date_modified_wc__isnull=False
+        ).order_by('-started_at').first()
+        return last_sync.date_modified_wc if last_sync else None
+    
     def add_error(self, error_message):
         """Add error to log"""
         self.errors_count += 1
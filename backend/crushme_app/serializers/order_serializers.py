@@ -3,11 +3,46 @@ Order serializers for CrushMe e-commerce application
 Handles order creation, tracking, and history
 """
 from rest_framework import serializers
-from django.db import transaction
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
 from ..models import Order, OrderItem, Cart, Product
+from ..utils.order_products import hydrate_order_products
 from .product_serializers import ProductListSerializer
 
 
+def _item_queryset(items):
+    """Materialize order items (related manager or iterable)"""
+    if isinstance(items, models.Manager):
+        items = items.all()
+    return list(items)
+
+
+class OrderItemListSerializer(serializers.ListSerializer):
+    """
+    Hydrates the product data of every item in one lookup before serializing
+    """
+    def to_representation(self, data):
+        items = _item_queryset(data)
+        hydrate_order_products(self.context, [item.woocommerce_product_id for item in items])
+        return super().to_representation(items)
+
+
+class OrderPageListSerializer(serializers.ListSerializer):
+    """
+    List serializer for orders: prefetches items and hydrates the products of
+    the whole page at once (nested item serializers reuse the context)
+    """
+    def to_representation(self, data):
+        orders = _item_queryset(data)
+        prefetch_related_objects(orders, 'items')
+        hydrate_order_products(self.context, [
+            item.woocommerce_product_id
+            for order in orders
+            for item in order.items.all()
+        ])
+        return super().to_representation(orders)
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     """
     Serializer for order items with WooCommerce products
@@ -19,6 +54,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = OrderItem
+        list_serializer_class = OrderItemListSerializer
         fields = [
             'id', 'product', 'woocommerce_product_id', 'quantity', 
             'unit_price', 'subtotal', 'product_name', 'product_description', 
@@ -31,48 +67,15 @@ class OrderItemSerializer(serializers.ModelSerializer):
     
     def get_product(self, obj):
         """
-        Return enriched product information from WooCommerce
-        Uses cached data from order item and enriches with current WooCommerce data
+        Return enriched product information
+        Uses cached data from order item and enriches with current product data
+        (local catalog, WooCommerce only for products missing locally)
         """
-        from ..services.woocommerce_service import woocommerce_service
-
-        try:
-            # Try to get current product data from WooCommerce
-            result = woocommerce_service.get_product_by_id(obj.woocommerce_product_id)
-            if result['success']:
-                wc_product = result['data']
-
-                # Extract image URL
-                image_url = None
-                if wc_product.get('images') and len(wc_product['images']) > 0:
-                    image_url = wc_product['images'][0].get('src')
-
-                return {
-                    'id': obj.woocommerce_product_id,
-                    'woocommerce_product_id': obj.woocommerce_product_id,
-                    'name': wc_product.get('name', obj.product_name),
-                    'price': str(obj.unit_price),
-                    'regular_price': str(wc_product.get('regular_price', obj.unit_price)),
-                    'sale_price': str(wc_product.get('sale_price', obj.unit_price)) if wc_product.get('sale_price') else None,
-                    'image_url': image_url,
-                    'description': wc_product.get('short_description', obj.product_description),
-                    'stock_quantity': wc_product.get('stock_quantity'),
-                    'stock_status': wc_product.get('stock_status'),
-                    'categories': [cat.get('name') for cat in wc_product.get('categories', [])],
-                    'tags': [tag.get('name') for tag in wc_product.get('tags', [])]
-                }
-            else:
-                # Fallback to cached data if WooCommerce fails
-                return {
-                    'id': obj.woocommerce_product_id,
-                    'woocommerce_product_id': obj.woocommerce_product_id,
-                    'name': obj.product_name,
-                    'price': str(obj.unit_price),
-                    'image_url': None,
-                    'description': obj.product_description
-                }
-        except Exception:
-            # Fallback to cached data if any error occurs
+        products = hydrate_order_products(self.context, [obj.woocommerce_product_id])
+        product = products.get(obj.woocommerce_product_id)
+        
+        if product is None:
+            # Fallback to cached data if the product can't be resolved
             return {
                 'id': obj.woocommerce_product_id,
                 'woocommerce_product_id': obj.woocommerce_product_id,
@@ -81,6 +84,21 @@ class OrderItemSerializer(serializers.ModelSerializer):
                 'image_url': None,
                 'description': obj.product_description
             }
+        
+        return {
+            'id': obj.woocommerce_product_id,
+            'woocommerce_product_id': obj.woocommerce_product_id,
+            'name': product['name'] or obj.product_name,
+            'price': str(obj.unit_price),
+            'regular_price': product['regular_price'] or str(obj.unit_price),
+            'sale_price': product['sale_price'],
+            'image_url': product['image_url'],
+            'description': product['short_description'] or obj.product_description,
+            'stock_quantity': product['stock_quantity'],
+            'stock_status': product['stock_status'],
+            'categories': product['categories'],
+            'tags': product['tags']
+        }
 
 
 class OrderListSerializer(serializers.ModelSerializer):
@@ -119,17 +137,18 @@ class OrderDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Order
+        list_serializer_class = OrderPageListSerializer
         fields = [
             'id', 'order_number', 'user', 'status', 'status_display',
             'total', 'total_items', 'items', 'email', 'name',
             'shipping_address', 'shipping_city', 'shipping_state',
             'shipping_postal_code', 'shipping_country', 'phone_number',
             'full_shipping_address', 'notes', 'gift_message',
-            'woocommerce_order_id', 'is_gift', 'sender_username', 'receiver_username',
+            'woocommerce_order_id', 'post_payment_status', 'is_gift', 'sender_username', 'receiver_username',
             'created_at', 'updated_at', 'shipped_at', 'delivered_at'
         ]
         read_only_fields = [
-            'id', 'order_number', 'created_at', 'updated_at',
+            'id', 'order_number', 'post_payment_status', 'created_at', 'updated_at',
             'shipped_at', 'delivered_at'
         ]
 
@@ -448,6 +467,7 @@ class OrderPrivateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
+        list_serializer_class = OrderPageListSerializer
         fields = [
             'id', 'order_number', 'status', 'status_display',
             'total', 'total_items', 'items', 'email', 'name',
@@ -463,63 +483,36 @@ class OrderPrivateSerializer(serializers.ModelSerializer):
         ]
 
     def get_items(self, obj):
-        """Get enriched items with current WooCommerce product data"""
+        """Get enriched items with current product data (local catalog first)"""
+        items = list(obj.items.all())
+        products = hydrate_order_products(self.context, [item.woocommerce_product_id for item in items])
+        
         items_data = []
-        for item in obj.items.all():
-            try:
-                # Get current product data from WooCommerce
-                from ..services.woocommerce_service import woocommerce_service
-                result = woocommerce_service.get_product_by_id(item.woocommerce_product_id)
-
-                if result['success']:
-                    wc_product = result['data']
-                    image_url = None
-                    if wc_product.get('images') and len(wc_product['images']) > 0:
-                        image_url = wc_product['images'][0].get('src')
-
-                    item_data = {
-                        'id': item.id,
-                        'woocommerce_product_id': item.woocommerce_product_id,
-                        'woocommerce_variation_id': item.woocommerce_variation_id,
-                        'quantity': item.quantity,
-                        'unit_price': float(item.unit_price),
-                        'subtotal': float(item.quantity * item.unit_price),
-                        'product_name': wc_product.get('name', item.product_name),
-                        'product_description': wc_product.get('short_description', item.product_description),
-                        'image_url': image_url,
-                        'categories': [cat.get('name') for cat in wc_product.get('categories', [])],
-                        'stock_status': wc_product.get('stock_status')
-                    }
-                else:
-                    # Fallback to cached data
-                    item_data = {
-                        'id': item.id,
-                        'woocommerce_product_id': item.woocommerce_product_id,
-                        'woocommerce_variation_id': item.woocommerce_variation_id,
-                        'quantity': item.quantity,
-                        'unit_price': float(item.unit_price),
-                        'subtotal': float(item.quantity * item.unit_price),
-                        'product_name': item.product_name,
-                        'product_description': item.product_description,
-                        'image_url': None
-                    }
-
-                items_data.append(item_data)
-
-            except Exception:
-                # Fallback for any error
-                items_data.append({
-                    'id': item.id,
-                    'woocommerce_product_id': item.woocommerce_product_id,
-                    'woocommerce_variation_id': item.woocommerce_variation_id,
-                    'quantity': item.quantity,
-                    'unit_price': float(item.unit_price),
-                    'subtotal': float(item.quantity * item.unit_price),
-                    'product_name': item.product_name,
-                    'product_description': item.product_description,
-                    'image_url': None
+        for item in items:
+            item_data = {
+                'id': item.id,
+                'woocommerce_product_id': item.woocommerce_product_id,
+                'woocommerce_variation_id': item.woocommerce_variation_id,
+                'quantity': item.quantity,
+                'unit_price': float(item.unit_price),
+                'subtotal': float(item.quantity * item.unit_price),
+                'product_name': item.product_name,
+                'product_description': item.product_description,
+                'image_url': None
+            }
+            
+            product = products.get(item.woocommerce_product_id)
+            if product is not None:
+                item_data.update({
+                    'product_name': product['name'] or item.product_name,
+                    'product_description': product['short_description'] or item.product_description,
+                    'image_url': product['image_url'],
+                    'categories': product['categories'],
+                    'stock_status': product['stock_status']
                 })
-
+            
+            items_data.append(item_data)
+        
         return items_data
 
     def get_shipping_address(self, obj):
@@ -0,0 +1,115 @@
+"""
+Attribute Dictionary
+Catalog-wide translations of variation attribute names and options
+("attribute_pa_color", "Rojo", "Talla M", ...).
+
+The dictionary is built by TranslationBatchService.build_attribute_dictionary
+and stored as one AttributeDictionary row per language. Each process keeps it
+in memory and reloads it when the shared version counter changes, so
+translating an attribute is a dict lookup.
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Source language of the catalog (no dictionary needed)
+SOURCE_LANGUAGE = 'es'
+
+
+def clean_attribute_name(attr_key):
+    """'attribute_pa_color' -> 'color'"""
+    return attr_key.replace('attribute_pa_', '').replace('attribute_', '')
+
+
+class AttributeDictionaryCache:
+    """
+    In-process copy of the attribute dictionaries, one per target language.
+    """
+
+    VERSION_KEY = 'attributes:dictionary:version'
+
+    # Without Redis the version can't be read: reload after this (seconds)
+    FALLBACK_TTL = 300
+
+    def __init__(self):
+        self._dictionaries = {}  # {language: (version, loaded_at, terms)}
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        try:
+            return cache.get(self.VERSION_KEY, 0)
+        except Exception as e:
+            logger.warning(f"Could not read attribute dictionary version: {e}")
+            return None
+
+    def _load(self, target_language):
+        from ..models import AttributeDictionary
+
+        row = AttributeDictionary.objects.filter(
+            target_language=target_language
+        ).values_list('terms', flat=True).first()
+        return row or {}
+
+    def get_terms(self, target_language):
+        """
+        {original: translated} for target_language ({} for the source language).
+        """
+        if target_language == SOURCE_LANGUAGE:
+            return {}
+
+        version = self._current_version()
+        with self._lock:
+            entry = self._dictionaries.get(target_language)
+
+        if entry is not None:
+            cached_version, loaded_at, terms = entry
+            if version is not None and version == cached_version:
+                return terms
+            if version is None and time.monotonic() - loaded_at < self.FALLBACK_TTL:
+                return terms
+
+        terms = self._load(target_language)
+        with self._lock:
+            self._dictionaries[target_language] = (version, time.monotonic(), terms)
+        logger.debug(f"📖 Attribute dictionary loaded ({target_language}): {len(terms)} terms")
+        return terms
+
+    def translate(self, text, target_language, terms=None):
+        """Translated attribute name/option, or the original text if unknown"""
+        if not text:
+            return text
+        if terms is None:
+            terms = self.get_terms(target_language)
+        return terms.get(text, text)
+
+    def translate_attributes(self, attributes, target_language, terms=None):
+        """
+        Translate a variation attributes dict ({'attribute_pa_color': 'Rojo'})
+        to {'color' translated: 'Rojo' translated}.
+        """
+        if terms is None:
+            terms = self.get_terms(target_language)
+        return {
+            self.translate(clean_attribute_name(key), target_language, terms):
+                self.translate(value, target_language, terms)
+            for key, value in (attributes or {}).items()
+        }
+
+    def invalidate(self):
+        """Make every process reload its dictionaries (after a rebuild)"""
+        try:
+            cache.incr(self.VERSION_KEY)
+        except ValueError:
+            cache.set(self.VERSION_KEY, 1, None)
+        except Exception as e:
+            logger.warning(f"Could not bump attribute dictionary version: {e}")
+        with self._lock:
+            self._dictionaries.clear()
+
+
+# Singleton instance (one copy per process)
+attribute_dictionary = AttributeDictionaryCache()
@@ -0,0 +1,201 @@
+"""
+Autocomplete Index
+Typeahead suggestions for the storefront search box: published product
+names, category names and variation attribute terms, per language.
+
+Each process keeps sorted arrays per language of normalized keys (every word
+suffix of each text, so "rosa" finds "Vibrador Rosa"). A lookup is a bisect
+plus a short forward scan per priority tier, with no database or cache
+access. The arrays are rebuilt when the catalog generation changes (syncs,
+margin and translation changes), checked at most every
+VERSION_CHECK_INTERVAL seconds, and after MAX_AGE at the latest.
+"""
+import bisect
+import logging
+import threading
+import time
+
+from ..utils.catalog_cache import CACHE_TIMEOUT, CATALOG_GENERATION_SCOPE, get_versions
+from ..utils.product_search import TOKEN_RE, normalize_text
+
+logger = logging.getLogger(__name__)
+
+SOURCE_LANGUAGE = 'es'
+LANGUAGES = ('es', 'en')
+
+# Suggestion kinds and their display priority
+KIND_CATEGORY = 'category'
+KIND_ATTRIBUTE = 'attribute'
+KIND_PRODUCT = 'product'
+KIND_RANK = {KIND_CATEGORY: 0, KIND_ATTRIBUTE: 1, KIND_PRODUCT: 2}
+
+# Keys kept per text (word suffixes)
+MAX_KEY_WORDS = 6
+
+
+def normalize_key(text):
+    """'  Vibrador <b>Rosá</b>!' -> 'vibrador rosa'"""
+    return ' '.join(TOKEN_RE.findall(normalize_text(text)))
+
+
+class _LanguageIndex:
+    """
+    Sorted key arrays in priority tiers: matches at the start of the text
+    before matches on a later word, categories before attributes before
+    products. A lookup walks the tiers until it has enough suggestions.
+    """
+
+    __slots__ = ('tiers',)
+
+    def __init__(self, items):
+        tiers = {
+            (later_word, rank): []
+            for later_word in (False, True) for rank in KIND_RANK.values()
+        }
+        for kind, object_id, text in items:
+            words = normalize_key(text).split()
+            for position in range(min(len(words), MAX_KEY_WORDS)):
+                tiers[(position > 0, KIND_RANK[kind])].append(
+                    (' '.join(words[position:]), (kind, object_id, text))
+                )
+
+        self.tiers = []
+        for tier in sorted(tiers):
+            rows = sorted(tiers[tier], key=lambda row: row[0])
+            self.tiers.append(([row[0] for row in rows], [row[1] for row in rows]))
+
+    @property
+    def size(self):
+        return sum(len(keys) for keys, _ in self.tiers)
+
+    def suggest(self, prefix, limit):
+        seen = set()
+        results = []
+        for keys, entries in self.tiers:
+            i = bisect.bisect_left(keys, prefix)
+            while i < len(keys) and keys[i].startswith(prefix):
+                kind, object_id, text = entries[i]
+                i += 1
+                # Attribute terms have no ID: the text identifies them
+                identity = (kind, object_id if object_id is not None else text)
+                if identity in seen:
+                    continue
+                seen.add(identity)
+                results.append({'type': kind, 'id': object_id, 'text': text})
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+class AutocompleteIndex:
+    """
+    In-process typeahead index, one set of sorted arrays per language.
+    """
+
+    # Seconds between catalog generation checks (keeps lookups off Redis)
+    VERSION_CHECK_INTERVAL = 5
+
+    # Without Redis the generation can't be read: rebuild after this (seconds)
+    FALLBACK_TTL = 300
+
+    # Webhooks purge single products without bumping the generation: rebuild
+    # at least this often (seconds, same as cached catalog responses)
+    MAX_AGE = CACHE_TIMEOUT
+
+    def __init__(self):
+        self._indexes = {}  # {language: (generation, built_at, _LanguageIndex)}
+        self._generation = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _current_generation(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.VERSION_CHECK_INTERVAL:
+            versions = get_versions([CATALOG_GENERATION_SCOPE])
+            self._generation = versions[CATALOG_GENERATION_SCOPE] if versions is not None else None
+            self._checked_at = now
+        return self._generation
+
+    def _items(self, language):
+        """(kind, id, text) for every suggestion of a language"""
+        from ..models import AttributeDictionary, TranslatedContent, WooCommerceCategory, WooCommerceProduct
+
+        products = dict(
+            WooCommerceProduct.objects.filter(status='publish').values_list('wc_id', 'name')
+        )
+        categories = dict(
+            WooCommerceCategory.objects.filter(product_count__gt=0).values_list('wc_id', 'name')
+        )
+        dictionary = AttributeDictionary.objects.filter(
+            target_language=language if language != SOURCE_LANGUAGE else 'en'
+        ).values_list('terms', flat=True).first() or {}
+
+        if language == SOURCE_LANGUAGE:
+            attributes = set(dictionary)
+        else:
+            for content_type, names in (
+                (TranslatedContent.CONTENT_TYPE_PRODUCT_NAME, products),
+                (TranslatedContent.CONTENT_TYPE_CATEGORY_NAME, categories),
+            ):
+                # Untranslated entries keep the original name
+                names.update(
+                    TranslatedContent.objects.filter(
+                        content_type=content_type,
+                        target_language=language,
+                        object_id__in=list(names)
+                    ).values_list('object_id', 'translated_text')
+                )
+            attributes = set(dictionary.values())
+
+        items = [(KIND_PRODUCT, wc_id, name) for wc_id, name in products.items()]
+        items += [(KIND_CATEGORY, wc_id, name) for wc_id, name in categories.items()]
+        items += [(KIND_ATTRIBUTE, None, term) for term in sorted(attributes) if term]
+        return items
+
+    def get_index(self, language):
+        if language not in LANGUAGES:
+            language = SOURCE_LANGUAGE
+
+        generation = self._current_generation()
+        with self._lock:
+            entry = self._indexes.get(language)
+
+        if entry is not None:
+            built_generation, built_at, index = entry
+            fresh = time.monotonic() - built_at < self.MAX_AGE
+            if generation is not None and generation == built_generation and fresh:
+                return index
+            if generation is None and time.monotonic() - built_at < self.FALLBACK_TTL:
+                return index
+
+        started = time.monotonic()
+        index = _LanguageIndex(self._items(language))
+        with self._lock:
+            self._indexes[language] = (generation, time.monotonic(), index)
+        logger.info(
+            f"🔤 Autocomplete index built ({language}): {index.size} keys "
+            f"in {(time.monotonic() - started) * 1000:.0f} ms"
+        )
+        return index
+
+    def suggest(self, query, language, limit=8):
+        """
+        Suggestions whose text (or one of its words) starts with the query.
+
+        Returns:
+            list: [{'type': 'category'|'attribute'|'product', 'id', 'text'}]
+        """
+        prefix = normalize_key(query)
+        if not prefix:
+            return []
+        return self.get_index(language).suggest(prefix, limit)
+
+    def invalidate(self):
+        """Drop this process' indexes (rebuilt on next lookup)"""
+        with self._lock:
+            self._indexes.clear()
+        self._checked_at = None
+
+
+# Singleton instance (one copy per process)
+autocomplete_index = AutocompleteIndex()
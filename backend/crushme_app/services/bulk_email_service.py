@@ -0,0 +1,276 @@
+"""
+Bulk Email Service
+Sends one templated email per user of an audience (wishlist price drops,
+gift reminders) on top of EmailService:
+
+- Audiences are generators: recipients are streamed in ascending user ID
+  order and their context is rendered as they are sent
+- Emails go over a shared SMTP connection (EmailService.batch), reopened
+  every N emails or after a failure, at a configurable rate
+- Progress is checkpointed in BulkEmailDispatch after every recipient, so a
+  dispatch interrupted by a crash resumes after the last processed user
+"""
+import logging
+import time
+from collections import namedtuple
+from itertools import groupby
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .email_service import email_service
+
+logger = logging.getLogger(__name__)
+
+# One rendered email: recipient_id drives the checkpoint
+BulkEmail = namedtuple('BulkEmail', 'recipient_id to_email subject template_name context')
+
+SUBJECTS = {
+    'price_drop': {
+        'es': 'Productos de tu wishlist están en oferta 💸 - CrushMe',
+        'en': 'Items on your wishlist are on sale 💸 - CrushMe',
+    },
+    'gift_reminder': {
+        'es': 'Sorprende a alguien especial 🎁 - CrushMe',
+        'en': 'Surprise someone special 🎁 - CrushMe',
+    },
+}
+
+
+def _format_cop(amount):
+    return f"{int(round(float(amount))):,}".replace(',', '.')
+
+
+class BulkEmailService:
+    """
+    Servicio de envíos masivos con checkpoint y límite de velocidad.
+    """
+
+    AUDIENCES = ('price_drop', 'gift_reminder')
+
+    # ------------------------------------------------------------------
+    # Audiences (streaming generators ordered by user ID)
+    # ------------------------------------------------------------------
+    def _price_drop_emails(self, lang, after_id):
+        """Users with wishlisted products that are on sale and in stock"""
+        from ..models import WishListItem, WooCommerceProduct
+
+        on_sale = {
+            product['wc_id']: product
+            for product in WooCommerceProduct.objects.filter(
+                status='publish',
+                stock_status='instock',
+                final_sale_price__isnull=False,
+                final_sale_price__lt=F('final_regular_price')
+            ).values('wc_id', 'name', 'final_regular_price', 'final_sale_price')
+        }
+        if not on_sale:
+            return
+
+        rows = WishListItem.objects.filter(
+            wishlist__is_active=True,
+            wishlist__user__is_active=True,
+            wishlist__user_id__gt=after_id,
+            woocommerce_product_id__in=list(on_sale)
+        ).order_by('wishlist__user_id', 'woocommerce_product_id').values_list(
+            'wishlist__user_id', 'wishlist__user__email', 'wishlist__user__username',
+            'woocommerce_product_id'
+        ).iterator(chunk_size=2000)
+
+        for (user_id, email, username), user_rows in groupby(rows, key=lambda row: row[:3]):
+            wc_ids = sorted({row[3] for row in user_rows})
+            items = [
+                {
+                    'name': on_sale[wc_id]['name'],
+                    'regular_price': _format_cop(on_sale[wc_id]['final_regular_price']),
+                    'sale_price': _format_cop(on_sale[wc_id]['final_sale_price'])
+                }
+                for wc_id in wc_ids
+            ]
+            yield BulkEmail(
+                recipient_id=user_id,
+                to_email=email,
+                subject=SUBJECTS['price_drop'][lang],
+                template_name='7-wishlist-price-drop.html',
+                context={
+                    'username': username,
+                    'items': items,
+                    'currency': 'COP',
+                    'shop_url': f"{settings.FRONTEND_URL}/shop"
+                }
+            )
+
+    def _gift_reminder_emails(self, lang, after_id):
+        """Users following someone else's public wishlist"""
+        from ..models import FavoriteWishList
+
+        favorites = FavoriteWishList.objects.filter(
+            user__is_active=True,
+            user_id__gt=after_id,
+            wishlist__is_active=True,
+            wishlist__is_public=True
+        ).exclude(
+            wishlist__user_id=F('user_id')
+        ).select_related('user', 'wishlist__user').order_by('user_id', 'wishlist_id').iterator(chunk_size=2000)
+
+        for user_id, user_favorites in groupby(favorites, key=lambda favorite: favorite.user_id):
+            user_favorites = list(user_favorites)
+            user = user_favorites[0].user
+            wishlists = [
+                {
+                    'name': favorite.wishlist.name,
+                    'owner_username': favorite.wishlist.user.username,
+                    'url': favorite.wishlist.public_url
+                }
+                for favorite in user_favorites
+            ]
+            yield BulkEmail(
+                recipient_id=user_id,
+                to_email=user.email,
+                subject=SUBJECTS['gift_reminder'][lang],
+                template_name='8-gift-reminder.html',
+                context={'username': user.username, 'wishlists': wishlists}
+            )
+
+    def iter_emails(self, audience, lang='es', after_id=0):
+        """
+        Stream the emails of an audience for users with ID > after_id.
+
+        Raises:
+            ValueError: Unknown audience
+        """
+        if audience not in self.AUDIENCES:
+            raise ValueError(f"Unknown audience '{audience}' (choices: {', '.join(self.AUDIENCES)})")
+        return getattr(self, f'_{audience}_emails')(lang, after_id)
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    def dispatch(self, name, audience, lang='es', rate=None, reconnect_every=None,
+                 limit=None, dry_run=False, on_progress=None):
+        """
+        Send (or resume) a bulk dispatch.
+
+        Args:
+            name: Dispatch identifier; an unfinished dispatch with this name is resumed
+            audience: One of AUDIENCES
+            lang: 'es' or 'en'
+            rate: Max emails per second (default BULK_EMAIL_RATE, 0 = unlimited)
+            reconnect_every: Emails per SMTP connection (default BULK_EMAIL_RECONNECT_EVERY)
+            limit: Stop after this many recipients (the dispatch stays resumable)
+            dry_run: Count recipients without sending or checkpointing
+            on_progress: Optional callback(dispatch, bulk_email, sent_ok)
+
+        Returns:
+            dict: {'success', 'name', 'status', 'sent', 'failed', 'processed', 'resumed_from'}
+        """
+        from ..models import BulkEmailDispatch
+
+        if audience not in self.AUDIENCES:
+            return {'success': False, 'error': f"Unknown audience '{audience}' (choices: {', '.join(self.AUDIENCES)})"}
+
+        lang = lang if lang in ('es', 'en') else 'es'
+        if rate is None:
+            rate = settings.BULK_EMAIL_RATE
+        if reconnect_every is None:
+            reconnect_every = settings.BULK_EMAIL_RECONNECT_EVERY
+
+        if dry_run:
+            existing = BulkEmailDispatch.objects.filter(name=name).first()
+            after_id = existing.last_recipient_id if existing else 0
+            processed = sum(1 for _ in self.iter_emails(audience, lang, after_id=after_id))
+            return {'success': True, 'name': name, 'status': 'dry_run', 'sent': 0,
+                    'failed': 0, 'processed': processed, 'resumed_from': after_id}
+
+        dispatch, created = BulkEmailDispatch.objects.get_or_create(
+            name=name,
+            defaults={'audience': audience, 'lang': lang}
+        )
+        if dispatch.audience != audience:
+            return {'success': False, 'error': f"Dispatch '{name}' belongs to audience '{dispatch.audience}'"}
+        if dispatch.status == BulkEmailDispatch.STATUS_COMPLETED:
+            return {'success': True, 'name': name, 'status': dispatch.status, 'sent': dispatch.sent,
+                    'failed': dispatch.failed, 'processed': 0, 'resumed_from': dispatch.last_recipient_id}
+
+        resumed_from = dispatch.last_recipient_id
+        if not created:
+            logger.info(f"🔁 Resuming bulk dispatch '{name}' after user {resumed_from}")
+        BulkEmailDispatch.objects.filter(pk=dispatch.pk).update(status=BulkEmailDispatch.STATUS_RUNNING)
+
+        interval = 1.0 / rate if rate else 0
+        emails = self.iter_emails(audience, dispatch.lang, after_id=resumed_from)
+        processed = 0
+        next_send = time.monotonic()
+
+        def limit_reached():
+            return limit is not None and processed >= limit
+
+        try:
+            # Peek before opening a connection, so an empty round costs nothing
+            bulk_email = next(emails, None)
+            while bulk_email is not None and not limit_reached():
+                # One SMTP connection per round; a failure ends the round so the
+                # next email gets a fresh connection
+                with email_service.batch():
+                    for _ in range(reconnect_every):
+                        delay = next_send - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                        next_send = max(next_send, time.monotonic()) + interval
+
+                        ok = email_service.send_email(
+                            to_email=bulk_email.to_email,
+                            subject=bulk_email.subject,
+                            template_name=bulk_email.template_name,
+                            context=bulk_email.context,
+                            lang=dispatch.lang
+                        )
+                        processed += 1
+                        self._checkpoint(dispatch, bulk_email.recipient_id, ok)
+                        if on_progress:
+                            on_progress(dispatch, bulk_email, ok)
+
+                        if limit_reached():
+                            break
+                        bulk_email = next(emails, None)
+                        if not ok or bulk_email is None:
+                            break
+        except BaseException:
+            BulkEmailDispatch.objects.filter(pk=dispatch.pk).update(status=BulkEmailDispatch.STATUS_INTERRUPTED)
+            raise
+
+        dispatch.refresh_from_db()
+        exhausted = bulk_email is None
+        dispatch.status = BulkEmailDispatch.STATUS_COMPLETED if exhausted else BulkEmailDispatch.STATUS_INTERRUPTED
+        dispatch.finished_at = timezone.now() if exhausted else None
+        dispatch.save(update_fields=['status', 'finished_at', 'updated_at'])
+
+        logger.info(
+            f"📨 Bulk dispatch '{name}' ({audience}): {processed} processed, "
+            f"{dispatch.sent} sent, {dispatch.failed} failed in total"
+        )
+        return {
+            'success': True,
+            'name': name,
+            'status': dispatch.status,
+            'sent': dispatch.sent,
+            'failed': dispatch.failed,
+            'processed': processed,
+            'resumed_from': resumed_from
+        }
+
+    @staticmethod
+    def _checkpoint(dispatch, recipient_id, ok):
+        from ..models import BulkEmailDispatch
+
+        counter = 'sent' if ok else 'failed'
+        BulkEmailDispatch.objects.filter(pk=dispatch.pk).update(
+            last_recipient_id=recipient_id,
+            **{counter: F(counter) + 1},
+            updated_at=timezone.now()
+        )
+
+
+# Singleton instance
+bulk_email_service = BulkEmailService()
@@ -4,18 +4,82 @@ Handles all email sending with HTML templates
 """
 import logging
 import re
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import Context, Template, TemplateSyntaxError
 from django.conf import settings
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+HTML_TAG_RE = re.compile('<[^<]+?>')
+
+
+@lru_cache(maxsize=None)
+def get_email_templates(lang, template_name):
+    """
+    Compiled (html, text) templates for email_templates/<lang>/<template_name>,
+    read and compiled once per process.
+
+    The text template is compiled from the source with HTML tags stripped, so
+    the plain-text part renders directly instead of regex-stripping every
+    rendered email. None if stripping breaks the template tags (a block tag
+    inside an HTML tag); the rendered HTML is stripped instead.
+
+    Raises:
+        FileNotFoundError: If the template doesn't exist
+    """
+    template_path = Path(settings.BASE_DIR) / 'email_templates' / lang / template_name
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template_content = f.read()
+
+    # Django template engine (supports {% for %} loops)
+    html_template = Template(template_content)
+    try:
+        text_template = Template(HTML_TAG_RE.sub('', template_content))
+    except TemplateSyntaxError:
+        logger.warning(f"⚠️ Email template {lang}/{template_name}: text part rendered from HTML")
+        text_template = None
+    return html_template, text_template
+
 
 class EmailService:
     """
     Centralized email service for sending templated emails
     """
+
+    # Shared SMTP connection of the current batch (per thread)
+    _batch = threading.local()
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Send several emails over one SMTP connection:
+
+            with email_service.batch():
+                email_service.send_gift_received_notification(...)
+                email_service.send_gift_sent_confirmation(...)
+
+        Nested batches reuse the outer connection.
+        """
+        if getattr(EmailService._batch, 'connection', None) is not None:
+            yield EmailService._batch.connection
+            return
+
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        EmailService._batch.connection = connection
+        try:
+            yield connection
+        finally:
+            EmailService._batch.connection = None
+            try:
+                connection.close()
+            except Exception as e:
+                logger.warning(f"Error closing SMTP connection: {e}")
     
     @staticmethod
     def send_email(
@@ -57,27 +121,23 @@ class EmailService:
             if lang not in ['es', 'en']:
                 lang = 'es'  # Default to Spanish
             
-            # Load template with language folder using Django template engine
-            from django.template import Template, Context
-            template_path = Path(settings.BASE_DIR) / 'email_templates' / lang / template_name
-            
-            # Read template file
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-            
-            # Render template with Django template engine (supports {% for %} loops)
-            template = Template(template_content)
-            html_content = template.render(Context(context))
+            # Compiled templates (cached per language and template)
+            html_template, text_template = get_email_templates(lang, template_name)
+            html_content = html_template.render(Context(context))
             
-            # Create plain text version (strip HTML tags)
-            text_content = re.sub('<[^<]+?>', '', html_content)
+            # Plain text version (HTML tags stripped)
+            if text_template is not None:
+                text_content = text_template.render(Context(context))
+            else:
+                text_content = HTML_TAG_RE.sub('', html_content)
             
-            # Create email message
+            # Create email message (on the batch connection, if any)
             email = EmailMultiAlternatives(
                 subject=subject,
                 body=text_content,
                 from_email=from_email,
-                to=to_email
+                to=to_email,
+                connection=getattr(EmailService._batch, 'connection', None)
             )
             
             # Attach HTML version
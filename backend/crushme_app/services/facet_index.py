@@ -0,0 +1,386 @@
+"""
+Facet Index
+In-memory filters, facet counts and sort orders for the local product listing.
+
+Every published product gets a bit position, assigned in final price order,
+and each filterable value is a bitset (a Python int) over those positions:
+on sale, in stock, each category, each minimum rating and each variation
+attribute value (from WooCommerceProduct.attributes and the published
+variations). A filter is an AND of bitsets, a price range is a contiguous bit
+range, and a facet count is one AND plus a popcount. Sort orders are
+precomputed position lists, so a page is a walk over one list.
+
+Each process rebuilds its copy when the catalog generation changes (syncs,
+margin and translation changes), checked at most every
+VERSION_CHECK_INTERVAL seconds. Stock/price refreshes, webhooks, reviews and
+sales only bump per-product/list versions (several times a minute), so they
+are left to MAX_AGE instead of triggering a rebuild each. One caller rebuilds
+at a time; the others keep serving the previous copy meanwhile.
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from ..utils.catalog_cache import CATALOG_GENERATION_SCOPE, get_versions
+from .attribute_dictionary import attribute_dictionary, clean_attribute_name
+from .autocomplete_index import normalize_key
+
+logger = logging.getLogger(__name__)
+
+SORT_OPTIONS = ('default', 'popular', 'price_asc', 'price_desc', 'rating', 'newest')
+
+# Price facet buckets: final price in COP ([edge_i, edge_i+1))
+PRICE_BUCKET_EDGES = (0, 50000, 100000, 200000, 500000)
+
+# Rating facet: products whose average review rating is at least N
+RATING_THRESHOLDS = (4, 3, 2, 1)
+
+
+def _bit_range(start, end):
+    """Bitset with positions start..end-1"""
+    return ((1 << end) - 1) ^ ((1 << start) - 1)
+
+
+def attribute_filter_key(name):
+    """'attribute_Tamaño del Producto' -> 'tamano_del_producto' (attr_<key> query parameters)"""
+    return normalize_key(clean_attribute_name(name)).replace(' ', '_')
+
+
+class _CatalogFacets:
+    """One immutable snapshot of the published catalog"""
+
+    def __init__(self, products, categories, variation_attributes, ratings, sales):
+        # Posiciones en orden de precio final (sin precio al final)
+        products.sort(key=lambda p: (p['final_price'] is None, p['final_price'] or 0, -p['wc_id']))
+        self.wc_ids = [p['wc_id'] for p in products]
+        self.prices = [float(p['final_price']) for p in products if p['final_price'] is not None]
+        self.all = _bit_range(0, len(products))
+
+        self.on_sale = 0
+        self.in_stock = 0
+        self.categories = defaultdict(int)
+        self.ratings = dict.fromkeys(RATING_THRESHOLDS, 0)
+        # {attribute key: {'name': original name, 'values': {value key: [original value, bitset]}}}
+        self.attributes = {}
+
+        for position, product in enumerate(products):
+            bit = 1 << position
+            if product['on_sale']:
+                self.on_sale |= bit
+            if product['stock_status'] == 'instock':
+                self.in_stock |= bit
+            for category_wc_id in categories.get(product['id'], ()):
+                self.categories[category_wc_id] |= bit
+
+            rating = ratings.get(product['wc_id'])
+            for threshold in RATING_THRESHOLDS:
+                if rating is not None and rating >= threshold:
+                    self.ratings[threshold] |= bit
+
+            for name, value in self._product_attribute_values(product, variation_attributes):
+                self._add_attribute_value(name, value, bit)
+
+        position_of = {wc_id: position for position, wc_id in enumerate(self.wc_ids)}
+        newest_key = {p['wc_id']: p['date_created_wc'].timestamp() if p['date_created_wc'] else None for p in products}
+
+        def ordered(key):
+            return [position_of[wc_id] for wc_id in sorted(self.wc_ids, key=key)]
+
+        # Mismos órdenes que la consulta SQL que reemplazan (nulos al final, desempate por -wc_id)
+        priced = len(self.prices)
+        self.orders = {
+            'default': ordered(lambda wc_id: -wc_id),
+            'price_asc': list(range(len(products))),
+            'price_desc': sorted(range(priced), key=lambda pos: (-self.prices[pos], -self.wc_ids[pos]))
+                          + list(range(priced, len(products))),
+            'newest': ordered(lambda wc_id: (newest_key[wc_id] is None, -(newest_key[wc_id] or 0), -wc_id)),
+            'rating': ordered(lambda wc_id: (wc_id not in ratings, -ratings.get(wc_id, 0), -wc_id)),
+            'popular': ordered(lambda wc_id: (-sales.get(wc_id, 0), -wc_id)),
+        }
+
+    @staticmethod
+    def _product_attribute_values(product, variation_attributes):
+        for attr in product['attributes'] or []:
+            if not isinstance(attr, dict) or not attr.get('name'):
+                continue
+            options = attr.get('options', [])
+            if isinstance(options, list):
+                for option in options:
+                    if option and isinstance(option, str):
+                        yield attr['name'], option
+        for attributes in variation_attributes.get(product['id'], ()):
+            for attr_key, attr_value in (attributes or {}).items():
+                if attr_value and isinstance(attr_value, str):
+                    yield attr_key, attr_value
+
+    def _add_attribute_value(self, name, value, bit):
+        name = clean_attribute_name(name)
+        attribute_key = attribute_filter_key(name)
+        value_key = normalize_key(value)
+        if not attribute_key or not value_key:
+            return
+        attribute = self.attributes.setdefault(attribute_key, {'name': name, 'values': {}})
+        entry = attribute['values'].setdefault(value_key, [value, 0])
+        entry[1] |= bit
+
+    # ------------------------------------------------------------------
+    # Filters
+    # ------------------------------------------------------------------
+    def price_mask(self, min_price=None, max_price=None):
+        start = bisect.bisect_left(self.prices, min_price) if min_price is not None else 0
+        end = bisect.bisect_right(self.prices, max_price) if max_price is not None else len(self.prices)
+        return _bit_range(start, end) if end > start else 0
+
+    def filter_masks(self, filters):
+        """{filter group: bitset} for every active filter"""
+        masks = {}
+        if filters.get('category_id'):
+            masks['category'] = self.categories.get(filters['category_id'], 0)
+        if filters.get('min_price') is not None or filters.get('max_price') is not None:
+            masks['price'] = self.price_mask(filters.get('min_price'), filters.get('max_price'))
+        if filters.get('on_sale'):
+            masks['on_sale'] = self.on_sale
+        if filters.get('in_stock'):
+            masks['in_stock'] = self.in_stock
+        if filters.get('min_rating'):
+            masks['rating'] = self.ratings.get(filters['min_rating'], 0)
+
+        # Keys as sent by the client (attr_Tamaño, attr_Color): same normalization as the index
+        attribute_filters = {}
+        for name, values in (filters.get('attributes') or {}).items():
+            attribute_filters.setdefault(attribute_filter_key(name), []).extend(values)
+
+        for attribute_key, values in attribute_filters.items():
+            attribute = self.attributes.get(attribute_key, {'values': {}})
+            # Valores del mismo atributo: OR; atributos distintos: AND
+            mask = 0
+            for value in values:
+                entry = attribute['values'].get(normalize_key(value))
+                if entry:
+                    mask |= entry[1]
+            masks[f'attr:{attribute_key}'] = mask
+        return masks
+
+    @staticmethod
+    def combine(masks, base, exclude=None):
+        for group, mask in masks.items():
+            if group != exclude:
+                base &= mask
+        return base
+
+    # ------------------------------------------------------------------
+    # Facets
+    # ------------------------------------------------------------------
+    def facets(self, masks, target_language):
+        """
+        Facet counts over the filtered set. Each facet ignores its own filter,
+        so the alternatives to the current selection keep their counts.
+        """
+        terms = attribute_dictionary.get_terms(target_language)
+
+        price_base = self.combine(masks, self.all, exclude='price') & _bit_range(0, len(self.prices))
+        price_ranges = []
+        for i, low in enumerate(PRICE_BUCKET_EDGES):
+            high = PRICE_BUCKET_EDGES[i + 1] if i + 1 < len(PRICE_BUCKET_EDGES) else None
+            # Rango semiabierto [low, high)
+            start = bisect.bisect_left(self.prices, low)
+            end = bisect.bisect_left(self.prices, high) if high is not None else len(self.prices)
+            count = (price_base & _bit_range(start, end)).bit_count() if end > start else 0
+            price_ranges.append({'min': low, 'max': high, 'count': count})
+
+        attributes = []
+        for attribute_key, attribute in self.attributes.items():
+            base = self.combine(masks, self.all, exclude=f'attr:{attribute_key}')
+            values = [
+                {
+                    'value': value,
+                    'label': attribute_dictionary.translate(value, target_language, terms),
+                    'count': (mask & base).bit_count()
+                }
+                for value, mask in attribute['values'].values()
+            ]
+            values = [value for value in values if value['count']]
+            if not values:
+                continue
+            values.sort(key=lambda value: (-value['count'], value['label']))
+            attributes.append({
+                'key': attribute_key,
+                'name': attribute_dictionary.translate(attribute['name'], target_language, terms),
+                'values': values
+            })
+        attributes.sort(key=lambda attribute: attribute['key'])
+
+        rating_base = self.combine(masks, self.all, exclude='rating')
+        return {
+            'price': {
+                'min': self.prices[(price_base & -price_base).bit_length() - 1] if price_base else None,
+                'max': self.prices[price_base.bit_length() - 1] if price_base else None,
+                'ranges': price_ranges
+            },
+            'on_sale': (self.on_sale & self.combine(masks, self.all, exclude='on_sale')).bit_count(),
+            'in_stock': (self.in_stock & self.combine(masks, self.all, exclude='in_stock')).bit_count(),
+            'rating': [
+                {'min_rating': threshold, 'count': (self.ratings[threshold] & rating_base).bit_count()}
+                for threshold in RATING_THRESHOLDS
+            ],
+            'attributes': attributes
+        }
+
+    # ------------------------------------------------------------------
+    # Listing
+    # ------------------------------------------------------------------
+    def page(self, selected, sort_by, offset, limit):
+        """wc_ids of one page of the selected set, in sort order"""
+        if not selected or limit <= 0:
+            return []
+        # bits[i] == '1' <=> la posición i está seleccionada
+        bits = bin(selected)[:1:-1]
+        size = len(bits)
+        wc_ids = []
+        skipped = 0
+        for position in self.orders.get(sort_by, self.orders['default']):
+            if position >= size or bits[position] != '1':
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            wc_ids.append(self.wc_ids[position])
+            if len(wc_ids) >= limit:
+                break
+        return wc_ids
+
+
+class FacetIndex:
+    """
+    In-process facet index of the published catalog.
+    """
+
+    # Seconds between catalog version checks (keeps lookups off Redis)
+    VERSION_CHECK_INTERVAL = 5
+
+    # Without Redis the versions can't be read: rebuild after this (seconds)
+    FALLBACK_TTL = 300
+
+    # Stock, prices, ratings and sales reach the index within this (seconds)
+    MAX_AGE = 300
+
+    def __init__(self):
+        self._snapshot = None  # (versions, built_at, _CatalogFacets)
+        self._versions = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        # Single-flight: only one thread builds a snapshot at a time
+        self._build_lock = threading.Lock()
+
+    def _current_versions(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.VERSION_CHECK_INTERVAL:
+            self._versions = get_versions([CATALOG_GENERATION_SCOPE])
+            self._checked_at = now
+        return self._versions
+
+    def _is_fresh(self, entry, versions):
+        built_versions, built_at, _ = entry
+        age = time.monotonic() - built_at
+        if versions is None:
+            return age < self.FALLBACK_TTL
+        return versions == built_versions and age < self.MAX_AGE
+
+    def _build(self):
+        from ..models import ProductPopularity, ProductReviewSummary, WooCommerceProduct, WooCommerceProductVariation
+
+        products = list(
+            WooCommerceProduct.objects.filter(status='publish').values(
+                'id', 'wc_id', 'final_price', 'on_sale', 'stock_status', 'date_created_wc', 'attributes'
+            )
+        )
+
+        categories = defaultdict(list)
+        for product_id, category_wc_id in WooCommerceProduct.categories.through.objects.filter(
+            woocommerceproduct__status='publish'
+        ).values_list('woocommerceproduct_id', 'woocommercecategory__wc_id'):
+            categories[product_id].append(category_wc_id)
+
+        variation_attributes = defaultdict(list)
+        for product_id, attributes in WooCommerceProductVariation.objects.filter(
+            status='publish',
+            product__status='publish'
+        ).values_list('product_id', 'attributes'):
+            variation_attributes[product_id].append(attributes)
+
+        ratings = {
+            product_id: float(average_rating)
+            for product_id, average_rating in ProductReviewSummary.objects.filter(
+                review_count__gt=0
+            ).values_list('woocommerce_product_id', 'average_rating')
+        }
+        sales = dict(ProductPopularity.objects.filter(units_sold__gt=0).values_list('wc_id', 'units_sold'))
+
+        return _CatalogFacets(products, categories, variation_attributes, ratings, sales)
+
+    def get_snapshot(self):
+        versions = self._current_versions()
+        with self._lock:
+            entry = self._snapshot
+
+        if entry is not None:
+            if self._is_fresh(entry, versions):
+                return entry[2]
+            # Stale: if another thread is already rebuilding, serve the old copy
+            if not self._build_lock.acquire(blocking=False):
+                return entry[2]
+        else:
+            # Nothing to serve yet: wait for the build in progress (if any)
+            self._build_lock.acquire()
+
+        try:
+            with self._lock:
+                entry = self._snapshot
+            if entry is not None and self._is_fresh(entry, versions):
+                return entry[2]
+
+            started = time.monotonic()
+            snapshot = self._build()
+            with self._lock:
+                self._snapshot = (versions, time.monotonic(), snapshot)
+            logger.info(
+                f"🧮 Facet index built: {len(snapshot.wc_ids)} products, {len(snapshot.attributes)} attributes "
+                f"in {(time.monotonic() - started) * 1000:.0f} ms"
+            )
+            return snapshot
+        finally:
+            self._build_lock.release()
+
+    def query(self, filters, sort_by='default', offset=0, limit=20, target_language='es', include_facets=True):
+        """
+        Filter, sort and page the catalog.
+
+        Args:
+            filters: {'category_id', 'min_price', 'max_price', 'on_sale', 'in_stock',
+                      'min_rating', 'attributes': {attribute key: [values]}}
+            sort_by: One of SORT_OPTIONS
+
+        Returns:
+            dict: {'wc_ids': page wc_ids in order, 'total', 'facets'}
+        """
+        snapshot = self.get_snapshot()
+        masks = snapshot.filter_masks(filters)
+        selected = snapshot.combine(masks, snapshot.all)
+
+        return {
+            'wc_ids': snapshot.page(selected, sort_by, offset, limit),
+            'total': selected.bit_count(),
+            'facets': snapshot.facets(masks, target_language) if include_facets else None
+        }
+
+    def invalidate(self):
+        """Drop this process' snapshot (rebuilt on next query)"""
+        with self._lock:
+            self._snapshot = None
+        self._checked_at = None
+
+
+# Singleton instance (one copy per process)
+facet_index = FacetIndex()
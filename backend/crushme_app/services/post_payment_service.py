@@ -0,0 +1,278 @@
+"""
+Post-Payment Service
+Side effects that run after a payment is confirmed (emails, feed entries and
+the WooCommerce push). They run as Huey tasks enqueued on commit, keyed by
+Order.transaction_id, and are safe to run more than once.
+"""
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Order, Feed
+from .email_service import email_service
+from .woocommerce_order_service import woocommerce_order_service
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+# Dropshipping product: billed as shipping, hidden from customers
+DROPSHIPPING_PRODUCT_ID = 48500
+
+
+class PostPaymentService:
+    """
+    Servicio para los efectos secundarios de una orden pagada.
+    """
+
+    @staticmethod
+    def _is_dropshipping(item):
+        return (
+            item.get('woocommerce_product_id') == DROPSHIPPING_PRODUCT_ID or
+            'dropshipping' in item.get('product_name', '').lower()
+        )
+
+    def build_email_context(self, items, shipping_cost, total_amount, currency):
+        """
+        Formatted amounts and items for the order confirmation email.
+        Dropshipping products are added to the shipping cost.
+
+        Args:
+            items: Order items from the request
+            shipping_cost: Shipping cost
+            total_amount: Order total (items + shipping)
+            currency: 'COP' (no decimals) or 'USD' (2 decimals)
+
+        Returns:
+            dict: total, subtotal, shipping, currency, items
+        """
+        def fmt(amount):
+            if currency == 'COP':
+                return f"{int(round(amount))}"
+            return f"{round(amount, 2):.2f}"
+
+        email_items = []
+        dropshipping_cost = 0
+        subtotal = 0
+
+        for item in items:
+            amount = float(item['unit_price']) * item['quantity']
+            if self._is_dropshipping(item):
+                dropshipping_cost += amount
+                logger.info(f"📦 Dropshipping product found: {item['product_name']} - Adding ${dropshipping_cost} to shipping")
+                continue
+
+            subtotal += amount
+            email_items.append({
+                'name': item.get('product_name', 'Product'),
+                'quantity': item['quantity'],
+                'price': fmt(float(item['unit_price']))
+            })
+
+        return {
+            'total': fmt(total_amount),
+            'subtotal': fmt(subtotal),
+            'shipping': fmt(shipping_cost + dropshipping_cost),
+            'currency': currency,
+            'items': email_items
+        }
+
+    def enqueue(self, order, lang, email_context, shipping_cost_cents, create_feed=True):
+        """
+        Queue the post-payment tasks once the current transaction commits.
+        """
+        from ..tasks import push_order_to_woocommerce, send_order_notifications
+
+        transaction_id = order.transaction_id
+
+        def enqueue_tasks():
+            send_order_notifications(transaction_id, lang, email_context, create_feed)
+            push_order_to_woocommerce(transaction_id, shipping_cost_cents)
+            logger.info(f"📬 Post-payment tasks queued for order {order.order_number} ({transaction_id})")
+
+        transaction.on_commit(enqueue_tasks)
+
+    def send_notifications(self, transaction_id, lang, email_context, create_feed=True):
+        """
+        Send the confirmation (and gift) emails and feed entries of an order once.
+
+        Each email is its own step, recorded in Order.notification_steps
+        right after it is sent: a retry only sends the steps still missing,
+        and a worker that dies mid-send leaves the step unrecorded (so it is
+        sent again, never lost). Concurrent runs are serialized by the task
+        lock. notifications_sent_at is set once every step is done.
+
+        Returns:
+            bool: True if sent now, False if already sent
+        """
+        order = Order.objects.select_related('user').get(transaction_id=transaction_id)
+        if order.notifications_sent_at:
+            logger.info(f"⏭️ Notifications already sent for transaction {transaction_id}")
+            return False
+
+        # Confirmation and gift emails share one SMTP connection
+        with email_service.batch():
+            self._send_notifications(order, lang, email_context, create_feed)
+
+        Order.objects.filter(pk=order.pk, notifications_sent_at__isnull=True).update(
+            notifications_sent_at=timezone.now()
+        )
+        self.refresh_status(order)
+        return True
+
+    @staticmethod
+    def _run_notification_step(order, step, send):
+        """
+        Run send() unless the step was already recorded; record it on success.
+
+        Raises:
+            RuntimeError: If send() reports a failure (so the task retries)
+        """
+        if step in order.notification_steps:
+            logger.info(f"⏭️ Notification step '{step}' already sent for order {order.order_number}")
+            return
+        if not send():
+            raise RuntimeError(f"Notification step '{step}' failed for order {order.order_number}")
+        order.notification_steps[step] = timezone.now().isoformat()
+        order.save(update_fields=['notification_steps'])
+
+    def _send_notifications(self, order, lang, email_context, create_feed):
+        user = order.user
+
+        def send_confirmation():
+            # Send order confirmation to purchaser
+            sent = email_service.send_order_confirmation(
+                to_email=order.email,
+                order_number=order.order_number,
+                username=user.username,
+                lang=lang,
+                **email_context
+            )
+            if sent:
+                logger.info(f"📧 Order confirmation email sent to {order.email} (lang: {lang}, currency: {email_context['currency']})")
+                if create_feed:
+                    self._create_feed_entry(user, 'order_confirmation', lang)
+            return sent
+
+        self._run_notification_step(order, 'confirmation', send_confirmation)
+
+        # If it's a gift, send notifications
+        if not (order.is_gift and order.receiver_username):
+            return
+
+        receiver_user = User.objects.filter(username=order.receiver_username).first()
+        if receiver_user is None:
+            logger.warning(f"⚠️ Receiver user {order.receiver_username} not found for gift notifications")
+            return
+
+        def send_gift_received():
+            # Send gift received notification to receiver
+            sent = email_service.send_gift_received_notification(
+                to_email=receiver_user.email,
+                sender_username=user.username,
+                gift_message=order.gift_message or '',
+                order_number=order.order_number,
+                username=receiver_user.username,
+                lang=lang
+            )
+            if sent:
+                logger.info(f"📧 Gift received notification sent to {receiver_user.email}")
+                if create_feed:
+                    self._create_feed_entry(receiver_user, 'gift_received', lang, sender_username=user.username)
+            return sent
+
+        def send_gift_sent():
+            # Send gift sent confirmation to sender
+            sent = email_service.send_gift_sent_confirmation(
+                to_email=order.email,
+                receiver_username=receiver_user.username,
+                order_number=order.order_number,
+                username=user.username,
+                lang=lang
+            )
+            if sent:
+                logger.info(f"📧 Gift sent confirmation sent to {order.email}")
+                if create_feed:
+                    self._create_feed_entry(user, 'gift_sent', lang, receiver_username=receiver_user.username)
+            return sent
+
+        self._run_notification_step(order, 'gift_received', send_gift_received)
+        self._run_notification_step(order, 'gift_sent', send_gift_sent)
+
+    @staticmethod
+    def _create_feed_entry(user, action, lang, **kwargs):
+        try:
+            Feed.create_feed_entry(user=user, action=action, lang=lang, **kwargs)
+        except Exception as feed_error:
+            logger.error(f"Feed creation error: {str(feed_error)}")
+
+    def push_to_woocommerce(self, transaction_id, shipping_cost_cents=0):
+        """
+        Send an order to WooCommerce once (skipped if it already has a WooCommerce ID).
+
+        WooCommerce orders carry the transaction ID as meta, so an order
+        created by an attempt whose response was lost is found and linked
+        instead of created again.
+
+        Returns:
+            dict: WooCommerce result ({'success': True, 'skipped': True} if already sent)
+
+        Raises:
+            RuntimeError: If WooCommerce rejects the order (so the task retries)
+        """
+        order = Order.objects.get(transaction_id=transaction_id)
+        if order.woocommerce_order_id:
+            logger.info(f"⏭️ [WOOCOMMERCE SYNC] Order {order.order_number} already sent (WC #{order.woocommerce_order_id})")
+            return {'success': True, 'skipped': True}
+
+        # A previous attempt may have created it even if the POST timed out
+        lookup = woocommerce_order_service.find_order_by_transaction_id(order)
+        if not lookup['success']:
+            raise RuntimeError(f"WooCommerce lookup failed for order {order.order_number}: {lookup.get('error')}")
+
+        if lookup['woocommerce_order_id']:
+            logger.info(f"🔁 [WOOCOMMERCE SYNC] Order {order.order_number} found in WooCommerce (WC #{lookup['woocommerce_order_id']})")
+            wc_result = lookup
+        else:
+            logger.info(f"🔄 [WOOCOMMERCE SYNC] Sending order {order.order_number} (${order.total}, {order.city}, {order.country})")
+            wc_result = woocommerce_order_service.send_order(order, shipping_cost=shipping_cost_cents)
+
+        if not wc_result['success']:
+            logger.error(f"❌ [WOOCOMMERCE SYNC] Order {order.order_number}: {wc_result.get('error')} ({wc_result.get('details', 'N/A')})")
+            raise RuntimeError(f"WooCommerce rejected order {order.order_number}: {wc_result.get('error')}")
+
+        order.woocommerce_order_id = wc_result.get('woocommerce_order_id')
+        order.save(update_fields=['woocommerce_order_id'])
+        logger.info(
+            f"✅ [WOOCOMMERCE SYNC] Order {order.order_number} -> WC #{order.woocommerce_order_id} "
+            f"({wc_result.get('woocommerce_url', 'N/A')})"
+        )
+
+        self.refresh_status(order)
+        return wc_result
+
+    def refresh_status(self, order):
+        """Recompute Order.post_payment_status from the completed side effects"""
+        order.refresh_from_db(fields=['notifications_sent_at', 'woocommerce_order_id', 'post_payment_status'])
+        if order.notifications_sent_at and order.woocommerce_order_id:
+            new_status = Order.POST_PAYMENT_COMPLETED
+        elif order.notifications_sent_at or order.woocommerce_order_id:
+            new_status = Order.POST_PAYMENT_PROCESSING
+        else:
+            new_status = Order.POST_PAYMENT_PENDING
+
+        if new_status != order.post_payment_status:
+            order.post_payment_status = new_status
+            order.save(update_fields=['post_payment_status'])
+
+    def mark_failed(self, transaction_id, error):
+        """Retries exhausted: flag the order for manual follow-up"""
+        Order.objects.filter(transaction_id=transaction_id).exclude(
+            post_payment_status=Order.POST_PAYMENT_COMPLETED
+        ).update(post_payment_status=Order.POST_PAYMENT_FAILED)
+        logger.error(f"❌ Post-payment task failed for transaction {transaction_id}: {error}")
+
+
+# Singleton instance
+post_payment_service = PostPaymentService()
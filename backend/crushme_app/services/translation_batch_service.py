@@ -3,20 +3,29 @@ Batch Translation Service
 Pre-translates all content for fast delivery
 """
 import logging
+import time
+import zlib
 from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 
 from ..models import (
     WooCommerceProduct,
     WooCommerceCategory,
-    TranslatedContent
+    WooCommerceProductVariation,
+    TranslatedContent,
+    AttributeDictionary
 )
 from ..utils.html_helpers import (
     strip_html_tags,
     should_strip_html,
     extract_text_from_html
 )
+from ..utils.catalog_cache import bump_catalog_generation
+from ..utils.product_search import refresh_product_search_index
 from .translation_service import TranslationService
+from .translation_engine import translate_texts
+from .attribute_dictionary import attribute_dictionary, clean_attribute_name
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +66,10 @@ class TranslationBatchService:
             # Traducir productos
             self._translate_products(force_retranslate)
             
+            # Diccionario de atributos (los términos ya se tradujeron con los productos)
+            self._refresh_attribute_dictionary()
+            self._refresh_search_index()
+            
             logger.info(f"✅ Batch translation completed!")
             logger.info(f"   Products: {self.stats['products_translated']}")
             logger.info(f"   Categories: {self.stats['categories_translated']}")
@@ -64,6 +77,10 @@ class TranslationBatchService:
             logger.info(f"   Errors: {self.stats['errors']}")
             logger.info(f"   Skipped: {self.stats['skipped']}")
             
+            # Cached catalog responses must pick up the new translations
+            if self.stats['fields_translated']:
+                bump_catalog_generation()
+            
             return {
                 'success': True,
                 'stats': self.stats
@@ -77,6 +94,204 @@ class TranslationBatchService:
                 'stats': self.stats
             }
     
+    def translate_all_batched(self, force_retranslate=False, workers=None):
+        """
+        Traducir todo el contenido con el motor por lotes.
+        
+        Recoge todos los textos pendientes, traduce cada string distinto una
+        sola vez en un pool de procesos y guarda con bulk_create/bulk_update.
+        
+        Args:
+            force_retranslate: Si True, re-traduce incluso contenido ya traducido
+            workers: Procesos de traducción (default: núcleos disponibles)
+            
+        Returns:
+            dict: Estadísticas de la traducción (incluye strings/sec)
+        """
+        logger.info("🌐 Starting batched translation...")
+        started = time.monotonic()
+        self.stats.update({'unique_strings': 0, 'elapsed_seconds': 0.0, 'strings_per_second': 0.0})
+        
+        try:
+            jobs = self._collect_translation_jobs()
+            content_types = {content_type for content_type, _, _ in jobs}
+            
+            for target_lang in self.TARGET_LANGUAGES:
+                existing = {
+                    (row.content_type, row.object_id): row
+                    for row in TranslatedContent.objects.filter(
+                        target_language=target_lang,
+                        content_type__in=content_types
+                    ).only('id', 'content_type', 'object_id')
+                }
+                
+                pending = {
+                    (content_type, object_id): text
+                    for content_type, object_id, text in jobs
+                    if force_retranslate or (content_type, object_id) not in existing
+                }
+                if not pending:
+                    continue
+                
+                translations = translate_texts(
+                    pending.values(), from_code='es', to_code=target_lang, workers=workers
+                )
+                self.stats['unique_strings'] += len(translations)
+                
+                now = timezone.now()
+                to_create = []
+                to_update = []
+                for (content_type, object_id), text in pending.items():
+                    translated_text = translations.get(text)
+                    if translated_text is None:
+                        self.stats['errors'] += 1
+                        continue
+                    
+                    row = existing.get((content_type, object_id))
+                    if row is None:
+                        to_create.append(TranslatedContent(
+                            content_type=content_type,
+                            object_id=object_id,
+                            target_language=target_lang,
+                            source_language='es',
+                            source_text=text,
+                            translated_text=translated_text,
+                            translation_engine='argostranslate'
+                        ))
+                    else:
+                        row.source_language = 'es'
+                        row.source_text = text
+                        row.translated_text = translated_text
+                        row.translation_engine = 'argostranslate'
+                        row.updated_at = now
+                        to_update.append(row)
+                
+                with transaction.atomic():
+                    TranslatedContent.objects.bulk_create(to_create, batch_size=500)
+                    TranslatedContent.objects.bulk_update(
+                        to_update,
+                        ['source_language', 'source_text', 'translated_text', 'translation_engine', 'updated_at'],
+                        batch_size=500
+                    )
+                
+                written = to_create + to_update
+                self.stats['fields_translated'] += len(written)
+                self.stats['products_translated'] += len({
+                    row.object_id for row in written if row.content_type in self.PRODUCT_CONTENT_TYPES
+                })
+                self.stats['categories_translated'] += len({
+                    row.object_id for row in written if row.content_type in self.CATEGORY_CONTENT_TYPES
+                })
+            
+            self._refresh_attribute_dictionary()
+            self._refresh_search_index()
+            
+            elapsed = time.monotonic() - started
+            self.stats['elapsed_seconds'] = round(elapsed, 2)
+            self.stats['strings_per_second'] = round(self.stats['unique_strings'] / elapsed, 2) if elapsed else 0.0
+            
+            logger.info(f"✅ Batched translation completed!")
+            logger.info(f"   Unique strings: {self.stats['unique_strings']} ({self.stats['strings_per_second']} strings/sec)")
+            logger.info(f"   Total fields: {self.stats['fields_translated']}")
+            logger.info(f"   Errors: {self.stats['errors']}")
+            
+            # Cached catalog responses must pick up the new translations
+            if self.stats['fields_translated']:
+                bump_catalog_generation()
+            
+            return {
+                'success': True,
+                'stats': self.stats
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Batched translation failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'stats': self.stats
+            }
+    
+    def _refresh_attribute_dictionary(self):
+        """Reconstruir el diccionario de atributos y anotarlo en las estadísticas"""
+        result = self.build_attribute_dictionary()
+        self.stats['attribute_terms'] = result.get('terms', 0)
+        if not result['success']:
+            self.stats['errors'] += 1
+    
+    def _refresh_search_index(self):
+        """Reindexar los productos con traducciones nuevas en el índice de búsqueda"""
+        try:
+            result = refresh_product_search_index()
+            self.stats['search_indexed_products'] = result['products']
+        except Exception as e:
+            logger.error(f"❌ Search index refresh failed: {str(e)}")
+            self.stats['errors'] += 1
+    
+    PRODUCT_CONTENT_TYPES = {
+        TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
+        TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
+        TranslatedContent.CONTENT_TYPE_PRODUCT_DESC,
+    }
+    CATEGORY_CONTENT_TYPES = {
+        TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,
+        TranslatedContent.CONTENT_TYPE_CATEGORY_DESC,
+    }
+    
+    def _collect_translation_jobs(self):
+        """
+        Recoger todos los textos traducibles como (content_type, object_id, texto limpio).
+        Mismas reglas que _translate_categories/_translate_products.
+        """
+        jobs = {}
+        
+        def add(content_type, object_id, source_text):
+            text = self._clean_source_text(content_type, source_text)
+            if text:
+                jobs[(content_type, object_id)] = text
+        
+        for category in WooCommerceCategory.objects.only('wc_id', 'name', 'description'):
+            add(TranslatedContent.CONTENT_TYPE_CATEGORY_NAME, category.wc_id, category.name)
+            if category.description:
+                add(TranslatedContent.CONTENT_TYPE_CATEGORY_DESC, category.wc_id, category.description)
+        
+        products = WooCommerceProduct.objects.filter(status='publish').prefetch_related('variations')
+        for product in products:
+            add(TranslatedContent.CONTENT_TYPE_PRODUCT_NAME, product.wc_id, product.name)
+            if product.short_description:
+                add(TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC, product.wc_id, product.short_description)
+            if product.description and len(product.description) < 5000:
+                add(TranslatedContent.CONTENT_TYPE_PRODUCT_DESC, product.wc_id, product.description)
+            elif product.description:
+                self.stats['skipped'] += 1
+            if product.is_variable and product.attributes:
+                for object_id, text in self._attribute_texts(product):
+                    add(TranslatedContent.CONTENT_TYPE_VARIATION_ATTRIBUTE, object_id, text)
+        
+        logger.info(f"   Collected {len(jobs)} translatable fields")
+        return [(content_type, object_id, text) for (content_type, object_id), text in jobs.items()]
+    
+    def _clean_source_text(self, content_type, source_text):
+        """
+        Texto a traducir sin HTML (None si no queda texto).
+        """
+        if not source_text or not source_text.strip():
+            return None
+        
+        text_to_translate = source_text
+        if should_strip_html(content_type):
+            # Para nombres, quitar TODO el HTML
+            text_to_translate = strip_html_tags(source_text)
+        else:
+            # Para descripciones, extraer solo el texto pero mantener estructura
+            clean_text, has_html = extract_text_from_html(source_text)
+            if has_html:
+                text_to_translate = clean_text
+        
+        if not text_to_translate or not text_to_translate.strip():
+            return None
+        return text_to_translate
+    
     def _translate_categories(self, force_retranslate=False):
         """Traducir todas las categorías"""
         logger.info("📁 Translating categories...")
@@ -180,22 +395,9 @@ class TranslationBatchService:
             source_text: Texto original en español
             force_retranslate: Re-traducir si ya existe
         """
-        if not source_text or not source_text.strip():
-            return
-        
-        # Limpiar HTML si es necesario
-        text_to_translate = source_text
-        if should_strip_html(content_type):
-            # Para nombres, quitar TODO el HTML
-            text_to_translate = strip_html_tags(source_text)
-        else:
-            # Para descripciones, extraer solo el texto pero mantener estructura
-            clean_text, has_html = extract_text_from_html(source_text)
-            if has_html:
-                text_to_translate = clean_text
-        
-        # Si después de limpiar no hay texto, salir
-        if not text_to_translate or not text_to_translate.strip():
+        # Limpiar HTML si es necesario (si después de limpiar no hay texto, salir)
+        text_to_translate = self._clean_source_text(content_type, source_text)
+        if not text_to_translate:
             return
         
         for target_lang in self.TARGET_LANGUAGES:
@@ -212,7 +414,10 @@ class TranslationBatchService:
                     continue
                 
                 # Traducir el texto limpio
-                temp_translator = TranslationService(target_language=target_lang)
+                temp_translator = TranslationService(
+                    target_language=target_lang,
+                    use_memory=not force_retranslate
+                )
                 translated_text = temp_translator.translate(text_to_translate, source_language='es')
                 
                 # Guardar o actualizar
@@ -245,6 +450,7 @@ class TranslationBatchService:
         """
         try:
             product = WooCommerceProduct.objects.get(wc_id=product_id)
+            fields_before = self.stats['fields_translated']
             
             # Traducir campos
             self._translate_field(
@@ -270,6 +476,9 @@ class TranslationBatchService:
                     force_retranslate
                 )
             
+            if self.stats['fields_translated'] != fields_before:
+                bump_catalog_generation()
+            
             logger.info(f"✅ Product {product_id} translated successfully")
             return True
             
@@ -289,69 +498,180 @@ class TranslationBatchService:
             force_retranslate: Re-traducir si ya existe
         """
         try:
-            # Recopilar todos los atributos únicos del producto y sus variaciones
-            unique_attributes = set()
-            unique_values = set()
+            for object_id, text in self._attribute_texts(product):
+                self._translate_field(
+                    content_type=TranslatedContent.CONTENT_TYPE_VARIATION_ATTRIBUTE,
+                    object_id=object_id,
+                    source_text=text,
+                    force_retranslate=force_retranslate
+                )
             
-            # Atributos del producto principal
-            if product.attributes:
-                for attr in product.attributes:
-                    if isinstance(attr, dict):
-                        # Nombre del atributo
-                        attr_name = attr.get('name', '')
-                        if attr_name:
-                            # Limpiar prefijos
-                            clean_name = attr_name.replace('attribute_pa_', '').replace('attribute_', '')
-                            unique_attributes.add(clean_name)
-                        
-                        # Valores del atributo
-                        options = attr.get('options', [])
-                        if isinstance(options, list):
-                            for option in options:
-                                if option and isinstance(option, str):
-                                    unique_values.add(option)
+        except Exception as e:
+            logger.error(f"Error translating attributes for product {product.wc_id}: {str(e)}")
+            self.stats['errors'] += 1
+    
+    def _attribute_texts(self, product):
+        """
+        Nombres y valores únicos de atributos de un producto variable y sus variaciones.
+        
+        Returns:
+            list: [(object_id, texto)]
+        """
+        # Recopilar todos los atributos únicos del producto y sus variaciones
+        unique_attributes = set()
+        unique_values = set()
+        
+        # Atributos del producto principal
+        if product.attributes:
+            for attr in product.attributes:
+                if isinstance(attr, dict):
+                    # Nombre del atributo
+                    attr_name = attr.get('name', '')
+                    if attr_name:
+                        # Limpiar prefijos
+                        clean_name = clean_attribute_name(attr_name)
+                        unique_attributes.add(clean_name)
+                    
+                    # Valores del atributo
+                    options = attr.get('options', [])
+                    if isinstance(options, list):
+                        for option in options:
+                            if option and isinstance(option, str):
+                                unique_values.add(option)
+        
+        # Atributos de las variaciones
+        variations = product.variations.all()
+        for variation in variations:
+            if variation.attributes:
+                for attr_key, attr_value in variation.attributes.items():
+                    # Nombre del atributo
+                    clean_key = clean_attribute_name(attr_key)
+                    unique_attributes.add(clean_key)
+                    
+                    # Valor del atributo
+                    if attr_value:
+                        unique_values.add(attr_value)
+        
+        texts = []
+        
+        # Nombres y valores comparten vocabulario: cada texto se traduce una sola
+        # vez para todo el catálogo (object_id estable derivado del texto)
+        for text in unique_attributes | unique_values:
+            if text and text.strip():
+                texts.append((self._attribute_object_id(text), text))
+        
+        return texts
+    
+    @staticmethod
+    def _attribute_object_id(text):
+        """object_id estable (entre procesos) para un nombre/valor de atributo"""
+        return zlib.crc32(text.encode('utf-8')) & 0x7FFFFFFF
+    
+    def _attribute_vocabulary(self):
+        """
+        Todos los nombres (limpios) y valores de atributos del catálogo publicado.
+        
+        Returns:
+            set: Textos originales
+        """
+        vocabulary = set()
+        
+        product_attributes = WooCommerceProduct.objects.filter(
+            status='publish',
+            product_type=WooCommerceProduct.TYPE_VARIABLE
+        ).values_list('attributes', flat=True)
+        for attributes in product_attributes:
+            for attr in attributes or []:
+                if not isinstance(attr, dict):
+                    continue
+                if attr.get('name'):
+                    vocabulary.add(clean_attribute_name(attr['name']))
+                options = attr.get('options', [])
+                if isinstance(options, list):
+                    vocabulary.update(option for option in options if option and isinstance(option, str))
+        
+        variation_attributes = WooCommerceProductVariation.objects.filter(
+            status='publish'
+        ).values_list('attributes', flat=True)
+        for attributes in variation_attributes:
+            for attr_key, attr_value in (attributes or {}).items():
+                vocabulary.add(clean_attribute_name(attr_key))
+                if attr_value and isinstance(attr_value, str):
+                    vocabulary.add(attr_value)
+        
+        return {text for text in vocabulary if text and text.strip()}
+    
+    def build_attribute_dictionary(self, force_retranslate=False):
+        """
+        Construir el diccionario de atributos de todo el catálogo.
+        
+        Traduce los términos que falten (una fila VARIATION_ATTRIBUTE por texto)
+        y guarda una fila AttributeDictionary por idioma con {original: traducción}.
+        Los workers la cargan en memoria (services.attribute_dictionary).
+        
+        Args:
+            force_retranslate: Re-traducir términos ya traducidos
             
-            # Atributos de las variaciones
-            variations = product.variations.all()
-            for variation in variations:
-                if variation.attributes:
-                    for attr_key, attr_value in variation.attributes.items():
-                        # Nombre del atributo
-                        clean_key = attr_key.replace('attribute_pa_', '').replace('attribute_', '')
-                        unique_attributes.add(clean_key)
-                        
-                        # Valor del atributo
-                        if attr_value:
-                            unique_values.add(attr_value)
+        Returns:
+            dict: {'success', 'terms', 'translated', 'changed'}
+        """
+        logger.info("📖 Building attribute dictionary...")
+        
+        try:
+            vocabulary = self._attribute_vocabulary()
+            fields_before = self.stats['fields_translated']
             
-            # Traducir nombres de atributos
-            for attr_name in unique_attributes:
-                if attr_name and attr_name.strip():
-                    # Usar el product ID como object_id para agrupar atributos por producto
-                    # Concatenar "attr_name_" + nombre para hacer único
-                    unique_id = hash(f"{product.wc_id}_attr_name_{attr_name}") % 2147483647
+            for text in vocabulary:
+                try:
                     self._translate_field(
                         content_type=TranslatedContent.CONTENT_TYPE_VARIATION_ATTRIBUTE,
-                        object_id=unique_id,
-                        source_text=attr_name,
+                        object_id=self._attribute_object_id(text),
+                        source_text=text,
                         force_retranslate=force_retranslate
                     )
+                except Exception:
+                    # Ya registrado por _translate_field; el término queda sin traducir
+                    self.stats['errors'] += 1
             
-            # Traducir valores de atributos
-            for attr_value in unique_values:
-                if attr_value and attr_value.strip():
-                    # Usar hash del valor para hacer único
-                    unique_id = hash(f"{product.wc_id}_attr_value_{attr_value}") % 2147483647
-                    self._translate_field(
-                        content_type=TranslatedContent.CONTENT_TYPE_VARIATION_ATTRIBUTE,
-                        object_id=unique_id,
-                        source_text=attr_value,
-                        force_retranslate=force_retranslate
-                    )
+            changed = False
+            for target_lang in self.TARGET_LANGUAGES:
+                rows = TranslatedContent.objects.filter(
+                    content_type=TranslatedContent.CONTENT_TYPE_VARIATION_ATTRIBUTE,
+                    object_id__in={self._attribute_object_id(text) for text in vocabulary},
+                    target_language=target_lang
+                ).values_list('source_text', 'translated_text')
+                terms = {
+                    source_text: translated_text
+                    for source_text, translated_text in rows
+                    if source_text in vocabulary and translated_text
+                }
+                
+                dictionary, created = AttributeDictionary.objects.get_or_create(target_language=target_lang)
+                if created or dictionary.terms != terms:
+                    dictionary.terms = terms
+                    dictionary.term_count = len(terms)
+                    dictionary.save(update_fields=['terms', 'term_count', 'updated_at'])
+                    changed = True
+                logger.info(f"   {target_lang}: {len(terms)}/{len(vocabulary)} terms")
+            
+            if changed:
+                attribute_dictionary.invalidate()
+                # Los detalles de producto cacheados llevan los atributos traducidos
+                bump_catalog_generation()
+            
+            return {
+                'success': True,
+                'terms': len(vocabulary),
+                'translated': self.stats['fields_translated'] - fields_before,
+                'changed': changed
+            }
             
         except Exception as e:
-            logger.error(f"Error translating attributes for product {product.wc_id}: {str(e)}")
-            self.stats['errors'] += 1
+            logger.error(f"❌ Attribute dictionary build failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
     
     def get_translated_text(self, content_type, object_id, target_language='en', fallback_text=''):
         """
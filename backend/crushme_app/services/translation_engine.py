@@ -0,0 +1,106 @@
+"""
+Batch Translation Engine
+Translates many strings at once across a process pool, loading the
+argostranslate model once per process instead of once per call.
+
+This module is imported by spawned worker processes, so it must not import
+Django (or anything that needs settings) at module level.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Strings sent to a worker per task
+CHUNK_SIZE = 32
+
+# Per-process translation object (set by _init_worker)
+_translation = None
+
+
+def available_cores():
+    """CPU cores this process may use"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(from_code, to_code):
+    """Load the model once per worker process"""
+    global _translation
+    import argostranslate.translate
+
+    try:
+        _translation = argostranslate.translate.get_translation_from_codes(from_code, to_code)
+    except Exception as e:
+        logger.error(f"Could not load argostranslate model {from_code} -> {to_code}: {str(e)}")
+        _translation = None
+    if _translation is None:
+        logger.error(f"No argostranslate model installed for {from_code} -> {to_code}")
+
+
+def _translate_chunk(texts):
+    """Translate a chunk of strings; None marks a failed string"""
+    if _translation is None:
+        return [None] * len(texts)
+
+    results = []
+    for text in texts:
+        try:
+            results.append(_translation.translate(text) or text)
+        except Exception as e:
+            logger.warning(f"Translation failed for text '{text[:50]}...': {str(e)}")
+            results.append(None)
+    return results
+
+
+def translate_texts(texts, from_code='es', to_code='en', workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Translate strings in batches across a process pool.
+
+    Identical strings are translated once. Longest strings are dispatched
+    first so the pool stays balanced.
+
+    Args:
+        texts: Iterable of source strings
+        from_code: Source language code
+        to_code: Target language code
+        workers: Worker processes (default: available cores)
+        chunk_size: Strings per worker task
+
+    Returns:
+        dict: {source text: translated text, or None if it failed}
+    """
+    unique = sorted(set(texts), key=len, reverse=True)
+    if not unique:
+        return {}
+
+    chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+    workers = max(1, min(workers or available_cores(), len(chunks)))
+    logger.info(f"🧠 Translating {len(unique)} unique strings ({from_code} -> {to_code}) with {workers} workers")
+
+    if workers == 1:
+        _init_worker(from_code, to_code)
+        results = map(_translate_chunk, chunks)
+        return {
+            text: translated
+            for chunk, chunk_results in zip(chunks, results)
+            for text, translated in zip(chunk, chunk_results)
+        }
+
+    # spawn: workers must not inherit the parent's DB connections or model state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(from_code, to_code)
+    ) as executor:
+        return {
+            text: translated
+            for chunk, chunk_results in zip(chunks, executor.map(_translate_chunk, chunks))
+            for text, translated in zip(chunk, chunk_results)
+        }
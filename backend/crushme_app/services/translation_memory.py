@@ -0,0 +1,194 @@
+"""
+Translation Memory
+Remembers every string translated by the neural model so each distinct text
+is translated only once across all workers.
+
+Lookup order: in-process LRU -> Redis (shared cache) -> TranslatedContent (DB).
+DB rows are found by hash bucket and matched on the source text, so texts
+whose hash prefixes collide each keep their own row.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationMemory:
+    """
+    Translation memory keyed by (source text hash, source language, target language).
+    """
+
+    # Strings kept in each process
+    LRU_SIZE = 4096
+
+    # Shared cache lifetime (seconds)
+    CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+    # Longer texts (full descriptions) stay in LRU/Redis only; they already
+    # live in TranslatedContent as pre-translated product fields
+    MAX_DB_TEXT_LENGTH = 500
+
+    # object_id is a 31-bit hash prefix: colliding texts take the next free
+    # id of their bucket (linear probing), so every text gets its own row
+    DB_BUCKET_SIZE = 4
+
+    def __init__(self, maxsize=LRU_SIZE):
+        self.maxsize = maxsize
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text, source_language, target_language):
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        return f'{source_language}:{target_language}:{digest}'
+
+    @classmethod
+    def _object_ids(cls, key):
+        """Candidate TranslatedContent ids of a text (its bucket, home slot first)"""
+        home = int(key.rsplit(':', 1)[1][:8], 16) & 0x7FFFFFFF
+        return [(home + probe) & 0x7FFFFFFF for probe in range(cls.DB_BUCKET_SIZE)]
+
+    # --- In-process LRU ---
+
+    def _lru_get(self, key):
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+            return value
+
+    def _lru_set(self, key, value):
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    # --- Shared stores ---
+
+    def _cache_get(self, key):
+        try:
+            return cache.get(f'tm:{key}')
+        except Exception as e:
+            logger.warning(f"Could not read translation memory cache: {e}")
+            return None
+
+    def _cache_set(self, key, value):
+        try:
+            cache.set(f'tm:{key}', value, self.CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not write translation memory cache: {e}")
+
+    def _bucket_rows(self, key, target_language):
+        """{object_id: row} of the text's bucket"""
+        from ..models import TranslatedContent
+
+        return {
+            row.object_id: row
+            for row in TranslatedContent.objects.filter(
+                content_type=TranslatedContent.CONTENT_TYPE_TRANSLATION_MEMORY,
+                object_id__in=self._object_ids(key),
+                target_language=target_language
+            ).only('object_id', 'source_language', 'source_text', 'translated_text')
+        }
+
+    def _db_get(self, key, text, source_language, target_language):
+        if len(text) > self.MAX_DB_TEXT_LENGTH:
+            return None
+
+        # Hash prefix collisions share the bucket: match on the text itself
+        for row in self._bucket_rows(key, target_language).values():
+            if row.source_text == text and row.source_language == source_language:
+                return row.translated_text
+        return None
+
+    def _db_set(self, key, text, source_language, target_language, translated):
+        from ..models import TranslatedContent
+
+        if len(text) > self.MAX_DB_TEXT_LENGTH:
+            return
+
+        try:
+            rows = self._bucket_rows(key, target_language)
+            for object_id in self._object_ids(key):
+                row = rows.get(object_id)
+                if row is not None:
+                    if row.source_text == text and row.source_language == source_language:
+                        return
+                    continue
+                try:
+                    with transaction.atomic():
+                        TranslatedContent.objects.create(
+                            content_type=TranslatedContent.CONTENT_TYPE_TRANSLATION_MEMORY,
+                            object_id=object_id,
+                            target_language=target_language,
+                            source_language=source_language,
+                            source_text=text,
+                            translated_text=translated,
+                            translation_engine='argostranslate'
+                        )
+                    return
+                except IntegrityError:
+                    # Another worker took this slot first (maybe with this same text)
+                    rows = self._bucket_rows(key, target_language)
+                    row = rows.get(object_id)
+                    if row is not None and row.source_text == text and row.source_language == source_language:
+                        return
+            logger.warning(f"Translation memory bucket full for {key}, not stored")
+        except Exception as e:
+            logger.warning(f"Could not store translation memory row: {e}")
+
+    # --- Public API ---
+
+    def get(self, text, source_language, target_language):
+        """Remembered translation of text, or None"""
+        key = self.make_key(text, source_language, target_language)
+
+        translated = self._lru_get(key)
+        if translated is not None:
+            return translated
+
+        translated = self._cache_get(key)
+        if translated is None:
+            translated = self._db_get(key, text, source_language, target_language)
+            if translated is not None:
+                self._cache_set(key, translated)
+
+        if translated is not None:
+            self._lru_set(key, translated)
+        return translated
+
+    def set(self, text, source_language, target_language, translated):
+        """Remember a model translation in every layer"""
+        key = self.make_key(text, source_language, target_language)
+        self._lru_set(key, translated)
+        self._cache_set(key, translated)
+        self._db_set(key, text, source_language, target_language, translated)
+
+    def get_or_translate(self, text, source_language, target_language, translate_func):
+        """
+        Return the remembered translation, or call translate_func() once and remember it.
+        Exceptions from translate_func propagate and nothing is stored.
+        """
+        translated = self.get(text, source_language, target_language)
+        if translated is not None:
+            return translated
+
+        translated = translate_func()
+        if translated:
+            self.set(text, source_language, target_language, translated)
+        return translated
+
+    def clear_local(self):
+        """Drop the in-process LRU (e.g. after fixing stored translations)"""
+        with self._lock:
+            self._lru.clear()
+
+
+# Singleton instance (one LRU per process)
+translation_memory = TranslationMemory()
@@ -6,6 +6,10 @@ Translates text between Spanish and English based on Accept-Language header
 import argostranslate.translate
 from typing import Optional
 import logging
+import resource
+import time
+
+from .translation_memory import translation_memory
 
 logger = logging.getLogger(__name__)
 
@@ -24,14 +28,17 @@ class TranslationService:
     ENGLISH = 'en'
     SUPPORTED_LANGUAGES = [SPANISH, ENGLISH]
     
-    def __init__(self, target_language: str = 'es'):
+    def __init__(self, target_language: str = 'es', use_memory: bool = True):
         """
         Initialize translator with target language.
         
         Args:
             target_language (str): Target language code ('es' or 'en')
+            use_memory (bool): Reuse/remember translations in the translation memory
+                               (False forces the model, e.g. for re-translations)
         """
         self.target_language = target_language if target_language in self.SUPPORTED_LANGUAGES else self.SPANISH
+        self.use_memory = use_memory
     
     def translate(self, text: Optional[str], source_language: str = 'auto') -> Optional[str]:
         """
@@ -90,8 +97,15 @@ class TranslationService:
             if source_language == self.target_language:
                 return text
             
-            # Traducir usando argostranslate (offline)
-            translated = argostranslate.translate.translate(text, source_language, self.target_language)
+            # Traducir usando argostranslate (offline), pasando por la memoria de traducción
+            target_language = self.target_language
+            if self.use_memory:
+                translated = translation_memory.get_or_translate(
+                    text, source_language, target_language,
+                    lambda: argostranslate.translate.translate(text, source_language, target_language)
+                )
+            else:
+                translated = argostranslate.translate.translate(text, source_language, target_language)
             
             return translated if translated else text
             
@@ -186,3 +200,59 @@ def create_translator_from_request(request) -> TranslationService:
     return TranslationService(target_language=target_lang)
 
 
+
+
+def _current_rss_mb() -> float:
+    """Resident memory of this process in MB (peak RSS if /proc is unavailable)"""
+    try:
+        with open('/proc/self/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def warm_up_translation_models(pairs=None) -> bool:
+    """
+    Load the argostranslate/CTranslate2 models up front.
+    
+    Runs in each gunicorn worker (post_worker_init) so the first translated
+    request doesn't pay the load cost. Never call it before fork():
+    CTranslate2's thread pool doesn't survive it and the child's first
+    translation hangs.
+    
+    Args:
+        pairs: (source, target) language pairs (default: settings.TRANSLATION_WARMUP_PAIRS)
+    
+    Returns:
+        bool: True if every pair was loaded
+    """
+    from django.conf import settings
+    
+    if not getattr(settings, 'TRANSLATION_WARMUP', True):
+        logger.info("🧠 Translation model warm-up disabled (TRANSLATION_WARMUP=False)")
+        return False
+    
+    pairs = pairs or getattr(settings, 'TRANSLATION_WARMUP_PAIRS', [('es', 'en'), ('en', 'es')])
+    rss_before = _current_rss_mb()
+    started = time.monotonic()
+    loaded = []
+    
+    for source_language, target_language in pairs:
+        try:
+            translation = argostranslate.translate.get_translation_from_codes(source_language, target_language)
+            if translation is None:
+                raise LookupError('model not installed')
+            # Una traducción corta fuerza la carga perezosa del modelo CTranslate2
+            translation.translate('Hola' if source_language == 'es' else 'Hello')
+            loaded.append(f'{source_language}→{target_language}')
+        except Exception as e:
+            logger.warning(f"🧠 Could not warm up {source_language}→{target_language}: {str(e)}")
+    
+    logger.info(
+        f"🧠 Translation models warmed up: {', '.join(loaded) or 'none'} "
+        f"in {time.monotonic() - started:.2f}s (RSS {rss_before:.0f} → {_current_rss_mb():.0f} MB)"
+    )
+    return len(loaded) == len(pairs)
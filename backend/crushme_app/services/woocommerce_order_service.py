@@ -7,6 +7,7 @@ import re
 from requests.auth import HTTPBasicAuth
 from django.conf import settings
 import logging
+from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +116,12 @@ class WooCommerceOrderService:
     # Fixed customer_id for your store
     STORE_CUSTOMER_ID = 659
     
+    # Order meta that links a WooCommerce order to Order.transaction_id
+    TRANSACTION_META_KEY = 'crushme_transaction_id'
+    # Lookup window before Order.created_at (clock skew between servers)
+    LOOKUP_MARGIN = timedelta(hours=1)
+    LOOKUP_MAX_PAGES = 10
+    
     def __init__(self):
         self.base_url = getattr(settings, 'WOOCOMMERCE_API_URL',
                                 'https://distrisexcolombia.com/wp-json/wc/v3')
@@ -180,6 +187,72 @@ class WooCommerceOrderService:
                 'error': str(e)
             }
     
+    def find_order_by_transaction_id(self, order):
+        """
+        Look up a WooCommerce order previously created for this order.
+        
+        WooCommerce can't filter orders by meta, so the store customer's
+        orders created since the order are listed (newest first) and matched
+        on the transaction meta. Used before creating an order, so a POST
+        that timed out after WooCommerce created it isn't sent twice.
+        
+        Args:
+            order: Order model instance
+        
+        Returns:
+            dict: {'success': True, 'woocommerce_order_id': id or None, ...}
+                  or {'success': False, 'error': ...} if the lookup failed
+        """
+        created_after = order.created_at - self.LOOKUP_MARGIN
+        params = {
+            'customer': self.STORE_CUSTOMER_ID,
+            'after': created_after.strftime('%Y-%m-%dT%H:%M:%S'),
+            'dates_are_gmt': 'true',
+            'per_page': 100,
+            '_fields': 'id,number,meta_data',
+        }
+        
+        try:
+            for page in range(1, self.LOOKUP_MAX_PAGES + 1):
+                response = requests.get(
+                    f"{self.base_url}/orders",
+                    auth=self.auth,
+                    params={**params, 'page': page},
+                    timeout=self.timeout
+                )
+                if response.status_code != 200:
+                    logger.error(f"❌ WooCommerce order lookup failed: {response.status_code} - {response.text}")
+                    return {
+                        'success': False,
+                        'error': f"API returned status {response.status_code}"
+                    }
+                
+                wc_orders = response.json()
+                for wc_order in wc_orders:
+                    for meta in wc_order.get('meta_data') or []:
+                        if meta.get('key') == self.TRANSACTION_META_KEY and meta.get('value') == order.transaction_id:
+                            return {
+                                'success': True,
+                                'woocommerce_order_id': wc_order.get('id'),
+                                'woocommerce_order_number': wc_order.get('number')
+                            }
+                
+                if len(wc_orders) < params['per_page']:
+                    return {'success': True, 'woocommerce_order_id': None}
+            
+            # Too many orders to be sure: don't risk a duplicate
+            return {
+                'success': False,
+                'error': f"More than {self.LOOKUP_MAX_PAGES} pages of orders since {params['after']}"
+            }
+        
+        except Exception as e:
+            logger.error(f"❌ Error looking up WooCommerce order: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
     def _build_order_payload(self, order, shipping_cost=None):
         """
         Build WooCommerce API payload from Order model
@@ -297,8 +370,15 @@ class WooCommerceOrderService:
             logger.info(f"📦 Added shipping_lines: {shipping_cost} for order {order.order_number}")
         
         # Add country-specific metadata
+        meta_data = []
         if shipping_address['country'] == 'CO':
-            payload['meta_data'] = self._build_colombian_metadata(order, shipping_address)
+            meta_data = self._build_colombian_metadata(order, shipping_address)
+        
+        # Link to Order.transaction_id (see find_order_by_transaction_id)
+        if order.transaction_id:
+            meta_data.append({'key': self.TRANSACTION_META_KEY, 'value': order.transaction_id})
+        if meta_data:
+            payload['meta_data'] = meta_data
         
         return payload
     
@@ -3,7 +3,12 @@ WooCommerce API integration service
 Handles connection and data fetching from WooCommerce REST API
 """
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 from django.conf import settings
 import logging
 
@@ -13,16 +18,59 @@ logger = logging.getLogger(__name__)
 class WooCommerceService:
     """
     Service class to handle WooCommerce API integration
+    
+    The default instance serves request paths (live product views, order item
+    fallback): short timeout and no retries, so a slow or rate-limited
+    WooCommerce can't hold a worker thread. Syncs and background tasks use
+    woocommerce_sync_client (for_sync=True), which retries with backoff.
     """
     
-    def __init__(self):
+    # Request paths: fail fast
+    REQUEST_TIMEOUT = 10
+    # Syncs/tasks: bulk listings can be slow, retries are cheap there
+    SYNC_TIMEOUT = 30
+    
+    def __init__(self, for_sync=False):
         self.base_url = getattr(settings, 'WOOCOMMERCE_API_URL', 'https://distrisexcolombia.com/wp-json/wc/v3')
         # Estas credenciales deberían venir de settings o variables de entorno
         # Por ahora las dejamos como placeholder
         self.consumer_key = getattr(settings, 'WOOCOMMERCE_CONSUMER_KEY', 'your_consumer_key_here')
         self.consumer_secret = getattr(settings, 'WOOCOMMERCE_CONSUMER_SECRET', 'your_consumer_secret_here')
         self.auth = HTTPBasicAuth(self.consumer_key, self.consumer_secret)
-        self.timeout = 30
+        self.for_sync = for_sync
+        self.timeout = self.SYNC_TIMEOUT if for_sync else self.REQUEST_TIMEOUT
+        self.max_concurrency = getattr(settings, 'WOOCOMMERCE_MAX_CONCURRENCY', 8)
+        self.session = self._build_session()
+    
+    def _build_session(self):
+        """
+        Pooled keep-alive session. The sync client retries with backoff on
+        429 and 5xx responses; the request-path client only retries a failed
+        connection once (nothing was sent, so it costs no server time).
+        """
+        session = requests.Session()
+        session.auth = self.auth
+        
+        if self.for_sync:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        else:
+            retry = Retry(total=1, connect=1, read=0, status=0)
+        # Un pool lo bastante grande para las descargas concurrentes
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(self.max_concurrency, 10),
+            max_retries=retry
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
     
     def _make_request(self, endpoint, params=None):
         """
@@ -31,16 +79,14 @@ class WooCommerceService:
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
-                auth=self.auth,
                 params=params,
                 timeout=self.timeout
             )
             
             # Log de la respuesta para debugging
-            logger.info(f"WooCommerce API request to: {url}")
-            logger.info(f"Response status: {response.status_code}")
+            logger.debug(f"WooCommerce API {response.status_code}: {url} {params or ''}")
             
             if response.status_code == 200:
                 return {
@@ -80,32 +126,160 @@ class WooCommerceService:
                 'status_code': None
             }
     
-    def get_products(self, category_id=None, per_page=100, page=1):
+    @staticmethod
+    def _total_pages(result):
         """
-        Get products from WooCommerce
+        Read X-WP-TotalPages from a successful response (None if missing)
+        """
+        for name, value in (result.get('headers') or {}).items():
+            if name.lower() == 'x-wp-totalpages':
+                try:
+                    return int(value)
+                except (TypeError, ValueError):
+                    return None
+        return None
+    
+    def iter_pages(self, endpoint, params=None, max_workers=None):
+        """
+        Iterate over every page of a paginated endpoint.
+        
+        The first page is fetched alone to read X-WP-TotalPages; the remaining
+        pages are downloaded in parallel (bounded by max_workers) and yielded
+        in page order. If the header is missing, pages are fetched sequentially
+        until a short page is returned.
         
         Args:
-            category_id (int, optional): Category ID to filter products
-            per_page (int): Number of products per page (max 100)
-            page (int): Page number for pagination
+            endpoint (str): API endpoint (e.g. 'products')
+            params (dict, optional): Query parameters (per_page, filters...)
+            max_workers (int, optional): Concurrency limit (default WOOCOMMERCE_MAX_CONCURRENCY)
         
-        Returns:
-            dict: API response with products data
+        Yields:
+            tuple: (page, result) where result is the _make_request() dict
         """
-        # Hacer petición directa a WooCommerce
+        params = dict(params or {})
+        per_page = params.get('per_page', 10)
+        
+        first = self._make_request(endpoint, {**params, 'page': 1})
+        yield 1, first
+        if not first['success'] or not first['data']:
+            return
+        
+        total_pages = self._total_pages(first)
+        
+        if total_pages is None:
+            # Sin cabecera: paginación secuencial clásica
+            page, result = 1, first
+            while len(result['data']) >= per_page:
+                page += 1
+                result = self._make_request(endpoint, {**params, 'page': page})
+                yield page, result
+                if not result['success'] or not result['data']:
+                    return
+            return
+        
+        if total_pages <= 1:
+            return
+        
+        pages = range(2, total_pages + 1)
+        workers = max(1, min(max_workers or self.max_concurrency, len(pages)))
+        logger.info(f"Fetching {len(pages)} more pages of '{endpoint}' with {workers} workers")
+        
+        yield from self._bounded_map(
+            lambda page: self._make_request(endpoint, {**params, 'page': page}),
+            pages,
+            workers
+        )
+    
+    def map_concurrent(self, func, items, max_workers=None):
+        """
+        Run func(item) for every item with bounded concurrency over the pooled session.
+        
+        Yields:
+            tuple: (item, func(item)) in input order
+        """
+        items = list(items)
+        if not items:
+            return
+        
+        workers = max(1, min(max_workers or self.max_concurrency, len(items)))
+        yield from self._bounded_map(func, items, workers)
+    
+    @staticmethod
+    def _bounded_map(func, items, workers):
+        """
+        Yield (item, func(item)) in input order, with at most 2 * workers calls
+        submitted ahead of the consumer. If the consumer stops early (error,
+        break), queued calls are cancelled instead of downloaded.
+        """
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending = deque()
+        remaining = iter(items)
+        try:
+            for item in islice(remaining, workers * 2):
+                pending.append((item, executor.submit(func, item)))
+            while pending:
+                item, future = pending.popleft()
+                result = future.result()
+                for next_item in islice(remaining, 1):
+                    pending.append((next_item, executor.submit(func, next_item)))
+                yield item, result
+        finally:
+            # In-flight calls finish in the background; the rest never start
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _products_params(self, category_id=None, per_page=100, modified_after=None, fields=None, include=None):
         params = {
             'per_page': min(per_page, 100),  # WooCommerce max is 100
-            'page': page,
             'status': 'publish'  # Only published products
         }
         
         if category_id:
             params['category'] = category_id
         
+        if modified_after:
+            params['modified_after'] = modified_after.strftime('%Y-%m-%dT%H:%M:%S')
+        
+        if fields:
+            params['_fields'] = ','.join(fields)
+        
+        if include:
+            params['include'] = ','.join(str(product_id) for product_id in include)
+        
+        return params
+    
+    def get_products(self, category_id=None, per_page=100, page=1, modified_after=None, fields=None):
+        """
+        Get products from WooCommerce
+        
+        Args:
+            category_id (int, optional): Category ID to filter products
+            per_page (int): Number of products per page (max 100)
+            page (int): Page number for pagination
+            modified_after (datetime, optional): Only products modified after this date (store time)
+            fields (list, optional): Restrict the response to these fields (e.g. ['id'])
+        
+        Returns:
+            dict: API response with products data
+        """
+        # Hacer petición directa a WooCommerce
+        params = self._products_params(category_id, per_page, modified_after, fields)
+        params['page'] = page
+        
         result = self._make_request('products', params)
         
         return result
     
+    def iter_product_pages(self, category_id=None, per_page=100, modified_after=None, fields=None, include=None):
+        """
+        Iterate over all product pages (concurrent after the first page).
+        See get_products() for the arguments and iter_pages() for the yielded values.
+        
+        Args:
+            include (list, optional): Restrict the listing to these product IDs
+        """
+        params = self._products_params(category_id, per_page, modified_after, fields, include)
+        return self.iter_pages('products', params)
+    
     def get_categories(self, per_page=100, page=1):
         """
         Get product categories from WooCommerce
@@ -128,6 +302,16 @@ class WooCommerceService:
         
         return result
     
+    def iter_category_pages(self, per_page=100):
+        """
+        Iterate over all category pages (concurrent after the first page).
+        """
+        params = {
+            'per_page': per_page,
+            'hide_empty': False
+        }
+        return self.iter_pages('products/categories', params)
+    
     def get_product_by_id(self, product_id, params=None):
         """
         Get a specific product by ID
@@ -171,6 +355,27 @@ class WooCommerceService:
         }
         return self._make_request(f'products/{product_id}/variations', params)
     
+    def get_all_product_variations(self, product_id, per_page=100):
+        """
+        Get every variation of a product across all pages
+        
+        Returns:
+            dict: {'success': bool, 'data': [...variations], 'error': ...}
+        """
+        variations = []
+        for page, result in self.iter_pages(f'products/{product_id}/variations', {'per_page': min(per_page, 100)}):
+            if not result['success']:
+                return {
+                    'success': False,
+                    'error': result.get('error'),
+                    'data': variations
+                }
+            variations.extend(result['data'])
+        return {
+            'success': True,
+            'data': variations
+        }
+    
     def get_product_variation_by_id(self, product_id, variation_id):
         """
         Get a specific variation of a product
@@ -188,4 +393,7 @@ class WooCommerceService:
 # Singleton instance
 woocommerce_service = WooCommerceService()
 
+# Client for syncs and background tasks (retries with backoff, longer timeout)
+woocommerce_sync_client = WooCommerceService(for_sync=True)
+
 
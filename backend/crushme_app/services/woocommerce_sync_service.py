@@ -3,8 +3,10 @@ WooCommerce Synchronization Service
 Syncs products, categories, and variations from WooCommerce to local database
 """
 import logging
-from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.db import transaction
+from django.db.models import Max
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import make_aware, is_naive
 from django.utils import timezone
@@ -16,7 +18,9 @@ from ..models import (
     WooCommerceProductVariation,
     ProductSyncLog
 )
-from .woocommerce_service import woocommerce_service
+from .woocommerce_service import woocommerce_sync_client
+from ..utils.margin_index import materialize_final_prices
+from ..utils.catalog_cache import bump_catalog_generation
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +30,19 @@ class WooCommerceSyncService:
     Service to synchronize WooCommerce data to local database.
     """
     
+    # The removal check refuses to run when the remote id listing has fewer
+    # products than this fraction of the local published catalog (an empty or
+    # truncated listing would otherwise trash live products)
+    MIN_REMOTE_LISTING_RATIO = 0.5
+    
+    # Products missing from the listing are looked up again in chunks of this size
+    REMOVAL_CONFIRM_CHUNK_SIZE = 100
+    
     def __init__(self):
-        self.wc_service = woocommerce_service
+        self.wc_service = woocommerce_sync_client
+        self.products_fetch_failed = False
+        self.products_written = 0
+        self.products_changed = 0
         self.sync_log = None
     
     def sync_all(self):
@@ -53,6 +68,10 @@ class WooCommerceSyncService:
             variations_count = self.sync_variations()
             logger.info(f"✅ Synced {variations_count} variations")
             
+            # Record the high-watermark so incremental syncs can start from here
+            # (not after a partial product listing: missing pages would be skipped)
+            if not self.products_fetch_failed:
+                self.sync_log.date_modified_wc = self._current_watermark()
             self.sync_log.mark_completed(status='success')
             logger.info(f"🎉 Full sync completed successfully!")
             
@@ -74,25 +93,228 @@ class WooCommerceSyncService:
                 'log_id': self.sync_log.id
             }
     
+    def sync_incremental(self):
+        """
+        Incremental synchronization: only products modified since the last
+        successful sync (high-watermark), their variations, and removals.
+        
+        Falls back to a full sync when there is no watermark yet.
+        """
+        watermark = ProductSyncLog.get_watermark()
+        if watermark is None:
+            watermark = WooCommerceProduct.objects.aggregate(
+                latest=Max('date_modified_wc')
+            )['latest']
+        
+        if watermark is None:
+            logger.info("No sync watermark found, running full sync instead")
+            return self.sync_all()
+        
+        self.sync_log = ProductSyncLog.objects.create(
+            sync_type=ProductSyncLog.SYNC_TYPE_INCREMENTAL
+        )
+        
+        try:
+            # Small overlap: modified_after is exclusive and has 1s resolution
+            modified_after = watermark - timedelta(seconds=1)
+            logger.info(f"🔄 Starting incremental sync (modified after {modified_after})...")
+            
+            modified_ids = []
+            products_count = self.sync_products(
+                modified_after=modified_after,
+                synced_ids=modified_ids
+            )
+            
+            # Variations of the modified variable products only
+            variations_count = 0
+            if modified_ids:
+                variations_count = self.sync_variations(product_wc_ids=modified_ids)
+            
+            removed_count = self.sync_removed_products()
+            
+            # Keep the old watermark if a page could not be fetched, so it is retried
+            if self.products_fetch_failed:
+                self.sync_log.date_modified_wc = watermark
+            else:
+                self.sync_log.date_modified_wc = self._current_watermark() or watermark
+            self.sync_log.products_removed = removed_count
+            self.sync_log.mark_completed(status='success')
+            logger.info(
+                f"✅ Incremental sync done: {products_count} products "
+                f"({self.products_written} written, {self.products_changed} changed), "
+                f"{variations_count} variations, {removed_count} removed"
+            )
+            
+            return {
+                'success': True,
+                'products': products_count,
+                'products_written': self.products_written,
+                'products_changed': self.products_changed,
+                'variations': variations_count,
+                'removed': removed_count,
+                'modified_after': modified_after.isoformat(),
+                'log_id': self.sync_log.id
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Incremental sync failed: {str(e)}")
+            self.sync_log.add_error(str(e))
+            self.sync_log.mark_completed(status='failed')
+            return {
+                'success': False,
+                'error': str(e),
+                'log_id': self.sync_log.id
+            }
+    
+    def _current_watermark(self):
+        """
+        Latest WooCommerce date_modified stored locally.
+        """
+        return WooCommerceProduct.objects.aggregate(latest=Max('date_modified_wc'))['latest']
+    
+    def sync_removed_products(self):
+        """
+        Detect products deleted/unpublished in WooCommerce with an id-only listing
+        and hide them locally (status='trash') in a single UPDATE.
+        
+        Pages of the listing can shift while it is fetched, so products missing
+        from it are looked up again by ID before being removed.
+        
+        Returns:
+            int: Number of local products marked as removed
+        """
+        logger.info("🗑️ Checking for removed products...")
+        remote_ids = set()
+        
+        for page, result in self.wc_service.iter_product_pages(fields=['id']):
+            if not result['success']:
+                # Never mark anything as removed from a partial listing
+                logger.error(f"Failed to fetch product ids page {page}, skipping removal check")
+                return 0
+            
+            remote_ids.update(item['id'] for item in result['data'])
+        
+        published_count = WooCommerceProduct.objects.filter(status='publish').count()
+        if not remote_ids or len(remote_ids) < published_count * self.MIN_REMOTE_LISTING_RATIO:
+            logger.error(
+                f"Product id listing returned {len(remote_ids)} products for "
+                f"{published_count} published locally, skipping removal check"
+            )
+            if self.sync_log:
+                self.sync_log.add_error(
+                    f"Removal check skipped: {len(remote_ids)} remote ids, {published_count} published"
+                )
+            return 0
+        
+        missing_ids = sorted(set(
+            WooCommerceProduct.objects.filter(status='publish').values_list('wc_id', flat=True)
+        ) - remote_ids)
+        for i in range(0, len(missing_ids), self.REMOVAL_CONFIRM_CHUNK_SIZE):
+            chunk = missing_ids[i:i + self.REMOVAL_CONFIRM_CHUNK_SIZE]
+            for page, result in self.wc_service.iter_product_pages(fields=['id'], include=chunk):
+                if not result['success']:
+                    logger.error("Failed to confirm missing product ids, skipping removal check")
+                    return 0
+                remote_ids.update(item['id'] for item in result['data'])
+        missing_ids = [wc_id for wc_id in missing_ids if wc_id not in remote_ids]
+        
+        removed_count = WooCommerceProduct.objects.filter(
+            status='publish',
+            wc_id__in=missing_ids
+        ).update(status='trash', synced_at=timezone.now()) if missing_ids else 0
+        
+        if removed_count:
+            logger.info(f"  Marked {removed_count} products as removed")
+            bump_catalog_generation()
+        
+        return removed_count
+    
+    def sync_single_product(self, wc_id, product_data=None):
+        """
+        Upsert a single product (categories, images and variations) from WooCommerce.
+        Used by the product webhooks.
+        
+        Args:
+            wc_id: WooCommerce product ID
+            product_data: Product payload; fetched from the API if None
+        
+        Returns:
+            dict: {'success', 'action', 'variations', 'category_wc_ids'} where
+                  category_wc_ids has the old and new categories of the product
+        """
+        old_categories = set(
+            WooCommerceCategory.objects.filter(products__wc_id=wc_id).values_list('wc_id', flat=True)
+        )
+        
+        if product_data is None:
+            result = self.wc_service.get_product_by_id(wc_id)
+            if not result['success']:
+                if result.get('status_code') == 404:
+                    return self.remove_product(wc_id)
+                return {
+                    'success': False,
+                    'error': result.get('error')
+                }
+            product_data = result['data']
+        
+        self._sync_products_page([product_data])
+        
+        variations_count = 0
+        if product_data.get('type') == WooCommerceProduct.TYPE_VARIABLE:
+            product = WooCommerceProduct.objects.only('id', 'wc_id', 'name').get(wc_id=wc_id)
+            result = self.wc_service.get_all_product_variations(wc_id)
+            if result['success']:
+                variations_count = self._sync_variations_batch({product: result['data']})
+            else:
+                logger.error(f"Failed to fetch variations for product {wc_id}")
+        
+        materialize_final_prices(wc_ids=[wc_id])
+        
+        new_categories = {cat['id'] for cat in product_data.get('categories') or []}
+        logger.info(f"🔁 Product {wc_id} synced ({variations_count} variations)")
+        
+        return {
+            'success': True,
+            'action': 'upserted',
+            'variations': variations_count,
+            'category_wc_ids': sorted(old_categories | new_categories)
+        }
+    
+    def remove_product(self, wc_id):
+        """
+        Hide a product deleted in WooCommerce (status='trash').
+        
+        Returns:
+            dict: Same shape as sync_single_product()
+        """
+        category_wc_ids = sorted(
+            WooCommerceCategory.objects.filter(products__wc_id=wc_id).values_list('wc_id', flat=True)
+        )
+        removed = WooCommerceProduct.objects.filter(wc_id=wc_id).update(
+            status='trash', synced_at=timezone.now()
+        )
+        logger.info(f"🗑️ Product {wc_id} removed ({removed} rows)")
+        
+        return {
+            'success': True,
+            'action': 'removed',
+            'variations': 0,
+            'category_wc_ids': category_wc_ids
+        }
+    
     def sync_categories(self):
         """
         Sync all categories from WooCommerce.
         """
         logger.info("📁 Syncing categories...")
         synced_count = 0
-        page = 1
-        per_page = 100
         
-        while True:
-            result = self.wc_service.get_categories(per_page=per_page, page=page)
-            
+        for page, result in self.wc_service.iter_category_pages():
             if not result['success']:
                 logger.error(f"Failed to fetch categories page {page}")
-                break
+                continue
             
             categories = result['data']
-            if not categories:
-                break
             
             for cat_data in categories:
                 try:
@@ -102,11 +324,6 @@ class WooCommerceSyncService:
                     logger.error(f"Error syncing category {cat_data.get('id')}: {str(e)}")
                     if self.sync_log:
                         self.sync_log.add_error(f"Category {cat_data.get('id')}: {str(e)}")
-            
-            if len(categories) < per_page:
-                break
-            
-            page += 1
         
         # Update parent relationships after all categories are synced
         self._update_category_parents()
@@ -115,6 +332,9 @@ class WooCommerceSyncService:
             self.sync_log.categories_synced = synced_count
             self.sync_log.save()
         
+        if synced_count:
+            bump_catalog_generation()
+        
         return synced_count
     
     @transaction.atomic
@@ -156,48 +376,308 @@ class WooCommerceSyncService:
             except WooCommerceCategory.DoesNotExist:
                 logger.warning(f"Parent category {category.wc_parent_id} not found for {category.name}")
     
-    def sync_products(self):
+    def sync_products(self, modified_after=None, synced_ids=None):
         """
         Sync all products from WooCommerce.
+        
+        Args:
+            modified_after: Only sync products modified after this datetime (incremental)
+            synced_ids: Optional list that receives the WooCommerce IDs of products
+                        written or whose date_modified advanced
+        
+        Returns:
+            int: Products fetched and processed. self.products_written (rows
+                 created or with changed fields/categories/images) and
+                 self.products_changed (created or date_modified advanced)
+                 hold the detail; only those bump the catalog generation.
         """
         logger.info("📦 Syncing products...")
         synced_count = 0
-        page = 1
-        per_page = 100
+        self.products_fetch_failed = False
+        self.products_written = 0
+        self.products_changed = 0
+        touched_ids = set()
         
-        while True:
-            result = self.wc_service.get_products(per_page=per_page, page=page)
-            
+        # Pages are downloaded concurrently; DB writes stay on this thread
+        for page, result in self.wc_service.iter_product_pages(modified_after=modified_after):
             if not result['success']:
                 logger.error(f"Failed to fetch products page {page}")
-                break
+                self.products_fetch_failed = True
+                if self.sync_log:
+                    self.sync_log.add_error(f"Products page {page}: {result.get('error')}")
+                continue
             
             products = result['data']
             if not products:
-                break
+                continue
             
-            for product_data in products:
-                try:
-                    self._sync_product(product_data)
-                    synced_count += 1
-                except Exception as e:
-                    logger.error(f"Error syncing product {product_data.get('id')}: {str(e)}")
-                    if self.sync_log:
-                        self.sync_log.add_error(f"Product {product_data.get('id')}: {str(e)}")
+            try:
+                # Fast path: diff the page against the DB and bulk-apply it (1 transaction)
+                page_result = self._sync_products_page(products)
+            except Exception as e:
+                # Fall back to row-by-row so one bad product doesn't lose the page
+                logger.warning(f"Bulk sync failed for page {page}, retrying product by product: {str(e)}")
+                page_result = {'written': [], 'changed': []}
+                for product_data in products:
+                    try:
+                        self._sync_product(product_data)
+                        page_result['written'].append(product_data['id'])
+                        page_result['changed'].append(product_data['id'])
+                    except Exception as e:
+                        logger.error(f"Error syncing product {product_data.get('id')}: {str(e)}")
+                        if self.sync_log:
+                            self.sync_log.add_error(f"Product {product_data.get('id')}: {str(e)}")
             
-            logger.info(f"  Synced page {page} ({len(products)} products)")
+            synced_count += len(products)
+            self.products_written += len(page_result['written'])
+            self.products_changed += len(page_result['changed'])
+            touched_ids.update(page_result['written'])
+            touched_ids.update(page_result['changed'])
             
-            if len(products) < per_page:
-                break
+            # Materialize final prices (margin applied) for the whole page in bulk
+            materialize_final_prices(wc_ids=[product_data['id'] for product_data in products])
             
-            page += 1
+            logger.info(
+                f"  Synced page {page} ({len(products)} products, "
+                f"{len(page_result['written'])} written, {len(page_result['changed'])} changed)"
+            )
+        
+        if synced_ids is not None:
+            synced_ids.extend(sorted(touched_ids))
         
         if self.sync_log:
             self.sync_log.products_synced = synced_count
             self.sync_log.save()
         
+        # Pages fetched again unchanged (e.g. the incremental overlap) keep the caches
+        if touched_ids:
+            bump_catalog_generation()
+        
         return synced_count
     
+    def _parse_wc_datetime(self, value, tz=None):
+        """
+        Parse a WooCommerce date string and make it timezone-aware
+        (in tz, or the current timezone if None).
+        """
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed and is_naive(parsed):
+            parsed = make_aware(parsed, timezone=tz)
+        return parsed
+    
+    def _product_defaults(self, product_data):
+        """
+        Map a WooCommerce product payload to WooCommerceProduct field values.
+        """
+        return {
+            'name': product_data.get('name', ''),
+            'slug': product_data.get('slug', ''),
+            'permalink': product_data.get('permalink', ''),
+            'product_type': product_data.get('type', 'simple'),
+            'short_description': product_data.get('short_description', ''),
+            'description': product_data.get('description', ''),
+            'price': product_data.get('price') or None,
+            'regular_price': product_data.get('regular_price') or None,
+            'sale_price': product_data.get('sale_price') or None,
+            'on_sale': product_data.get('on_sale', False),
+            'stock_status': product_data.get('stock_status', 'instock'),
+            'stock_quantity': product_data.get('stock_quantity'),
+            'manage_stock': product_data.get('manage_stock', False),
+            'attributes': product_data.get('attributes', []),
+            'default_attributes': product_data.get('default_attributes', []),
+            'weight': product_data.get('weight', ''),
+            'length': product_data.get('dimensions', {}).get('length', ''),
+            'width': product_data.get('dimensions', {}).get('width', ''),
+            'height': product_data.get('dimensions', {}).get('height', ''),
+            'average_rating': product_data.get('average_rating', 0),
+            'rating_count': product_data.get('rating_count', 0),
+            'total_sales': product_data.get('total_sales', 0),
+            'status': product_data.get('status', 'publish'),
+            'featured': product_data.get('featured', False),
+            'parent_id': product_data.get('parent_id', 0),
+            'date_created_wc': self._parse_wc_datetime(product_data.get('date_created')),
+            'date_modified_wc': self._parse_wc_datetime(product_data.get('date_modified')),
+        }
+    
+    @transaction.atomic
+    def _sync_products_page(self, products_data):
+        """
+        Sync a page of products with bulk statements inside one transaction.
+        
+        Diffs the page against existing rows, then applies bulk_create/bulk_update
+        for products, category links and images. Roughly a dozen statements per
+        page instead of several per product.
+        
+        Products whose mapped fields are unchanged are not rewritten, so their
+        synced_at (the search index watermark) stays put.
+        
+        Returns:
+            dict: {'written': WooCommerce IDs created or with changed fields,
+                   categories or images, 'changed': IDs created or whose
+                   date_modified advanced}
+        """
+        page = {product_data['id']: product_data for product_data in products_data}
+        now = timezone.now()
+        
+        # --- Products ---
+        existing = {
+            product.wc_id: product
+            for product in WooCommerceProduct.objects.filter(wc_id__in=page.keys())
+        }
+        to_create = []
+        to_update = []
+        written_ids = set()
+        changed_ids = []
+        update_fields = ['synced_at']
+        for wc_id, product_data in page.items():
+            defaults = self._product_defaults(product_data)
+            update_fields = list(defaults.keys()) + ['synced_at']
+            product = existing.get(wc_id)
+            if product is None:
+                to_create.append(WooCommerceProduct(wc_id=wc_id, **defaults))
+                written_ids.add(wc_id)
+                changed_ids.append(wc_id)
+            else:
+                modified = defaults['date_modified_wc']
+                if modified is None or product.date_modified_wc is None or modified > product.date_modified_wc:
+                    changed_ids.append(wc_id)
+                if self._product_fields_differ(product, defaults):
+                    for field, value in defaults.items():
+                        setattr(product, field, value)
+                    product.synced_at = now
+                    to_update.append(product)
+                    written_ids.add(wc_id)
+        
+        if to_create:
+            WooCommerceProduct.objects.bulk_create(to_create)
+        if to_update:
+            WooCommerceProduct.objects.bulk_update(to_update, update_fields)
+        
+        # bulk_create doesn't return PKs on every backend (MySQL), so map them once
+        product_pks = dict(
+            WooCommerceProduct.objects.filter(wc_id__in=page.keys()).values_list('wc_id', 'id')
+        )
+        product_wc_ids = {pk: wc_id for wc_id, pk in product_pks.items()}
+        
+        # --- Category links (through table) ---
+        # Same rule as _sync_product: only touch products that report categories
+        with_categories = {
+            wc_id: [cat['id'] for cat in product_data['categories']]
+            for wc_id, product_data in page.items()
+            if product_data.get('categories')
+        }
+        if with_categories:
+            Through = WooCommerceProduct.categories.through
+            category_pks = dict(
+                WooCommerceCategory.objects.filter(
+                    wc_id__in={cat_id for cat_ids in with_categories.values() for cat_id in cat_ids}
+                ).values_list('wc_id', 'id')
+            )
+            wanted = {
+                (product_pks[wc_id], category_pks[cat_id])
+                for wc_id, cat_ids in with_categories.items()
+                for cat_id in cat_ids
+                if cat_id in category_pks
+            }
+            current = {
+                (product_id, category_id): link_id
+                for link_id, product_id, category_id in Through.objects.filter(
+                    woocommerceproduct_id__in=[product_pks[wc_id] for wc_id in with_categories]
+                ).values_list('id', 'woocommerceproduct_id', 'woocommercecategory_id')
+            }
+            stale_links = [link_id for pair, link_id in current.items() if pair not in wanted]
+            written_ids.update(product_wc_ids[product_id] for product_id, _ in set(current) - wanted)
+            written_ids.update(product_wc_ids[product_id] for product_id, _ in wanted - set(current))
+            if stale_links:
+                Through.objects.filter(id__in=stale_links).delete()
+            new_links = [
+                Through(woocommerceproduct_id=product_id, woocommercecategory_id=category_id)
+                for product_id, category_id in wanted
+                if (product_id, category_id) not in current
+            ]
+            if new_links:
+                Through.objects.bulk_create(new_links)
+        
+        # --- Images ---
+        # Same rule as _sync_product_images: products without images keep their old ones
+        with_images = {
+            product_pks[wc_id]: product_data['images']
+            for wc_id, product_data in page.items()
+            if product_data.get('images')
+        }
+        images_synced = 0
+        if with_images:
+            current_images = {
+                (image.product_id, image.wc_id, image.position): image
+                for image in WooCommerceProductImage.objects.filter(product_id__in=with_images.keys())
+            }
+            images_to_create = []
+            images_to_update = []
+            keep = set()
+            for product_id, images_data in with_images.items():
+                for img_data in images_data:
+                    key = (product_id, img_data.get('id', 0), img_data.get('position', 0))
+                    values = {
+                        'src': img_data.get('src', ''),
+                        'thumbnail': img_data.get('thumbnail', ''),
+                        'name': img_data.get('name', ''),
+                        'alt': img_data.get('alt', ''),
+                    }
+                    image = current_images.get(key)
+                    if image is None or key in keep:
+                        images_to_create.append(WooCommerceProductImage(
+                            product_id=product_id, wc_id=key[1], position=key[2], **values
+                        ))
+                    else:
+                        keep.add(key)
+                        if any(getattr(image, field) != value for field, value in values.items()):
+                            for field, value in values.items():
+                                setattr(image, field, value)
+                            image.synced_at = now
+                            images_to_update.append(image)
+                    images_synced += 1
+            
+            stale_images = [image.id for key, image in current_images.items() if key not in keep]
+            written_ids.update(
+                product_wc_ids[key[0]] for key in current_images if key not in keep
+            )
+            written_ids.update(
+                product_wc_ids[image.product_id] for image in images_to_create + images_to_update
+            )
+            if stale_images:
+                WooCommerceProductImage.objects.filter(id__in=stale_images).delete()
+            if images_to_create:
+                WooCommerceProductImage.objects.bulk_create(images_to_create)
+            if images_to_update:
+                WooCommerceProductImage.objects.bulk_update(
+                    images_to_update, ['src', 'thumbnail', 'name', 'alt', 'synced_at']
+                )
+        
+        if self.sync_log and images_synced > 0:
+            self.sync_log.images_synced += images_synced
+            self.sync_log.save(update_fields=['images_synced'])
+        
+        logger.debug(
+            f"  Page upsert: {len(to_create)} created, {len(to_update)} updated, "
+            f"{images_synced} images, {len(written_ids)} written, {len(changed_ids)} changed"
+        )
+        return {'written': sorted(written_ids), 'changed': changed_ids}
+    
+    @staticmethod
+    def _product_fields_differ(product, defaults):
+        """Compare a payload with a stored product (values normalized like the DB column)"""
+        for field_name, value in defaults.items():
+            field = WooCommerceProduct._meta.get_field(field_name)
+            try:
+                value = field.to_python(value)
+            except Exception:
+                return True
+            if getattr(product, field_name) != value:
+                return True
+        return False
+    
     @transaction.atomic
     def _sync_product(self, product_data):
         """
@@ -205,47 +685,10 @@ class WooCommerceSyncService:
         """
         wc_id = product_data['id']
         
-        # Parse dates and make them timezone-aware
-        date_created = parse_datetime(product_data.get('date_created', '')) if product_data.get('date_created') else None
-        if date_created and is_naive(date_created):
-            date_created = make_aware(date_created)
-        
-        date_modified = parse_datetime(product_data.get('date_modified', '')) if product_data.get('date_modified') else None
-        if date_modified and is_naive(date_modified):
-            date_modified = make_aware(date_modified)
-        
         # Create/update product
         product, created = WooCommerceProduct.objects.update_or_create(
             wc_id=wc_id,
-            defaults={
-                'name': product_data.get('name', ''),
-                'slug': product_data.get('slug', ''),
-                'permalink': product_data.get('permalink', ''),
-                'product_type': product_data.get('type', 'simple'),
-                'short_description': product_data.get('short_description', ''),
-                'description': product_data.get('description', ''),
-                'price': product_data.get('price') or None,
-                'regular_price': product_data.get('regular_price') or None,
-                'sale_price': product_data.get('sale_price') or None,
-                'on_sale': product_data.get('on_sale', False),
-                'stock_status': product_data.get('stock_status', 'instock'),
-                'stock_quantity': product_data.get('stock_quantity'),
-                'manage_stock': product_data.get('manage_stock', False),
-                'attributes': product_data.get('attributes', []),
-                'default_attributes': product_data.get('default_attributes', []),
-                'weight': product_data.get('weight', ''),
-                'length': product_data.get('dimensions', {}).get('length', ''),
-                'width': product_data.get('dimensions', {}).get('width', ''),
-                'height': product_data.get('dimensions', {}).get('height', ''),
-                'average_rating': product_data.get('average_rating', 0),
-                'rating_count': product_data.get('rating_count', 0),
-                'total_sales': product_data.get('total_sales', 0),
-                'status': product_data.get('status', 'publish'),
-                'featured': product_data.get('featured', False),
-                'parent_id': product_data.get('parent_id', 0),
-                'date_created_wc': date_created,
-                'date_modified_wc': date_modified,
-            }
+            defaults=self._product_defaults(product_data)
         )
         
         action = "Created" if created else "Updated"
@@ -293,9 +736,18 @@ class WooCommerceSyncService:
             self.sync_log.images_synced += images_synced
             self.sync_log.save()
     
-    def sync_variations(self):
+    # Variable products whose variations are fetched/upserted together
+    VARIATION_BATCH_SIZE = 50
+    
+    def sync_variations(self, product_wc_ids=None):
         """
         Sync variations for all variable products.
+        
+        Products are processed in batches: the variations of a batch are
+        downloaded concurrently and written with one bulk upsert per batch.
+        
+        Args:
+            product_wc_ids: Only sync variations of these products (incremental)
         """
         logger.info("🎨 Syncing product variations...")
         synced_count = 0
@@ -303,160 +755,271 @@ class WooCommerceSyncService:
         variable_products = WooCommerceProduct.objects.filter(
             product_type=WooCommerceProduct.TYPE_VARIABLE
         )
+        if product_wc_ids is not None:
+            variable_products = variable_products.filter(wc_id__in=product_wc_ids)
         
-        logger.info(f"  Found {variable_products.count()} variable products")
+        variable_products = list(variable_products.only('id', 'wc_id', 'name'))
+        logger.info(f"  Found {len(variable_products)} variable products")
         
-        for product in variable_products:
+        for start in range(0, len(variable_products), self.VARIATION_BATCH_SIZE):
+            batch = variable_products[start:start + self.VARIATION_BATCH_SIZE]
+            
+            # Download the batch concurrently, then write it on this thread
+            fetched = {}
+            for product, result in self.wc_service.map_concurrent(
+                lambda product: self.wc_service.get_all_product_variations(product.wc_id),
+                batch
+            ):
+                if not result['success']:
+                    # Skip it: a partial listing must not delete its variations
+                    logger.error(f"Failed to fetch variations for product {product.wc_id}")
+                    if self.sync_log:
+                        self.sync_log.add_error(f"Variations for product {product.wc_id}: {result.get('error')}")
+                    continue
+                fetched[product] = result['data']
+            
+            if not fetched:
+                continue
+            
             try:
-                count = self._sync_product_variations(product)
-                synced_count += count
+                synced_count += self._sync_variations_batch(fetched)
             except Exception as e:
-                logger.error(f"Error syncing variations for product {product.wc_id}: {str(e)}")
-                if self.sync_log:
-                    self.sync_log.add_error(f"Variations for product {product.wc_id}: {str(e)}")
+                # Fall back to product by product so one bad row doesn't lose the batch
+                logger.warning(f"Bulk variation sync failed, retrying product by product: {str(e)}")
+                for product, variations in fetched.items():
+                    try:
+                        synced_count += self._sync_product_variations(product, variations)
+                    except Exception as e:
+                        logger.error(f"Error syncing variations for product {product.wc_id}: {str(e)}")
+                        if self.sync_log:
+                            self.sync_log.add_error(f"Variations for product {product.wc_id}: {str(e)}")
+            
+            # Materialize final prices for the synced variations
+            materialize_final_prices(wc_ids=[product.wc_id for product in fetched])
         
         if self.sync_log:
             self.sync_log.variations_synced = synced_count
             self.sync_log.save()
         
+        if synced_count:
+            bump_catalog_generation()
+        
         return synced_count
     
     @transaction.atomic
-    def _sync_product_variations(self, product):
+    def _sync_variations_batch(self, fetched):
+        """
+        Bulk-upsert the variations of several products and delete the stale ones.
+        
+        Args:
+            fetched: {product: [variation data from the API]}
+        
+        Returns:
+            int: Number of variations synced
+        """
+        incoming = {}
+        for product, variations in fetched.items():
+            for var_data in variations:
+                incoming[var_data['id']] = (product, var_data)
+        
+        existing = WooCommerceProductVariation.objects.in_bulk(incoming.keys(), field_name='wc_id')
+        now = timezone.now()
+        
+        to_create = []
+        to_update = []
+        update_fields = ['synced_at']
+        for wc_id, (product, var_data) in incoming.items():
+            defaults = self._variation_defaults(product, var_data)
+            update_fields = list(defaults.keys()) + ['synced_at']
+            variation = existing.get(wc_id)
+            if variation is None:
+                to_create.append(WooCommerceProductVariation(wc_id=wc_id, **defaults))
+            else:
+                for field, value in defaults.items():
+                    setattr(variation, field, value)
+                variation.synced_at = now
+                to_update.append(variation)
+        
+        if to_create:
+            WooCommerceProductVariation.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            WooCommerceProductVariation.objects.bulk_update(to_update, update_fields, batch_size=500)
+        
+        # Variations removed upstream: one DELETE for the whole batch
+        removed, _ = WooCommerceProductVariation.objects.filter(
+            product_id__in=[product.id for product in fetched]
+        ).exclude(
+            wc_id__in=incoming.keys()
+        ).delete()
+        
+        if removed:
+            logger.info(f"  Removed {removed} stale variations")
+        
+        return len(incoming)
+    
+    @transaction.atomic
+    def _sync_product_variations(self, product, variations=None):
         """
         Sync variations for a single variable product.
+        
+        Args:
+            product: Local WooCommerceProduct
+            variations: Already fetched variations data (fetched from the API if None)
         """
         synced_count = 0
-        page = 1
-        per_page = 100
-        
-        while True:
-            result = self.wc_service.get_product_variations(
-                product_id=product.wc_id,
-                per_page=per_page,
-                page=page
-            )
-            
+        
+        if variations is None:
+            result = self.wc_service.get_all_product_variations(product.wc_id)
             if not result['success']:
                 logger.error(f"Failed to fetch variations for product {product.wc_id}")
-                break
-            
             variations = result['data']
-            if not variations:
-                break
-            
-            for var_data in variations:
-                try:
-                    self._sync_variation(product, var_data)
-                    synced_count += 1
-                except Exception as e:
-                    logger.error(f"Error syncing variation {var_data.get('id')}: {str(e)}")
-            
-            if len(variations) < per_page:
-                break
-            
-            page += 1
+        
+        for var_data in variations:
+            try:
+                self._sync_variation(product, var_data)
+                synced_count += 1
+            except Exception as e:
+                logger.error(f"Error syncing variation {var_data.get('id')}: {str(e)}")
         
         logger.debug(f"  Synced {synced_count} variations for {product.name}")
         return synced_count
     
-    def _sync_variation(self, product, var_data):
+    def _variation_defaults(self, product, var_data):
         """
-        Sync a single product variation.
+        Map a WooCommerce variation payload to WooCommerceProductVariation fields.
         """
-        wc_id = var_data['id']
-        
-        # Parse dates and make them timezone-aware
-        # WooCommerce dates come as strings like "2023-09-04T17:25:53"
-        date_created_str = var_data.get('date_created', '')
-        if date_created_str:
-            date_created = parse_datetime(date_created_str)
-            if date_created and is_naive(date_created):
-                date_created = make_aware(date_created, timezone=dt_timezone.utc)
-        else:
-            date_created = None
-        
-        date_modified_str = var_data.get('date_modified', '')
-        if date_modified_str:
-            date_modified = parse_datetime(date_modified_str)
-            if date_modified and is_naive(date_modified):
-                date_modified = make_aware(date_modified, timezone=dt_timezone.utc)
-        else:
-            date_modified = None
-        
         # Parse attributes
         attributes = {}
         for attr in var_data.get('attributes', []):
             attributes[attr.get('name', '')] = attr.get('option', '')
         
-        # Create/update variation
+        return {
+            'wc_product_id': product.wc_id,
+            'product': product,
+            'permalink': var_data.get('permalink', ''),
+            'price': var_data.get('price') or None,
+            'regular_price': var_data.get('regular_price') or None,
+            'sale_price': var_data.get('sale_price') or None,
+            'on_sale': var_data.get('on_sale', False),
+            'stock_status': var_data.get('stock_status', 'instock'),
+            'stock_quantity': var_data.get('stock_quantity'),
+            'manage_stock': var_data.get('manage_stock', False),
+            'attributes': attributes,
+            'image_url': var_data.get('image', {}).get('src', '') if var_data.get('image') else '',
+            'weight': var_data.get('weight', ''),
+            'length': var_data.get('dimensions', {}).get('length', ''),
+            'width': var_data.get('dimensions', {}).get('width', ''),
+            'height': var_data.get('dimensions', {}).get('height', ''),
+            'status': var_data.get('status', 'publish'),
+            # WooCommerce dates come as strings like "2023-09-04T17:25:53"
+            'date_created_wc': self._parse_wc_datetime(var_data.get('date_created'), tz=dt_timezone.utc),
+            'date_modified_wc': self._parse_wc_datetime(var_data.get('date_modified'), tz=dt_timezone.utc),
+        }
+    
+    def _sync_variation(self, product, var_data):
+        """
+        Sync a single product variation.
+        """
         variation, created = WooCommerceProductVariation.objects.update_or_create(
-            wc_id=wc_id,
-            defaults={
-                'wc_product_id': product.wc_id,
-                'product': product,
-                'permalink': var_data.get('permalink', ''),
-                'price': var_data.get('price') or None,
-                'regular_price': var_data.get('regular_price') or None,
-                'sale_price': var_data.get('sale_price') or None,
-                'on_sale': var_data.get('on_sale', False),
-                'stock_status': var_data.get('stock_status', 'instock'),
-                'stock_quantity': var_data.get('stock_quantity'),
-                'manage_stock': var_data.get('manage_stock', False),
-                'attributes': attributes,
-                'image_url': var_data.get('image', {}).get('src', '') if var_data.get('image') else '',
-                'weight': var_data.get('weight', ''),
-                'length': var_data.get('dimensions', {}).get('length', ''),
-                'width': var_data.get('dimensions', {}).get('width', ''),
-                'height': var_data.get('dimensions', {}).get('height', ''),
-                'status': var_data.get('status', 'publish'),
-                'date_created_wc': date_created,
-                'date_modified_wc': date_modified,
-            }
+            wc_id=var_data['id'],
+            defaults=self._variation_defaults(product, var_data)
         )
         
         return variation
     
+    # Fields fetched by the stock/price fast path (kept small on purpose)
+    STOCK_PRICE_FIELDS = [
+        'price', 'regular_price', 'sale_price', 'on_sale',
+        'stock_status', 'stock_quantity', 'manage_stock',
+    ]
+    
+    def _stock_price_values(self, product_data):
+        """
+        Normalize the stock/price fields of an API payload to model values.
+        """
+        def to_decimal(value):
+            return Decimal(str(value)) if value not in (None, '') else None
+        
+        return {
+            'price': to_decimal(product_data.get('price')),
+            'regular_price': to_decimal(product_data.get('regular_price')),
+            'sale_price': to_decimal(product_data.get('sale_price')),
+            'on_sale': product_data.get('on_sale', False),
+            'stock_status': product_data.get('stock_status', 'instock'),
+            'stock_quantity': product_data.get('stock_quantity'),
+            'manage_stock': product_data.get('manage_stock', False),
+        }
+    
     def sync_stock_and_prices(self, product_ids=None):
         """
         Quick sync: only update stock and prices for specified products.
-        This should be called frequently (every 5-10 minutes).
+        This should be called frequently (every minute).
+        
+        Pages through the products listing restricted to the stock/price
+        fields, compares against local values in memory and writes only the
+        rows that changed with one bulk_update.
         
         Args:
             product_ids: List of WooCommerce product IDs to sync. If None, sync all.
+        
+        Returns:
+            dict: {'success', 'checked', 'updated', 'changed_ids'}
         """
         logger.info("💰 Syncing stock and prices...")
         
+        fields = ['id'] + self.STOCK_PRICE_FIELDS
         if product_ids:
-            products = WooCommerceProduct.objects.filter(wc_id__in=product_ids)
+            product_ids = list(product_ids)
+            # include= is limited by per_page (100), so ask in chunks
+            listings = [
+                self.wc_service.iter_product_pages(include=product_ids[i:i + 100], fields=fields)
+                for i in range(0, len(product_ids), 100)
+            ]
         else:
-            products = WooCommerceProduct.objects.filter(status='publish')
+            listings = [self.wc_service.iter_product_pages(fields=fields)]
         
-        updated_count = 0
+        remote = {}
+        fetch_failed = False
+        for listing in listings:
+            for page, result in listing:
+                if not result['success']:
+                    logger.error(f"Failed to fetch stock/prices page {page}")
+                    fetch_failed = True
+                    continue
+                for product_data in result['data']:
+                    remote[product_data['id']] = self._stock_price_values(product_data)
         
+        products = WooCommerceProduct.objects.filter(
+            wc_id__in=remote.keys()
+        ).only('id', 'wc_id', *self.STOCK_PRICE_FIELDS)
+        
+        now = timezone.now()
+        changed = []
         for product in products:
-            try:
-                result = self.wc_service.get_product_by_id(product.wc_id)
-                
-                if result['success']:
-                    product_data = result['data']
-                    product.price = product_data.get('price') or None
-                    product.regular_price = product_data.get('regular_price') or None
-                    product.sale_price = product_data.get('sale_price') or None
-                    product.on_sale = product_data.get('on_sale', False)
-                    product.stock_status = product_data.get('stock_status', 'instock')
-                    product.stock_quantity = product_data.get('stock_quantity')
-                    product.manage_stock = product_data.get('manage_stock', False)
-                    product.save(update_fields=[
-                        'price', 'regular_price', 'sale_price', 'on_sale',
-                        'stock_status', 'stock_quantity', 'manage_stock', 'synced_at'
-                    ])
-                    updated_count += 1
-            except Exception as e:
-                logger.error(f"Error updating stock/price for product {product.wc_id}: {str(e)}")
+            values = remote[product.wc_id]
+            if all(getattr(product, field) == value for field, value in values.items()):
+                continue
+            for field, value in values.items():
+                setattr(product, field, value)
+            product.synced_at = now
+            changed.append(product)
+        
+        if changed:
+            WooCommerceProduct.objects.bulk_update(
+                changed, self.STOCK_PRICE_FIELDS + ['synced_at'], batch_size=500
+            )
+        
+        changed_ids = [product.wc_id for product in changed]
+        if changed_ids:
+            materialize_final_prices(wc_ids=changed_ids)
         
-        logger.info(f"✅ Updated stock/prices for {updated_count} products")
-        return updated_count
+        logger.info(f"✅ Checked {len(remote)} products, updated stock/prices for {len(changed_ids)}")
+        return {
+            'success': not fetch_failed,
+            'checked': len(remote),
+            'updated': len(changed_ids),
+            'changed_ids': changed_ids
+        }
 
 
 # Singleton instance
@@ -0,0 +1,111 @@
+"""
+Signal handlers for CrushMe app
+Keep in-memory indexes and caches in sync with the database
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import (
+    CategoryPriceMargin,
+    DefaultPriceMargin,
+    FavoriteProduct,
+    Order,
+    OrderItem,
+    Review,
+    User,
+    WishListItem
+)
+from .utils.margin_index import on_margins_changed
+from .utils.order_stats import refresh_order_stats_buckets, today_start
+from .utils.product_popularity import refresh_popularity_rows
+from .utils.review_summary import apply_review_change
+from .utils.purchase_stats import (
+    apply_purchase_delta,
+    invalidate_purchase_stats,
+    order_stats_user_ids
+)
+
+
+@receiver(post_save, sender=CategoryPriceMargin)
+@receiver(post_delete, sender=CategoryPriceMargin)
+@receiver(post_save, sender=DefaultPriceMargin)
+@receiver(post_delete, sender=DefaultPriceMargin)
+def margin_changed(sender, **kwargs):
+    """Reload the margin index in every worker and re-materialize final prices"""
+    on_margins_changed()
+
+
+# ---------------------------------------------------------------------------
+# Purchase stats — keep UserPurchaseStats rows in sync with purchase history
+# ---------------------------------------------------------------------------
+def _purchase_history_changed(sender, instance, action, reverse, pk_set, received=False, **kwargs):
+    if action in ('post_add', 'post_remove'):
+        sign = 1 if action == 'post_add' else -1
+        if reverse:
+            # order.purchasers.add(user): instance is the order
+            apply_purchase_delta(pk_set, [instance.pk], sign, received)
+        else:
+            apply_purchase_delta([instance.pk], pk_set, sign, received)
+    elif action == 'pre_clear' and reverse:
+        instance._purchase_stats_users = order_stats_user_ids(instance)
+    elif action == 'post_clear':
+        users = getattr(instance, '_purchase_stats_users', set()) if reverse else [instance.pk]
+        invalidate_purchase_stats(users)
+
+
+@receiver(m2m_changed, sender=User.purchase_history.through)
+def purchase_history_changed(sender, **kwargs):
+    _purchase_history_changed(sender, **kwargs)
+
+
+@receiver(m2m_changed, sender=User.received_gifts.through)
+def received_gifts_changed(sender, **kwargs):
+    _purchase_history_changed(sender, received=True, **kwargs)
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created, update_fields=None, **kwargs):
+    """A changed total/gift flag invalidates the stats of users holding the order"""
+    if created:
+        return
+    if update_fields is not None and not {'total', 'is_gift'} & set(update_fields):
+        return
+    invalidate_purchase_stats(order_stats_user_ids(instance))
+
+
+@receiver(pre_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    """Cascade-deleted m2m rows don't send m2m_changed"""
+    invalidate_purchase_stats(order_stats_user_ids(instance))
+
+
+@receiver(post_delete, sender=Order)
+def order_removed_from_rollups(sender, instance, **kwargs):
+    """A deleted order leaves no updated_at behind: refresh its rollup bucket now"""
+    if instance.created_at < today_start():
+        bucket = instance.created_at.replace(minute=0, second=0, microsecond=0)
+        transaction.on_commit(lambda: refresh_order_stats_buckets([bucket]))
+
+
+# ---------------------------------------------------------------------------
+# Product popularity — deletions leave no timestamp for the incremental refresh
+# ---------------------------------------------------------------------------
+@receiver(post_delete, sender=OrderItem)
+@receiver(post_delete, sender=FavoriteProduct)
+@receiver(post_delete, sender=WishListItem)
+def popularity_source_deleted(sender, instance, **kwargs):
+    """Recount the product of a deleted order item, favorite or wishlist item"""
+    wc_id = instance.woocommerce_product_id
+    if wc_id is not None:
+        transaction.on_commit(lambda: refresh_popularity_rows([wc_id]))
+
+
+# ---------------------------------------------------------------------------
+# Review summaries — Review.save() handles writes; deletes (also queryset
+# deletes) run inside the deletion transaction
+# ---------------------------------------------------------------------------
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Remove a deleted review from its product summary"""
+    apply_review_change((instance.woocommerce_product_id, instance.rating, instance.is_active), None)
@@ -0,0 +1,212 @@
+"""Catalog background tasks for crushme_app.
+
+Huey tasks (auto-discovered by ``huey.contrib.djhuey``):
+- refresh_final_prices: Re-materialize final_* price columns after margin changes
+- incremental_catalog_sync: WooCommerce incremental sync every 5 minutes
+- refresh_stock_and_prices: Stock/price fast path every minute
+- process_product_webhook: Upsert/remove a product from a WooCommerce webhook
+- rebuild_attribute_dictionary: Translate new attribute terms after a sync
+- refresh_product_search_index: Re-index products changed by a sync or translation
+- rollup_order_stats: Hourly order statistics rollups
+- refresh_product_popularity: Popularity counters every 10 minutes
+- send_order_notifications: Order confirmation/gift emails after payment
+- push_order_to_woocommerce: Send a paid order to WooCommerce
+"""
+
+import logging
+
+from huey import crontab
+from huey.contrib.djhuey import HUEY, db_periodic_task, db_task, lock_task
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Final prices — enqueued when price margins change
+# ---------------------------------------------------------------------------
+@db_task(retries=10, retry_delay=30)
+@lock_task('refresh-final-prices')
+def refresh_final_prices(wc_ids=None):
+    """Recompute materialized final prices for the given products (all if None).
+
+    Margin changes schedule it through schedule_final_prices_refresh (one
+    queued run per burst); if a run is in progress the lock makes this one
+    retry later, so it still sees the latest margins.
+    """
+    from .utils.catalog_cache import bump_catalog_generation
+    from .utils.margin_index import clear_final_prices_refresh_flag, materialize_final_prices
+
+    if wc_ids is None:
+        # Changes from here on are not covered by the snapshot loaded below
+        clear_final_prices_refresh_flag()
+    result = materialize_final_prices(wc_ids=wc_ids)
+    logger.info(
+        'Final prices refreshed: %d products, %d variations updated',
+        result['products'], result['variations'],
+    )
+    # Cached catalog responses carry the old prices and margin labels
+    bump_catalog_generation()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# WooCommerce incremental sync — every 5 minutes
+# ---------------------------------------------------------------------------
+@db_periodic_task(crontab(minute='*/5'))
+@lock_task('incremental-catalog-sync')
+def incremental_catalog_sync():
+    """Pull products modified since the last sync watermark (and removals)."""
+    from .services.woocommerce_sync_service import woocommerce_sync_service
+
+    result = woocommerce_sync_service.sync_incremental()
+    if not result['success']:
+        logger.error('Incremental catalog sync failed: %s', result['error'])
+        return result
+
+    refresh_product_search_index()
+    if result.get('variations'):
+        rebuild_attribute_dictionary()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Stock and prices — every minute (only changed rows are written)
+# ---------------------------------------------------------------------------
+@db_periodic_task(crontab(minute='*'))
+@lock_task('refresh-stock-and-prices')
+def refresh_stock_and_prices():
+    """Refresh price/stock columns from a restricted product listing."""
+    from .services.woocommerce_sync_service import woocommerce_sync_service
+
+    from .utils.catalog_cache import purge_products_cache
+
+    result = woocommerce_sync_service.sync_stock_and_prices()
+    if result['updated']:
+        logger.info('Stock/prices changed for products: %s', result['changed_ids'])
+        purge_products_cache(result['changed_ids'])
+    return result
+
+
+# ---------------------------------------------------------------------------
+# WooCommerce product webhooks — queued by woocommerce_product_webhook
+# ---------------------------------------------------------------------------
+@db_task(retries=3, retry_delay=30)
+def process_product_webhook(topic, product_id):
+    """Sync (or remove) one product and purge its cached responses."""
+    from .services.woocommerce_sync_service import WooCommerceSyncService
+    from .utils.catalog_cache import purge_product_cache
+
+    # Fresh instance: don't attach webhook work to a running sync's log
+    sync_service = WooCommerceSyncService()
+    if topic == 'product.deleted':
+        result = sync_service.remove_product(product_id)
+    else:
+        result = sync_service.sync_single_product(product_id)
+
+    if not result['success']:
+        # Raising makes Huey retry the task
+        raise RuntimeError(f"Webhook sync failed for product {product_id}: {result.get('error')}")
+
+    purge_product_cache(product_id, result['category_wc_ids'])
+    refresh_product_search_index()
+    if result.get('variations'):
+        rebuild_attribute_dictionary()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Attribute dictionary — enqueued after syncs that touched variations
+# ---------------------------------------------------------------------------
+@db_task()
+@lock_task('rebuild-attribute-dictionary')
+def rebuild_attribute_dictionary():
+    """Translate new attribute names/options and store the dictionary."""
+    from .services.translation_batch_service import TranslationBatchService
+
+    result = TranslationBatchService().build_attribute_dictionary()
+    if not result['success']:
+        logger.error('Attribute dictionary rebuild failed: %s', result['error'])
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Product search index — enqueued after syncs, webhooks and translation runs
+# ---------------------------------------------------------------------------
+@db_task()
+@lock_task('refresh-product-search-index')
+def refresh_product_search_index(full=False):
+    """Re-index products changed since the search index watermark."""
+    from .utils.product_search import refresh_product_search_index as run_refresh
+
+    return run_refresh(full=full)
+
+
+# ---------------------------------------------------------------------------
+# Order statistics rollups — hourly (only changed buckets are recomputed)
+# ---------------------------------------------------------------------------
+@db_periodic_task(crontab(minute='5'))
+@lock_task('rollup-order-stats')
+def rollup_order_stats():
+    """Materialize changed hourly order buckets before today."""
+    from .utils.order_stats import rollup_order_stats as run_rollup
+
+    return run_rollup()
+
+
+# ---------------------------------------------------------------------------
+# Product popularity — every 10 minutes (only changed products are recounted)
+# ---------------------------------------------------------------------------
+@db_periodic_task(crontab(minute='*/10'))
+@lock_task('refresh-product-popularity')
+def refresh_product_popularity():
+    """Recount sales, favorites and wishlist adds of changed products."""
+    from .utils.product_popularity import refresh_product_popularity as run_refresh
+
+    return run_refresh()
+
+
+# ---------------------------------------------------------------------------
+# Post-payment side effects — enqueued on commit of a paid order
+# (idempotent, keyed on Order.transaction_id)
+# ---------------------------------------------------------------------------
+POST_PAYMENT_RETRIES = 5
+
+
+def _run_post_payment_step(task, transaction_id, step, *args):
+    """Run a post-payment step; flag the order as failed once retries run out."""
+    from .services.post_payment_service import post_payment_service
+
+    try:
+        with HUEY.lock_task(f'post-payment-{step.__name__}-{transaction_id}'):
+            return step(transaction_id, *args)
+    except Exception as exc:
+        if task is None or not task.retries:
+            post_payment_service.mark_failed(transaction_id, exc)
+        else:
+            logger.warning(
+                'Post-payment step %s failed for %s (%d retries left): %s',
+                step.__name__, transaction_id, task.retries, exc,
+            )
+        raise
+
+
+@db_task(retries=POST_PAYMENT_RETRIES, retry_delay=30, retry_backoff=2, context=True)
+def send_order_notifications(transaction_id, lang, email_context, create_feed=True, task=None):
+    """Send the order confirmation (and gift) emails and feed entries once."""
+    from .services.post_payment_service import post_payment_service
+
+    return _run_post_payment_step(
+        task, transaction_id, post_payment_service.send_notifications,
+        lang, email_context, create_feed,
+    )
+
+
+@db_task(retries=POST_PAYMENT_RETRIES, retry_delay=30, retry_backoff=2, context=True)
+def push_order_to_woocommerce(transaction_id, shipping_cost_cents=0, task=None):
+    """Create the order in WooCommerce once (skipped if already synced)."""
+    from .services.post_payment_service import post_payment_service
+
+    return _run_post_payment_step(
+        task, transaction_id, post_payment_service.push_to_woocommerce,
+        shipping_cost_cents,
+    )
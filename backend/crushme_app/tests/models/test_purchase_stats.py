@@ -0,0 +1,222 @@
+"""Tests for the incrementally maintained UserPurchaseStats rows.
+
+Every scenario checks the stored row against compute_purchase_stats (the
+aggregate the row caches).
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from crushme_app.models import Order, UserPurchaseStats
+from crushme_app.utils.purchase_stats import STATS_FIELDS, compute_purchase_stats, get_purchase_stats
+
+
+def _order(user, total, is_gift=False):
+    return Order.objects.create(
+        user=user,
+        total=Decimal(total),
+        is_gift=is_gift,
+        email=user.email,
+        name='Test Buyer',
+        country='Colombia',
+        state='Antioquia',
+        city='Medellín',
+        zipcode='050001',
+        address_line_1='Calle 1 # 2-3',
+        phone='3000000000',
+    )
+
+
+def _stored(user):
+    return UserPurchaseStats.objects.filter(user=user).values(*STATS_FIELDS).first()
+
+
+def assert_row_updated(user):
+    """The row was kept (delta applied) and matches the aggregate"""
+    stored = _stored(user)
+    assert stored is not None
+    assert stored == compute_purchase_stats(user.pk)
+
+
+def assert_row_rebuilt(user):
+    """The row was dropped or kept; either way the next read matches the aggregate"""
+    get_purchase_stats(user)
+    assert _stored(user) == compute_purchase_stats(user.pk)
+
+
+@pytest.fixture
+def buyer(user):
+    # Materialize the stats row so the m2m signals have something to update
+    get_purchase_stats(user)
+    return user
+
+
+@pytest.fixture
+def other_buyer(db):
+    other = get_user_model().objects.create_user(
+        username='otherbuyer', email='other@example.com', password='testpass123'
+    )
+    get_purchase_stats(other)
+    return other
+
+
+@pytest.mark.django_db
+class TestPurchaseHistoryForward:
+
+    def test_add(self, buyer):
+        buyer.purchase_history.add(_order(buyer, '10.00'), _order(buyer, '25.50', is_gift=True))
+
+        assert_row_updated(buyer)
+        assert _stored(buyer)['total_purchases'] == 2
+        assert _stored(buyer)['gift_purchases'] == 1
+        assert _stored(buyer)['total_spent'] == Decimal('35.50')
+
+    def test_remove(self, buyer):
+        keep, drop = _order(buyer, '10.00'), _order(buyer, '5.00', is_gift=True)
+        buyer.purchase_history.add(keep, drop)
+
+        buyer.purchase_history.remove(drop)
+
+        assert_row_updated(buyer)
+        assert _stored(buyer)['total_purchases'] == 1
+        assert _stored(buyer)['gift_purchases'] == 0
+
+    def test_clear(self, buyer):
+        buyer.purchase_history.add(_order(buyer, '10.00'), _order(buyer, '5.00'))
+
+        buyer.purchase_history.clear()
+
+        assert_row_rebuilt(buyer)
+        assert _stored(buyer)['total_purchases'] == 0
+
+
+@pytest.mark.django_db
+class TestPurchaseHistoryReverse:
+
+    def test_add(self, buyer, other_buyer):
+        order = _order(buyer, '40.00')
+
+        order.purchasers.add(buyer, other_buyer)
+
+        assert_row_updated(buyer)
+        assert_row_updated(other_buyer)
+        assert _stored(other_buyer)['total_spent'] == Decimal('40.00')
+
+    def test_remove(self, buyer, other_buyer):
+        order = _order(buyer, '40.00')
+        order.purchasers.add(buyer, other_buyer)
+
+        order.purchasers.remove(other_buyer)
+
+        assert_row_updated(buyer)
+        assert_row_updated(other_buyer)
+        assert _stored(other_buyer)['total_purchases'] == 0
+
+    def test_clear(self, buyer, other_buyer):
+        order = _order(buyer, '40.00')
+        buyer.purchase_history.add(_order(buyer, '1.00'))
+        order.purchasers.add(buyer, other_buyer)
+
+        order.purchasers.clear()
+
+        assert_row_rebuilt(buyer)
+        assert_row_rebuilt(other_buyer)
+        assert _stored(buyer)['total_purchases'] == 1
+        assert _stored(other_buyer)['total_purchases'] == 0
+
+
+@pytest.mark.django_db
+class TestReceivedGifts:
+
+    def test_add_and_remove(self, buyer, other_buyer):
+        first, second = _order(other_buyer, '15.00', is_gift=True), _order(other_buyer, '20.00', is_gift=True)
+
+        buyer.received_gifts.add(first, second)
+        assert_row_updated(buyer)
+        assert _stored(buyer)['received_gifts_count'] == 2
+
+        buyer.received_gifts.remove(first)
+        assert_row_updated(buyer)
+        assert _stored(buyer)['received_gifts_count'] == 1
+
+    def test_reverse_add_and_remove(self, buyer, other_buyer):
+        gift = _order(other_buyer, '15.00', is_gift=True)
+
+        gift.gift_recipients.add(buyer)
+        assert_row_updated(buyer)
+
+        gift.gift_recipients.remove(buyer)
+        assert_row_updated(buyer)
+        assert _stored(buyer)['received_gifts_count'] == 0
+
+    def test_clear_both_directions(self, buyer, other_buyer):
+        gifts = [_order(other_buyer, '15.00', is_gift=True) for _ in range(2)]
+        buyer.received_gifts.add(*gifts)
+
+        gifts[0].gift_recipients.clear()
+        assert_row_rebuilt(buyer)
+        assert _stored(buyer)['received_gifts_count'] == 1
+
+        buyer.received_gifts.clear()
+        assert_row_rebuilt(buyer)
+        assert _stored(buyer)['received_gifts_count'] == 0
+
+    def test_received_gifts_dont_count_as_purchases(self, buyer, other_buyer):
+        gift = _order(other_buyer, '15.00', is_gift=True)
+        other_buyer.purchase_history.add(gift)
+        buyer.received_gifts.add(gift)
+
+        assert_row_updated(buyer)
+        assert_row_updated(other_buyer)
+        assert _stored(buyer)['total_purchases'] == 0
+        assert _stored(other_buyer)['gift_purchases'] == 1
+
+
+@pytest.mark.django_db
+class TestOrderChanges:
+
+    def test_total_change(self, buyer, other_buyer):
+        order = _order(buyer, '10.00')
+        buyer.purchase_history.add(order)
+        other_buyer.received_gifts.add(order)
+
+        order.total = Decimal('99.90')
+        order.save()
+
+        assert_row_rebuilt(buyer)
+        assert_row_rebuilt(other_buyer)
+        assert _stored(buyer)['total_spent'] == Decimal('99.90')
+
+    def test_gift_flag_change_with_update_fields(self, buyer):
+        order = _order(buyer, '10.00')
+        buyer.purchase_history.add(order)
+
+        order.is_gift = True
+        order.save(update_fields=['is_gift'])
+
+        assert_row_rebuilt(buyer)
+        assert _stored(buyer)['gift_purchases'] == 1
+
+    def test_unrelated_save_keeps_row(self, buyer):
+        order = _order(buyer, '10.00')
+        buyer.purchase_history.add(order)
+
+        order.status = 'processing'
+        order.save(update_fields=['status'])
+
+        assert_row_updated(buyer)
+
+    def test_delete(self, buyer, other_buyer):
+        order, kept = _order(buyer, '10.00'), _order(buyer, '7.00')
+        buyer.purchase_history.add(order, kept)
+        other_buyer.received_gifts.add(order)
+
+        order.delete()
+
+        assert_row_rebuilt(buyer)
+        assert_row_rebuilt(other_buyer)
+        assert _stored(buyer)['total_purchases'] == 1
+        assert _stored(buyer)['total_spent'] == Decimal('7.00')
+        assert _stored(other_buyer)['received_gifts_count'] == 0
@@ -0,0 +1,178 @@
+"""Tests for the ProductReviewSummary rows maintained by Review.save() and
+the Review post_delete signal.
+
+Every scenario compares the incrementally maintained row with the one
+rebuild_review_summaries computes from scratch.
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from crushme_app.models import ProductReviewSummary, Review
+from crushme_app.utils.review_summary import rebuild_review_summaries
+
+PRODUCT_ID = 4242
+OTHER_PRODUCT_ID = 4343
+
+SUMMARY_FIELDS = (
+    'review_count', 'rating_sum', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5', 'average_rating'
+)
+
+
+def _summary(product_id):
+    """Stored aggregates (a missing row counts as an empty summary)"""
+    row = ProductReviewSummary.objects.filter(
+        woocommerce_product_id=product_id
+    ).values(*SUMMARY_FIELDS).first()
+    return row or {field: 0 for field in SUMMARY_FIELDS}
+
+
+def assert_matches_rebuild(*product_ids):
+    incremental = {product_id: _summary(product_id) for product_id in product_ids}
+    rebuild_review_summaries(product_ids)
+    assert incremental == {product_id: _summary(product_id) for product_id in product_ids}
+
+
+def _review(rating, product_id=PRODUCT_ID, **kwargs):
+    kwargs.setdefault('anonymous_name', 'Cliente')
+    return Review.objects.create(
+        woocommerce_product_id=product_id,
+        rating=rating,
+        comment='Muy bueno',
+        **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestReviewSummary:
+
+    def test_create(self):
+        _review(5)
+        _review(2)
+
+        assert _summary(PRODUCT_ID)['review_count'] == 2
+        assert _summary(PRODUCT_ID)['average_rating'] == Decimal('3.50')
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_inactive_review_is_not_counted(self):
+        _review(5)
+        _review(1, is_active=False)
+
+        assert _summary(PRODUCT_ID)['review_count'] == 1
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_rating_change(self):
+        _review(5)
+        review = _review(2)
+
+        review.rating = 4
+        review.save()
+
+        assert _summary(PRODUCT_ID)['stars_2'] == 0
+        assert _summary(PRODUCT_ID)['stars_4'] == 1
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_deactivate_and_reactivate(self):
+        _review(5)
+        review = _review(3)
+
+        review.is_active = False
+        review.save()
+        assert _summary(PRODUCT_ID)['review_count'] == 1
+        assert_matches_rebuild(PRODUCT_ID)
+
+        review.is_active = True
+        review.save()
+        assert _summary(PRODUCT_ID)['review_count'] == 2
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_save_without_changes(self):
+        review = _review(4)
+
+        review.title = 'Editado'
+        review.save()
+
+        assert _summary(PRODUCT_ID)['review_count'] == 1
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_delete(self):
+        _review(5)
+        review = _review(1)
+
+        review.delete()
+
+        assert _summary(PRODUCT_ID)['review_count'] == 1
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_delete_inactive_review(self):
+        _review(5)
+        review = _review(1, is_active=False)
+
+        review.delete()
+
+        assert _summary(PRODUCT_ID)['review_count'] == 1
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_queryset_delete(self):
+        _review(5)
+        _review(4)
+        _review(1, product_id=OTHER_PRODUCT_ID)
+
+        Review.objects.filter(rating__gte=4).delete()
+
+        assert _summary(PRODUCT_ID)['review_count'] == 0
+        assert _summary(OTHER_PRODUCT_ID)['review_count'] == 1
+        assert_matches_rebuild(PRODUCT_ID, OTHER_PRODUCT_ID)
+
+    def test_move_between_products(self):
+        _review(5)
+        review = _review(3)
+        _review(2, product_id=OTHER_PRODUCT_ID)
+
+        review.woocommerce_product_id = OTHER_PRODUCT_ID
+        review.rating = 4
+        review.save()
+
+        assert _summary(PRODUCT_ID)['review_count'] == 1
+        assert _summary(OTHER_PRODUCT_ID)['review_count'] == 2
+        assert _summary(OTHER_PRODUCT_ID)['average_rating'] == Decimal('3.00')
+        assert_matches_rebuild(PRODUCT_ID, OTHER_PRODUCT_ID)
+
+    def test_move_to_product_without_summary(self):
+        review = _review(3)
+
+        review.woocommerce_product_id = OTHER_PRODUCT_ID
+        review.save()
+
+        assert _summary(OTHER_PRODUCT_ID)['review_count'] == 1
+        assert_matches_rebuild(PRODUCT_ID, OTHER_PRODUCT_ID)
+
+    def test_missing_row_is_rebuilt_on_next_write(self):
+        _review(5)
+        ProductReviewSummary.objects.all().delete()
+
+        _review(3)
+
+        assert _summary(PRODUCT_ID)['review_count'] == 2
+        assert_matches_rebuild(PRODUCT_ID)
+
+    def test_product_stats_read_the_summary(self):
+        _review(5)
+        _review(4)
+        _review(4)
+
+        stats = Review.get_product_stats(PRODUCT_ID)
+
+        assert stats['total_reviews'] == 3
+        assert stats['average_rating'] == 4.33
+        assert stats['rating_distribution']['stars_4'] == 2
+        assert Review.get_product_average_rating(PRODUCT_ID) == 4.33
+
+    def test_write_purges_only_product_detail(self, django_capture_on_commit_callbacks):
+        with mock.patch('crushme_app.utils.catalog_cache.bump_versions') as bump_versions:
+            with django_capture_on_commit_callbacks(execute=True):
+                _review(5)
+
+        bump_versions.assert_called_once_with([f'product:{PRODUCT_ID}'])
@@ -0,0 +1,50 @@
+"""Tests for when the in-process facet index rebuilds its snapshot."""
+
+from unittest import mock
+
+import pytest
+
+from crushme_app.services.facet_index import FacetIndex
+from crushme_app.utils.catalog_cache import ALL_PRODUCTS_SCOPE, CATALOG_GENERATION_SCOPE
+
+
+@pytest.fixture
+def versions():
+    current = {CATALOG_GENERATION_SCOPE: 1}
+    with mock.patch('crushme_app.services.facet_index.get_versions') as get_versions:
+        get_versions.side_effect = lambda scopes: {scope: current.get(scope, 0) for scope in scopes}
+        yield current
+
+
+@pytest.fixture
+def index():
+    index = FacetIndex()
+    index.VERSION_CHECK_INTERVAL = 0
+    index._build = mock.Mock(side_effect=lambda: mock.Mock(wc_ids=[], attributes={}))
+    return index
+
+
+def test_product_list_bumps_do_not_rebuild(index, versions):
+    first = index.get_snapshot()
+    versions[ALL_PRODUCTS_SCOPE] = 42
+
+    assert index.get_snapshot() is first
+    assert index._build.call_count == 1
+
+
+def test_generation_bump_rebuilds(index, versions):
+    first = index.get_snapshot()
+    versions[CATALOG_GENERATION_SCOPE] = 2
+
+    assert index.get_snapshot() is not first
+    assert index._build.call_count == 2
+
+
+def test_stale_snapshot_served_while_rebuilding(index, versions):
+    first = index.get_snapshot()
+    versions[CATALOG_GENERATION_SCOPE] = 2
+
+    # Another thread holds the build lock: serve the old copy without building
+    with index._build_lock:
+        assert index.get_snapshot() is first
+    assert index._build.call_count == 1
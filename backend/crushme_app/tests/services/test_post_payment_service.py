@@ -0,0 +1,144 @@
+"""Tests for the per-step idempotency of the post-payment side effects."""
+
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from crushme_app.models import Order
+from crushme_app.services.post_payment_service import post_payment_service
+
+EMAIL_CONTEXT = {'total': '100', 'subtotal': '90', 'shipping': '10', 'currency': 'COP', 'items': []}
+
+
+@pytest.fixture
+def receiver(db):
+    return get_user_model().objects.create_user(
+        username='receiver', email='receiver@example.com', password='testpass123'
+    )
+
+
+def _order(user, transaction_id='txn-1', receiver=None):
+    return Order.objects.create(
+        user=user,
+        total=Decimal('100'),
+        transaction_id=transaction_id,
+        is_gift=receiver is not None,
+        receiver_username=receiver.username if receiver else None,
+        email=user.email,
+        name='Test Buyer',
+        country='CO',
+        state='Antioquia',
+        city='Medellín',
+        zipcode='050001',
+        address_line_1='Calle 1 # 2-3',
+        phone='3000000000',
+    )
+
+
+@pytest.fixture
+def emails():
+    with mock.patch('crushme_app.services.post_payment_service.email_service') as service:
+        service.send_order_confirmation.return_value = True
+        service.send_gift_received_notification.return_value = True
+        service.send_gift_sent_confirmation.return_value = True
+        yield service
+
+
+@pytest.fixture
+def wc_orders():
+    with mock.patch('crushme_app.services.post_payment_service.woocommerce_order_service') as service:
+        service.find_order_by_transaction_id.return_value = {'success': True, 'woocommerce_order_id': None}
+        service.send_order.return_value = {'success': True, 'woocommerce_order_id': 501}
+        yield service
+
+
+@pytest.mark.django_db
+class TestSendNotifications:
+
+    def test_sends_every_step_once(self, user, receiver, emails):
+        order = _order(user, receiver=receiver)
+
+        assert post_payment_service.send_notifications('txn-1', 'es', EMAIL_CONTEXT, create_feed=False)
+        assert not post_payment_service.send_notifications('txn-1', 'es', EMAIL_CONTEXT, create_feed=False)
+
+        order.refresh_from_db()
+        assert order.notifications_sent_at is not None
+        assert set(order.notification_steps) == {'confirmation', 'gift_received', 'gift_sent'}
+        assert emails.send_order_confirmation.call_count == 1
+        assert emails.send_gift_received_notification.call_count == 1
+        assert emails.send_gift_sent_confirmation.call_count == 1
+
+    def test_retry_only_sends_missing_steps(self, user, receiver, emails):
+        order = _order(user, receiver=receiver)
+        emails.send_gift_sent_confirmation.return_value = False
+
+        with pytest.raises(RuntimeError):
+            post_payment_service.send_notifications('txn-1', 'es', EMAIL_CONTEXT, create_feed=False)
+
+        order.refresh_from_db()
+        assert order.notifications_sent_at is None
+        assert set(order.notification_steps) == {'confirmation', 'gift_received'}
+
+        emails.send_gift_sent_confirmation.return_value = True
+        assert post_payment_service.send_notifications('txn-1', 'es', EMAIL_CONTEXT, create_feed=False)
+
+        order.refresh_from_db()
+        assert order.notifications_sent_at is not None
+        assert emails.send_order_confirmation.call_count == 1
+        assert emails.send_gift_received_notification.call_count == 1
+        assert emails.send_gift_sent_confirmation.call_count == 2
+
+    def test_failed_confirmation_is_not_recorded(self, user, emails):
+        order = _order(user)
+        emails.send_order_confirmation.return_value = False
+
+        with pytest.raises(RuntimeError):
+            post_payment_service.send_notifications('txn-1', 'es', EMAIL_CONTEXT, create_feed=False)
+
+        order.refresh_from_db()
+        assert order.notification_steps == {}
+        assert order.notifications_sent_at is None
+
+
+@pytest.mark.django_db
+class TestPushToWooCommerce:
+
+    def test_creates_order_when_not_found(self, user, wc_orders):
+        order = _order(user)
+
+        post_payment_service.push_to_woocommerce('txn-1', 15000)
+
+        order.refresh_from_db()
+        assert order.woocommerce_order_id == 501
+        wc_orders.send_order.assert_called_once()
+
+    def test_links_order_created_by_a_lost_attempt(self, user, wc_orders):
+        order = _order(user)
+        wc_orders.find_order_by_transaction_id.return_value = {'success': True, 'woocommerce_order_id': 777}
+
+        post_payment_service.push_to_woocommerce('txn-1', 15000)
+
+        order.refresh_from_db()
+        assert order.woocommerce_order_id == 777
+        wc_orders.send_order.assert_not_called()
+
+    def test_failed_lookup_does_not_create(self, user, wc_orders):
+        _order(user)
+        wc_orders.find_order_by_transaction_id.return_value = {'success': False, 'error': 'timeout'}
+
+        with pytest.raises(RuntimeError):
+            post_payment_service.push_to_woocommerce('txn-1', 15000)
+
+        wc_orders.send_order.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_payload_carries_transaction_id(user):
+    from crushme_app.services.woocommerce_order_service import woocommerce_order_service
+
+    order = _order(user, transaction_id='txn-meta')
+    payload = woocommerce_order_service._build_order_payload(order)
+
+    assert {'key': woocommerce_order_service.TRANSACTION_META_KEY, 'value': 'txn-meta'} in payload['meta_data']
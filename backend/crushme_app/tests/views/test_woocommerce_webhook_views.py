@@ -0,0 +1,139 @@
+"""Tests for the signed WooCommerce product webhook receiver."""
+
+import base64
+import hashlib
+import hmac
+import json
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+
+SECRET = 'test-webhook-secret'
+
+
+def _sign(body, secret=SECRET):
+    return base64.b64encode(
+        hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()
+    ).decode('ascii')
+
+
+def _post(api_client, body, **headers):
+    return api_client.generic(
+        'POST',
+        reverse('woocommerce_product_webhook'),
+        body,
+        content_type='application/json',
+        **{f"HTTP_{name.upper().replace('-', '_')}": value for name, value in headers.items()},
+    )
+
+
+@pytest.fixture
+def webhook_secret(settings):
+    settings.WOOCOMMERCE_WEBHOOK_SECRET = SECRET
+    return SECRET
+
+
+@pytest.fixture
+def queued_webhooks():
+    with mock.patch('crushme_app.tasks.process_product_webhook') as task:
+        yield task
+
+
+@pytest.mark.django_db
+class TestWooCommerceProductWebhook:
+
+    def test_valid_signature_queues_product_event(self, api_client, webhook_secret, queued_webhooks):
+        body = json.dumps({'id': 123, 'name': 'Producto'}).encode('utf-8')
+
+        response = _post(
+            api_client, body,
+            x_wc_webhook_topic='product.updated',
+            x_wc_webhook_signature=_sign(body),
+        )
+
+        assert response.status_code == 202
+        assert response.data['product_id'] == 123
+        queued_webhooks.assert_called_once_with('product.updated', 123)
+
+    def test_bad_signature_is_rejected(self, api_client, webhook_secret, queued_webhooks):
+        body = json.dumps({'id': 123}).encode('utf-8')
+
+        response = _post(
+            api_client, body,
+            x_wc_webhook_topic='product.updated',
+            x_wc_webhook_signature=_sign(body, secret='other-secret'),
+        )
+
+        assert response.status_code == 401
+        queued_webhooks.assert_not_called()
+
+    def test_tampered_body_is_rejected(self, api_client, webhook_secret, queued_webhooks):
+        signature = _sign(json.dumps({'id': 123}).encode('utf-8'))
+
+        response = _post(
+            api_client, json.dumps({'id': 456}).encode('utf-8'),
+            x_wc_webhook_topic='product.updated',
+            x_wc_webhook_signature=signature,
+        )
+
+        assert response.status_code == 401
+        queued_webhooks.assert_not_called()
+
+    def test_missing_signature_is_rejected(self, api_client, webhook_secret, queued_webhooks):
+        response = _post(
+            api_client, json.dumps({'id': 123}).encode('utf-8'),
+            x_wc_webhook_topic='product.updated',
+        )
+
+        assert response.status_code == 401
+        queued_webhooks.assert_not_called()
+
+    def test_empty_secret_rejects_every_event(self, api_client, settings, queued_webhooks):
+        settings.WOOCOMMERCE_WEBHOOK_SECRET = ''
+        body = json.dumps({'id': 123}).encode('utf-8')
+
+        response = _post(
+            api_client, body,
+            x_wc_webhook_topic='product.updated',
+            x_wc_webhook_signature=_sign(body, secret=''),
+        )
+
+        assert response.status_code == 401
+        queued_webhooks.assert_not_called()
+
+    def test_ping_is_acknowledged_without_signature(self, api_client, webhook_secret, queued_webhooks):
+        response = api_client.generic(
+            'POST',
+            reverse('woocommerce_product_webhook'),
+            b'webhook_id=42',
+            content_type='application/x-www-form-urlencoded',
+        )
+
+        assert response.status_code == 200
+        assert response.data['message'] == 'Ping received'
+        queued_webhooks.assert_not_called()
+
+    def test_unhandled_topic_is_ignored(self, api_client, webhook_secret, queued_webhooks):
+        body = json.dumps({'id': 7}).encode('utf-8')
+
+        response = _post(
+            api_client, body,
+            x_wc_webhook_topic='order.created',
+            x_wc_webhook_signature=_sign(body),
+        )
+
+        assert response.status_code == 200
+        queued_webhooks.assert_not_called()
+
+    def test_signed_payload_without_id_is_rejected(self, api_client, webhook_secret, queued_webhooks):
+        body = json.dumps({'name': 'sin id'}).encode('utf-8')
+
+        response = _post(
+            api_client, body,
+            x_wc_webhook_topic='product.deleted',
+            x_wc_webhook_signature=_sign(body),
+        )
+
+        assert response.status_code == 400
+        queued_webhooks.assert_not_called()
@@ -24,8 +24,10 @@ from ..views.woocommerce_local_views import (
     get_woocommerce_categories_local, get_woocommerce_stats_local,
     get_organized_categories_local, get_category_tree_local,
     get_random_featured_categories_local, get_product_stock_local,
-    search_woocommerce_products
+    search_woocommerce_products, autocomplete_woocommerce_products,
+    get_attribute_glossary_local
 )
+from ..views.woocommerce_webhook_views import woocommerce_product_webhook
 
 urlpatterns = [
     # Product listing and details
@@ -53,6 +55,7 @@ urlpatterns = [
     # OPTIMIZED ENDPOINTS - Use local DB with translations (DEFAULT)
     # NOTE: Order matters! More specific paths MUST come before generic ones
     path('woocommerce/products/search/', search_woocommerce_products, name='search_woocommerce_products'),
+    path('woocommerce/products/autocomplete/', autocomplete_woocommerce_products, name='autocomplete_woocommerce_products'),
     path('woocommerce/products/trending/', get_trending_products_local, name='get_trending_products'),
     path('woocommerce/products/<int:product_id>/variations/<int:variation_id>/', get_product_variation_detail_local, name='get_product_variation_detail'),
     path('woocommerce/products/<int:product_id>/variations/', get_product_variations_local, name='get_product_variations'),
@@ -64,6 +67,10 @@ urlpatterns = [
     path('woocommerce/categories/tree/', get_category_tree_local, name='get_category_tree'),
     path('woocommerce/categories/featured-random/', get_random_featured_categories_local, name='get_random_featured_categories'),
     path('woocommerce/stats/', get_woocommerce_stats_local, name='get_products_stats'),
+    path('woocommerce/attributes/glossary/', get_attribute_glossary_local, name='get_attribute_glossary'),
+    
+    # WooCommerce product webhooks (signed) - keeps the local catalog in sync
+    path('woocommerce/webhook/', woocommerce_product_webhook, name='woocommerce_product_webhook'),
     
     # LEGACY ENDPOINTS - Direct WooCommerce API (slower, for compatibility)
     path('woocommerce/legacy/products/', get_woocommerce_products, name='get_woocommerce_products_legacy'),
@@ -6,6 +6,7 @@ from .base import calculate_shipping_cost, generate_auth_tokens
 
 # Import from translation_helpers (new functions)
 from .translation_helpers import (
+    get_translations_map,
     get_translated_product,
     get_translated_category,
     calculate_product_price,
@@ -26,6 +27,7 @@ __all__ = [
     'calculate_shipping_cost',
     'generate_auth_tokens',
     # Translation helpers
+    'get_translations_map',
     'get_translated_product',
     'get_translated_category',
     'calculate_product_price',
@@ -0,0 +1,225 @@
+"""
+Catalog response cache
+Caches local catalog responses in Redis and purges them by bumping version
+counters that are part of the keys: a global catalog generation (sync, margin
+and translation changes) plus per-product/per-category versions (webhooks).
+"""
+import functools
+import hashlib
+import json
+import logging
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Cached responses expire on their own after this (seconds)
+CACHE_TIMEOUT = 60 * 15
+
+# Global generation: every cached catalog response depends on it
+CATALOG_GENERATION_SCOPE = 'catalog'
+
+# Version scope for lists without a category filter
+ALL_PRODUCTS_SCOPE = 'all'
+
+
+def _version_key(scope):
+    return f'catalog:version:{scope}'
+
+
+def get_versions(scopes):
+    """
+    Current version of each scope (e.g. 'product:123', 'category:15'), 0 if never bumped.
+    """
+    keys = {_version_key(scope): scope for scope in scopes}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception as e:
+        logger.warning(f"Could not read catalog cache versions: {e}")
+        return None
+    return {scope: found.get(key, 0) for key, scope in keys.items()}
+
+
+def bump_versions(scopes):
+    """
+    Invalidate every cached response built on these scopes.
+    """
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+        except Exception as e:
+            logger.warning(f"Could not bump catalog cache version {scope}: {e}")
+
+
+def build_cache_key(prefix, scopes, params):
+    """
+    Build a response cache key from the catalog generation, the current versions
+    of its scopes and the request parameters. Returns None if the cache is unavailable.
+    """
+    versions = get_versions([CATALOG_GENERATION_SCOPE] + list(scopes))
+    if versions is None:
+        return None
+
+    raw = '|'.join(
+        [f'{scope}={versions[scope]}' for scope in sorted(versions)]
+        + [f'{name}={params[name]}' for name in sorted(params)]
+    )
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'catalog:response:{prefix}:{digest}'
+
+
+def get_cached_response(key):
+    """Cached response payload for key (None on miss or cache outage)"""
+    if key is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"Could not read catalog cache: {e}")
+        return None
+
+
+def set_cached_response(key, data, timeout=CACHE_TIMEOUT):
+    """Store a response payload (ignored on cache outage)"""
+    if key is None:
+        return
+    try:
+        cache.set(key, data, timeout)
+    except Exception as e:
+        logger.warning(f"Could not write catalog cache: {e}")
+
+
+def bump_catalog_generation():
+    """
+    Invalidate every cached catalog response (after syncs, margin or translation changes).
+    """
+    bump_versions([CATALOG_GENERATION_SCOPE])
+    logger.info("🧹 Catalog cache generation bumped")
+
+
+def compute_etag(data):
+    """Strong ETag for a response payload"""
+    raw = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return '"%s"' % hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match', '')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return etag in candidates
+
+
+def cached_catalog_response(prefix, scopes=None, timeout=CACHE_TIMEOUT):
+    """
+    Cache a catalog GET view (place it under @api_view / @permission_classes).
+    
+    The key covers the endpoint, every query param, the resolved language
+    (lang / Accept-Language), request.currency and the URL kwargs. Only 200
+    responses are cached; hits carry an ETag and If-None-Match gets a 304.
+    
+    Args:
+        prefix: Endpoint name used in the key
+        scopes: Optional callable(request, *args, **kwargs) returning extra
+                version scopes (e.g. the category of a filtered list)
+        timeout: Seconds to keep the response
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            from ..services.translation_service import get_language_from_request
+            
+            params = {
+                f'q:{name}': ','.join(request.query_params.getlist(name))
+                for name in request.query_params
+            }
+            params.update({f'arg:{name}': value for name, value in kwargs.items()})
+            params['lang'] = get_language_from_request(request)
+            params['currency'] = getattr(request, 'currency', 'COP')
+            
+            extra_scopes = scopes(request, *args, **kwargs) if scopes else []
+            cache_key = build_cache_key(prefix, extra_scopes, params)
+            cached = get_cached_response(cache_key)
+            
+            if cached is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached = {'data': response.data, 'etag': compute_etag(response.data)}
+                set_cached_response(cache_key, cached, timeout)
+            else:
+                response = Response(cached['data'], status=status.HTTP_200_OK)
+            
+            if _etag_matches(request, cached['etag']):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            
+            response['ETag'] = cached['etag']
+            # Los clientes deben revalidar (If-None-Match) antes de reutilizar su copia
+            response['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def product_scopes(product_wc_id):
+    return [f'product:{product_wc_id}']
+
+
+def product_list_scopes(category_wc_id=None):
+    if category_wc_id:
+        return [f'category:{category_wc_id}']
+    return [ALL_PRODUCTS_SCOPE]
+
+
+def purge_product_cache(product_wc_id, category_wc_ids=()):
+    """
+    Purge cached detail responses of a product and the cached lists of its
+    categories (plus the unfiltered lists).
+    """
+    scopes = product_scopes(product_wc_id) + [ALL_PRODUCTS_SCOPE]
+    scopes += [f'category:{wc_id}' for wc_id in set(category_wc_ids)]
+    bump_versions(scopes)
+    logger.info(f"🧹 Catalog cache purged for product {product_wc_id} (categories: {sorted(set(category_wc_ids))})")
+
+
+def purge_product_details_cache(product_wc_ids):
+    """
+    Purge only the cached detail responses of these products; cached lists
+    keep their copy until CACHE_TIMEOUT (e.g. after review writes).
+    """
+    scopes = []
+    for wc_id in set(product_wc_ids):
+        scopes += product_scopes(wc_id)
+    if scopes:
+        bump_versions(scopes)
+
+
+def purge_products_cache(product_wc_ids):
+    """
+    Purge the cache of several products at once (e.g. after a stock/price refresh).
+    """
+    from ..models import WooCommerceProduct
+
+    product_wc_ids = list(product_wc_ids)
+    if not product_wc_ids:
+        return
+
+    Through = WooCommerceProduct.categories.through
+    category_wc_ids = set(
+        Through.objects.filter(
+            woocommerceproduct__wc_id__in=product_wc_ids
+        ).values_list('woocommercecategory__wc_id', flat=True)
+    )
+    scopes = [ALL_PRODUCTS_SCOPE] + [f'category:{wc_id}' for wc_id in category_wc_ids]
+    for wc_id in product_wc_ids:
+        scopes += product_scopes(wc_id)
+    bump_versions(scopes)
+    logger.info(f"🧹 Catalog cache purged for {len(product_wc_ids)} products")
@@ -0,0 +1,279 @@
+"""
+Margin Index
+Process-wide, in-memory index of price margins so pricing runs without queries
+"""
+import threading
+import time
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Shared version key: bumping it makes every worker reload its local index
+VERSION_CACHE_KEY = 'margin_index_version'
+
+# How often (seconds) a worker checks the shared version in the cache
+VERSION_CHECK_INTERVAL = 5
+
+# Set while a full final-price refresh is queued: further margin changes ride on it
+REFRESH_PENDING_CACHE_KEY = 'final_prices_refresh_pending'
+
+# Seconds before the queued refresh runs, so a burst of margin edits shares one pass
+REFRESH_DELAY = 10
+
+# The pending flag expires on its own if the queued task is lost
+REFRESH_PENDING_TIMEOUT = 600
+
+
+class MarginIndex:
+    """
+    Snapshot of every active CategoryPriceMargin (keyed by category wc_id)
+    plus the active DefaultPriceMargin.
+    """
+
+    def __init__(self, category_margins, default_margin):
+        # {category_wc_id: CategoryPriceMargin}
+        self.category_margins = category_margins
+        self.default_margin = default_margin
+        # Labels are resolved up front: CategoryPriceMargin.__str__ hits category.name
+        self.labels = {
+            wc_id: str(margin) for wc_id, margin in category_margins.items()
+        }
+        self.default_label = str(default_margin) if default_margin else None
+
+    @classmethod
+    def load(cls):
+        """Build the index from the database (two queries)"""
+        from ..models import CategoryPriceMargin, DefaultPriceMargin
+
+        category_margins = {
+            margin.category.wc_id: margin
+            for margin in CategoryPriceMargin.objects.filter(is_active=True).select_related('category')
+        }
+        return cls(category_margins, DefaultPriceMargin.get_active())
+
+    def margin_for(self, category_wc_ids):
+        """
+        Resolve the margin for a product given its category wc_ids (in category order).
+        The first category with an active margin wins, then the default margin.
+        """
+        for wc_id in category_wc_ids:
+            margin = self.category_margins.get(wc_id)
+            if margin:
+                return margin
+        return self.default_margin
+
+    def label_for(self, category_wc_ids):
+        """Human readable margin (e.g. 'Juguetes: +30%') for the given categories"""
+        for wc_id in category_wc_ids:
+            if wc_id in self.labels:
+                return self.labels[wc_id]
+        return self.default_label
+
+    def apply(self, base_price, category_wc_ids):
+        """
+        Apply the resolved margin to a base price.
+
+        Returns:
+            Price with margin applied, or None if base_price is None
+        """
+        if base_price is None:
+            return None
+
+        margin = self.margin_for(category_wc_ids)
+        if margin:
+            return margin.calculate_price(base_price)
+
+        # Si no hay ningún margen configurado, retornar precio base
+        return float(base_price)
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+_checked_at = 0.0
+
+
+def _shared_version():
+    """Read the shared index version (tolerates cache outages)"""
+    try:
+        return cache.get(VERSION_CACHE_KEY, 0)
+    except Exception as e:
+        logger.warning(f"Could not read margin index version: {e}")
+        return _index_version
+
+
+def get_margin_index():
+    """
+    Get the process-wide margin index, (re)loading it when another worker
+    or a signal has invalidated it.
+    """
+    global _index, _index_version, _checked_at
+
+    # Read the global once: invalidate_margin_index() may reset it concurrently
+    index = _index
+    now = time.monotonic()
+    if index is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return index
+
+    version = _shared_version()
+    with _lock:
+        index = _index
+        if index is None or version != _index_version:
+            index = MarginIndex.load()
+            _index = index
+            _index_version = version
+            logger.debug(f"Margin index loaded (version {version}, {len(index.category_margins)} category margins)")
+        _checked_at = now
+    return index
+
+
+def invalidate_margin_index():
+    """Drop the local index and bump the shared version so all workers reload"""
+    global _index
+
+    with _lock:
+        _index = None
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+    except Exception as e:
+        logger.warning(f"Could not bump margin index version: {e}")
+
+
+def schedule_final_prices_refresh():
+    """
+    Queue one full final-price refresh, unless one is already queued and
+    hasn't started yet (it will load the margins after this change).
+    """
+    from huey.contrib.djhuey import HUEY
+    from ..tasks import refresh_final_prices
+
+    try:
+        queued = not cache.add(REFRESH_PENDING_CACHE_KEY, 1, REFRESH_PENDING_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Could not read final prices refresh flag: {e}")
+        queued = False
+    if queued:
+        return
+    if HUEY.immediate:
+        # Immediate mode (development) never runs delayed tasks
+        refresh_final_prices()
+    else:
+        refresh_final_prices.schedule(delay=REFRESH_DELAY)
+
+
+def clear_final_prices_refresh_flag():
+    """Called when the queued refresh starts: later changes need a new one"""
+    try:
+        cache.delete(REFRESH_PENDING_CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"Could not clear final prices refresh flag: {e}")
+
+
+def on_margins_changed():
+    """
+    Called whenever a CategoryPriceMargin/DefaultPriceMargin changes:
+    reload the index everywhere and re-materialize final prices after commit
+    (one deduplicated refresh for a burst of changes).
+    """
+    from django.db import transaction
+
+    invalidate_margin_index()
+    transaction.on_commit(schedule_final_prices_refresh)
+
+
+def to_price_decimal(value):
+    """Round a computed price to the 2-decimal Decimal stored in final_* columns"""
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+FINAL_PRICE_FIELDS = ['final_price', 'final_regular_price', 'final_sale_price']
+
+
+def _apply_final_prices(obj, index, category_wc_ids):
+    """Set final_* on a product/variation from the index; return True if anything changed"""
+    sale_price = index.apply(obj.sale_price, category_wc_ids) if obj.sale_price else None
+    new_values = {
+        'final_price': to_price_decimal(index.apply(obj.price, category_wc_ids)),
+        # Same fallback as get_regular_price_with_margin (None -> current price)
+        'final_regular_price': to_price_decimal(
+            index.apply(obj.regular_price if obj.regular_price is not None else obj.price, category_wc_ids)
+        ),
+        'final_sale_price': to_price_decimal(sale_price),
+    }
+    changed = False
+    for field, value in new_values.items():
+        if getattr(obj, field) != value:
+            setattr(obj, field, value)
+            changed = True
+    return changed
+
+
+def materialize_final_prices(wc_ids=None, batch_size=500):
+    """
+    Recompute the materialized final_* price columns in bulk.
+    
+    Products (and their variations) are processed in batches; only rows whose
+    final prices actually changed are written, with one bulk_update per batch.
+    
+    Args:
+        wc_ids: WooCommerce product IDs to recompute. If None, recompute all.
+        batch_size: Products per batch
+        
+    Returns:
+        dict: {'products': updated_products, 'variations': updated_variations}
+    """
+    from ..models import WooCommerceProduct, WooCommerceProductVariation
+
+    # Always price against a fresh snapshot (this runs right after margin changes)
+    index = MarginIndex.load()
+
+    products_qs = WooCommerceProduct.objects.order_by('id').only(
+        'id', 'wc_id', 'price', 'regular_price', 'sale_price', *FINAL_PRICE_FIELDS
+    )
+    if wc_ids is not None:
+        products_qs = products_qs.filter(wc_id__in=list(wc_ids))
+
+    updated_products = 0
+    updated_variations = 0
+    last_id = 0
+
+    while True:
+        products = list(
+            products_qs.filter(id__gt=last_id).prefetch_related('categories')[:batch_size]
+        )
+        if not products:
+            break
+        last_id = products[-1].id
+
+        category_ids_by_product = {}
+        changed_products = []
+        for product in products:
+            category_wc_ids = product.get_category_wc_ids()
+            category_ids_by_product[product.id] = category_wc_ids
+            if _apply_final_prices(product, index, category_wc_ids):
+                changed_products.append(product)
+
+        changed_variations = []
+        variations = WooCommerceProductVariation.objects.filter(
+            product_id__in=category_ids_by_product.keys()
+        ).only('id', 'product_id', 'price', 'regular_price', 'sale_price', *FINAL_PRICE_FIELDS)
+        for variation in variations:
+            if _apply_final_prices(variation, index, category_ids_by_product[variation.product_id]):
+                changed_variations.append(variation)
+
+        if changed_products:
+            WooCommerceProduct.objects.bulk_update(changed_products, FINAL_PRICE_FIELDS)
+            updated_products += len(changed_products)
+        if changed_variations:
+            WooCommerceProductVariation.objects.bulk_update(changed_variations, FINAL_PRICE_FIELDS, batch_size=batch_size)
+            updated_variations += len(changed_variations)
+
+    logger.info(f"💲 Final prices materialized: {updated_products} products, {updated_variations} variations updated")
+    return {'products': updated_products, 'variations': updated_variations}
@@ -0,0 +1,140 @@
+"""
+Order Products
+Bulk product data for order item serializers: local catalog first, then a
+concurrent (and cached) WooCommerce fetch only for products missing locally
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+logger = logging.getLogger(__name__)
+
+# Remote product data for products missing locally (seconds)
+REMOTE_CACHE_TIMEOUT = 60 * 60
+
+# Key in the root serializer context holding {wc_id: product data or None}
+CONTEXT_KEY = 'order_products'
+
+
+def _remote_cache_key(wc_id):
+    return f'order_products:remote:{wc_id}'
+
+
+def _local_product_data(product):
+    """Normalized product data from the local catalog"""
+    images = list(product.images.all())
+    regular_price = product.final_regular_price or product.regular_price
+    sale_price = product.final_sale_price or product.sale_price
+    return {
+        'name': product.name,
+        'short_description': product.short_description,
+        'regular_price': str(regular_price) if regular_price is not None else None,
+        'sale_price': str(sale_price) if sale_price else None,
+        'image_url': images[0].src if images else None,
+        'stock_quantity': product.stock_quantity,
+        'stock_status': product.stock_status,
+        'categories': [category.name for category in product.categories.all()],
+        'tags': []
+    }
+
+
+def _remote_product_data(wc_product):
+    """Normalized product data from a WooCommerce API product"""
+    images = wc_product.get('images') or []
+    return {
+        'name': wc_product.get('name'),
+        'short_description': wc_product.get('short_description'),
+        'regular_price': wc_product.get('regular_price') or None,
+        'sale_price': wc_product.get('sale_price') or None,
+        'image_url': images[0].get('src') if images else None,
+        'stock_quantity': wc_product.get('stock_quantity'),
+        'stock_status': wc_product.get('stock_status'),
+        'categories': [cat.get('name') for cat in wc_product.get('categories', [])],
+        'tags': [tag.get('name') for tag in wc_product.get('tags', [])]
+    }
+
+
+def _fetch_local(wc_ids):
+    from ..models import WooCommerceProduct, WooCommerceProductImage
+
+    products = WooCommerceProduct.objects.filter(wc_id__in=wc_ids).prefetch_related(
+        Prefetch('images', queryset=WooCommerceProductImage.objects.order_by('position')),
+        'categories'
+    )
+    return {product.wc_id: _local_product_data(product) for product in products}
+
+
+def _fetch_remote(wc_ids):
+    from ..services.woocommerce_service import woocommerce_service
+
+    found = {}
+    try:
+        cached = cache.get_many([_remote_cache_key(wc_id) for wc_id in wc_ids])
+    except Exception as e:
+        logger.warning(f"Could not read order products cache: {e}")
+        cached = {}
+    for wc_id in wc_ids:
+        data = cached.get(_remote_cache_key(wc_id))
+        if data is not None:
+            found[wc_id] = data
+
+    missing = [wc_id for wc_id in wc_ids if wc_id not in found]
+    if not missing:
+        return found
+
+    logger.info(f"🌐 Fetching {len(missing)} order products missing locally from WooCommerce")
+    fetched = {}
+    for wc_id, result in woocommerce_service.map_concurrent(woocommerce_service.get_product_by_id, missing):
+        if result.get('success') and result.get('data'):
+            fetched[wc_id] = _remote_product_data(result['data'])
+
+    if fetched:
+        try:
+            cache.set_many(
+                {_remote_cache_key(wc_id): data for wc_id, data in fetched.items()},
+                REMOTE_CACHE_TIMEOUT
+            )
+        except Exception as e:
+            logger.warning(f"Could not write order products cache: {e}")
+
+    found.update(fetched)
+    return found
+
+
+def get_order_products(wc_ids):
+    """
+    Product data for a set of WooCommerce product IDs.
+
+    Returns:
+        dict: {wc_id: normalized product data}; IDs that could not be resolved are absent
+    """
+    wc_ids = {wc_id for wc_id in wc_ids if wc_id}
+    if not wc_ids:
+        return {}
+
+    products = _fetch_local(wc_ids)
+    missing = sorted(wc_ids - products.keys())
+    if missing:
+        try:
+            products.update(_fetch_remote(missing))
+        except Exception as e:
+            logger.error(f"Error fetching order products from WooCommerce: {str(e)}")
+    return products
+
+
+def hydrate_order_products(context, wc_ids):
+    """
+    Resolve product data into a serializer context (shared by nested serializers)
+    so a whole page of orders costs one lookup.
+
+    Returns:
+        dict: {wc_id: product data or None}
+    """
+    products = context.setdefault(CONTEXT_KEY, {})
+    missing = {wc_id for wc_id in wc_ids if wc_id not in products}
+    if missing:
+        found = get_order_products(missing)
+        for wc_id in missing:
+            products[wc_id] = found.get(wc_id)
+    return products
@@ -0,0 +1,190 @@
+"""
+Order Stats
+Hourly order rollups (OrderStatsRollup) for the admin statistics: past buckets
+are materialized incrementally, today's partial bucket is aggregated live
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Statuses counted as revenue
+REVENUE_STATUSES = ('delivered', 'shipped')
+
+# Hours recomputed per aggregate query
+BUCKET_CHUNK_HOURS = 24 * 7
+
+DIMENSIONS = ('status', 'is_gift', 'payment_provider')
+
+
+def today_start():
+    """Start of the current day (live bucket boundary)"""
+    return timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def refresh_order_stats_buckets(hours):
+    """
+    Recompute the rollup rows of the given hour buckets from Order.
+
+    Args:
+        hours: Iterable of hour-aligned datetimes (bucket starts)
+
+    Returns:
+        int: Rollup rows written
+    """
+    from ..models import Order, OrderStatsRollup
+
+    hours = sorted(set(hours))
+    written = 0
+
+    for i in range(0, len(hours), BUCKET_CHUNK_HOURS):
+        chunk = hours[i:i + BUCKET_CHUNK_HOURS]
+        chunk_set = set(chunk)
+
+        rows = Order.objects.filter(
+            created_at__gte=chunk[0],
+            created_at__lt=chunk[-1] + timedelta(hours=1)
+        ).annotate(
+            bucket=TruncHour('created_at')
+        ).order_by().values('bucket', *DIMENSIONS).annotate(
+            orders=Count('id'),
+            revenue=Sum('total'),
+            source_updated_at=Max('updated_at')
+        )
+
+        rollups = [
+            OrderStatsRollup(
+                bucket_start=row['bucket'],
+                status=row['status'],
+                is_gift=row['is_gift'],
+                payment_provider=row['payment_provider'] or '',
+                orders=row['orders'],
+                revenue=row['revenue'] or 0,
+                source_updated_at=row['source_updated_at']
+            )
+            for row in rows
+            if row['bucket'] in chunk_set
+        ]
+
+        with transaction.atomic():
+            OrderStatsRollup.objects.filter(bucket_start__in=chunk).delete()
+            OrderStatsRollup.objects.bulk_create(rollups, batch_size=500)
+        written += len(rollups)
+
+    return written
+
+
+def rollup_order_stats(full=False):
+    """
+    Materialize every bucket before today that changed since the last run.
+
+    Changed buckets are those of orders updated since the watermark (latest
+    Order.updated_at already folded in) plus every hour from the last
+    materialized bucket on (orders that were still "today" on the last run).
+
+    Args:
+        full: Rebuild every bucket
+
+    Returns:
+        dict: {'buckets', 'rows'}
+    """
+    from ..models import Order, OrderStatsRollup
+
+    state = OrderStatsRollup.objects.aggregate(
+        watermark=Max('source_updated_at'),
+        last_bucket=Max('bucket_start')
+    )
+    changed = Order.objects.filter(created_at__lt=today_start())
+    if not full and state['watermark'] is not None:
+        changed = changed.filter(
+            Q(updated_at__gte=state['watermark']) | Q(created_at__gte=state['last_bucket'])
+        )
+
+    hours = list(
+        changed.annotate(bucket=TruncHour('created_at'))
+        .order_by().values_list('bucket', flat=True).distinct()
+    )
+    if full:
+        OrderStatsRollup.objects.all().delete()
+    rows = refresh_order_stats_buckets(hours)
+
+    logger.info(f"📊 Order stats rollup: {len(hours)} buckets, {rows} rows")
+    return {'buckets': len(hours), 'rows': rows}
+
+
+def get_order_stats(start=None, end=None):
+    """
+    Order statistics for [start, end) (open ends = all time / now).
+    Past days come from the rollups, today from one live aggregate.
+
+    Returns:
+        dict: total_orders, total_revenue, orders_by_status, orders_by_gift,
+              orders_by_payment_provider
+    """
+    from ..models import Order, OrderStatsRollup
+
+    boundary = today_start()
+    rows = []
+
+    if start is None or start < boundary:
+        rollups = OrderStatsRollup.objects.filter(bucket_start__lt=min(end, boundary) if end else boundary)
+        if start is not None:
+            rollups = rollups.filter(bucket_start__gte=start)
+        rows += rollups.values(*DIMENSIONS).annotate(
+            count=Sum('orders'),
+            amount=Sum('revenue')
+        )
+
+    if end is None or end > boundary:
+        live = Order.objects.filter(created_at__gte=max(start, boundary) if start else boundary)
+        if end is not None:
+            live = live.filter(created_at__lt=end)
+        rows += live.order_by().values(*DIMENSIONS).annotate(
+            count=Count('id'),
+            amount=Sum('total')
+        )
+
+    by_status = defaultdict(lambda: {'count': 0, 'revenue': Decimal('0')})
+    by_gift = defaultdict(lambda: {'count': 0, 'revenue': Decimal('0')})
+    by_provider = defaultdict(lambda: {'count': 0, 'revenue': Decimal('0')})
+    for row in rows:
+        amount = row['amount'] or Decimal('0')
+        for bucket in (
+            by_status[row['status']],
+            by_gift['gift' if row['is_gift'] else 'regular'],
+            by_provider[row['payment_provider'] or 'unknown']
+        ):
+            bucket['count'] += row['count']
+            bucket['revenue'] += amount
+
+    def as_list(groups, key):
+        return [
+            {key: name, 'count': values['count'], 'revenue': str(values['revenue'])}
+            for name, values in sorted(groups.items())
+        ]
+
+    return {
+        'total_orders': sum(values['count'] for values in by_status.values()),
+        'total_revenue': str(sum(
+            (by_status[name]['revenue'] for name in REVENUE_STATUSES if name in by_status),
+            Decimal('0')
+        )),
+        'orders_by_status': as_list(by_status, 'status'),
+        'orders_by_gift': as_list(by_gift, 'type'),
+        'orders_by_payment_provider': as_list(by_provider, 'payment_provider')
+    }
+
+
+def ensure_order_stats_rollups():
+    """Build the rollups on first use (before the periodic task ever ran)"""
+    from ..models import Order, OrderStatsRollup
+
+    if not OrderStatsRollup.objects.exists() and Order.objects.filter(created_at__lt=today_start()).exists():
+        rollup_order_stats(full=True)
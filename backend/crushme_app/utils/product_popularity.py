@@ -0,0 +1,165 @@
+"""
+Product Popularity
+Materialized sales and engagement counters per product (ProductPopularity):
+units sold, orders, recent units (sales velocity), favorites and wishlist
+adds, plus a weighted score for the trending list.
+
+Rows are refreshed incrementally: products with order items, order changes
+(e.g. cancellations), favorites or wishlist adds since the watermark (latest
+source change already folded in), plus products whose recent sales window
+may have moved. Deletions leave no timestamp behind, so signals refresh the
+affected product directly.
+"""
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Sales velocity window (days)
+POPULARITY_WINDOW_DAYS = 7
+
+# Score weights: recent sales dominate, engagement breaks ties between low sellers
+RECENT_UNITS_WEIGHT = 3.0
+UNITS_SOLD_WEIGHT = 1.0
+FAVORITE_WEIGHT = 0.5
+WISHLIST_WEIGHT = 0.5
+
+# Orders that don't count as sales
+EXCLUDED_ORDER_STATUSES = ('cancelled',)
+
+PRODUCT_CHUNK_SIZE = 500
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def popularity_score(units_sold, recent_units, favorites, wishlist_adds):
+    return (
+        RECENT_UNITS_WEIGHT * recent_units
+        + UNITS_SOLD_WEIGHT * units_sold
+        + FAVORITE_WEIGHT * favorites
+        + WISHLIST_WEIGHT * wishlist_adds
+    )
+
+
+def refresh_popularity_rows(wc_ids):
+    """
+    Recompute the popularity rows of the given products from OrderItem,
+    FavoriteProduct and WishListItem. Products with nothing to count lose
+    their row.
+
+    Returns:
+        int: Rows written
+    """
+    from ..models import FavoriteProduct, OrderItem, ProductPopularity, WishListItem
+
+    wc_ids = sorted({wc_id for wc_id in wc_ids if wc_id is not None})
+    window_start = timezone.now() - timedelta(days=POPULARITY_WINDOW_DAYS)
+    written = 0
+
+    for i in range(0, len(wc_ids), PRODUCT_CHUNK_SIZE):
+        chunk = wc_ids[i:i + PRODUCT_CHUNK_SIZE]
+        counters = {}
+
+        def row(wc_id):
+            return counters.setdefault(wc_id, {
+                'units_sold': 0, 'orders': 0, 'recent_units': 0,
+                'favorites': 0, 'wishlist_adds': 0, 'source_updated_at': _EPOCH
+            })
+
+        sales = OrderItem.objects.filter(
+            woocommerce_product_id__in=chunk
+        ).exclude(
+            order__status__in=EXCLUDED_ORDER_STATUSES
+        ).values('woocommerce_product_id').annotate(
+            units=Sum('quantity'),
+            order_count=Count('order_id', distinct=True),
+            recent=Sum('quantity', filter=Q(order__created_at__gte=window_start)),
+            item_changed=Max('created_at'),
+            order_changed=Max('order__updated_at')
+        ).order_by()
+        for sale in sales:
+            counter = row(sale['woocommerce_product_id'])
+            counter['units_sold'] = sale['units'] or 0
+            counter['orders'] = sale['order_count']
+            counter['recent_units'] = sale['recent'] or 0
+            counter['source_updated_at'] = max(sale['item_changed'], sale['order_changed'])
+
+        for model, field in ((FavoriteProduct, 'favorites'), (WishListItem, 'wishlist_adds')):
+            for engagement in model.objects.filter(
+                woocommerce_product_id__in=chunk
+            ).values('woocommerce_product_id').annotate(
+                total=Count('id'),
+                changed=Max('created_at')
+            ).order_by():
+                counter = row(engagement['woocommerce_product_id'])
+                counter[field] = engagement['total']
+                counter['source_updated_at'] = max(counter['source_updated_at'], engagement['changed'])
+
+        now = timezone.now()
+        rows = [
+            ProductPopularity(
+                wc_id=wc_id,
+                score=popularity_score(
+                    counter['units_sold'], counter['recent_units'],
+                    counter['favorites'], counter['wishlist_adds']
+                ),
+                refreshed_at=now,
+                **counter
+            )
+            for wc_id, counter in counters.items()
+        ]
+
+        with transaction.atomic():
+            ProductPopularity.objects.filter(wc_id__in=chunk).delete()
+            ProductPopularity.objects.bulk_create(rows, batch_size=500)
+        written += len(rows)
+
+    return written
+
+
+def refresh_product_popularity(full=False):
+    """
+    Refresh every product whose counters may have changed since the last run.
+
+    Args:
+        full: Recompute every product
+
+    Returns:
+        dict: {'products', 'rows'}
+    """
+    from ..models import FavoriteProduct, OrderItem, ProductPopularity, WishListItem
+
+    watermark = None if full else ProductPopularity.objects.aggregate(
+        latest=Max('source_updated_at')
+    )['latest']
+
+    if watermark is None:
+        wc_ids = set(OrderItem.objects.values_list('woocommerce_product_id', flat=True).distinct())
+        wc_ids |= set(FavoriteProduct.objects.values_list('woocommerce_product_id', flat=True).distinct())
+        wc_ids |= set(WishListItem.objects.values_list('woocommerce_product_id', flat=True).distinct())
+        # Full rebuild: rows of products that lost every sale/favorite are dropped too
+        wc_ids |= set(ProductPopularity.objects.values_list('wc_id', flat=True))
+    else:
+        wc_ids = set(
+            OrderItem.objects.filter(
+                Q(created_at__gte=watermark) | Q(order__updated_at__gte=watermark)
+            ).values_list('woocommerce_product_id', flat=True).distinct()
+        )
+        wc_ids |= set(
+            FavoriteProduct.objects.filter(created_at__gte=watermark)
+            .values_list('woocommerce_product_id', flat=True).distinct()
+        )
+        wc_ids |= set(
+            WishListItem.objects.filter(created_at__gte=watermark)
+            .values_list('woocommerce_product_id', flat=True).distinct()
+        )
+        # Sales leaving the recent window change recent_units without any new row
+        wc_ids |= set(ProductPopularity.objects.filter(recent_units__gt=0).values_list('wc_id', flat=True))
+
+    rows = refresh_popularity_rows(wc_ids) if wc_ids else 0
+    logger.info(f"🔥 Product popularity refreshed: {len(wc_ids)} products, {rows} rows")
+    return {'products': len(wc_ids), 'rows': rows}
@@ -0,0 +1,290 @@
+"""
+Product Search
+Inverted index over product text (ProductSearchTerm) for the search endpoint.
+
+Text is accent-folded, lowercased and reduced with a light plural stemmer
+(Spanish and English), so "Vibradores", "vibrador" and "VIBRADÓR" share a
+term. Each product gets one row per (language, term) with a weight summed
+over the fields the term appears in. A query is one indexed lookup returning
+wc_ids ranked by relevance.
+
+The index is refreshed incrementally from a watermark (latest source change
+already folded in): products whose sync row or name/short description
+translations changed since then are re-indexed.
+"""
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Sum, When
+from django.utils.html import strip_tags
+
+logger = logging.getLogger(__name__)
+
+# Indexed languages: source catalog (es) and translations
+SEARCH_LANGUAGES = ('es', 'en')
+SOURCE_LANGUAGE = 'es'
+
+# Field weights
+NAME_WEIGHT = 3
+SHORT_DESCRIPTION_WEIGHT = 1
+# Original (Spanish) name in other languages: fallback for untranslated products
+SOURCE_NAME_WEIGHT = 1
+
+# Query terms matching a whole index term (not only a prefix) count double
+EXACT_MATCH_FACTOR = 2
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+INDEX_CHUNK_SIZE = 500
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = {
+    'es': {
+        'de', 'del', 'la', 'las', 'el', 'los', 'un', 'una', 'unos', 'unas', 'y', 'o', 'en',
+        'con', 'para', 'por', 'al', 'que', 'su', 'sus', 'se', 'es', 'lo', 'mas', 'muy',
+    },
+    'en': {
+        'the', 'a', 'an', 'and', 'or', 'of', 'in', 'on', 'with', 'for', 'to', 'by', 'at',
+        'is', 'it', 'its', 'your', 'you', 'this', 'that', 'from', 'as', 'be', 'are',
+    },
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def normalize_text(text):
+    """Lowercase, strip HTML and accents"""
+    text = strip_tags(text or '').lower()
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', text)
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+def stem(word, language):
+    """
+    Light plural stemmer (accent-folded input):
+    es: luces -> luz, colores -> color, juguetes -> juguete
+    en: batteries -> battery, boxes -> box, toys -> toy
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+
+    if language == 'es':
+        if word.endswith('ces') and len(word) > 4:
+            return word[:-3] + 'z'
+        if word.endswith('es') and len(word) > 4 and word[-3] in 'lnrdjyz':
+            return word[:-2]
+        if word.endswith('s'):
+            return word[:-1]
+        return word
+
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'xes', 'zes', 'ches', 'shes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def tokenize(text, language):
+    """Normalized, stemmed terms of a text (stopwords and 1-letter tokens dropped)"""
+    stopwords = STOPWORDS.get(language, set())
+    terms = []
+    for token in TOKEN_RE.findall(normalize_text(text)):
+        if len(token) < MIN_TERM_LENGTH or token in stopwords:
+            continue
+        terms.append(stem(token, language)[:MAX_TERM_LENGTH])
+    return terms
+
+
+# ---------------------------------------------------------------------------
+# Indexing
+# ---------------------------------------------------------------------------
+def _product_terms(product, translations):
+    """
+    {language: {term: weight}} for a product.
+
+    Args:
+        translations: {(content_type, language): translated text} of the product
+    """
+    from ..models import TranslatedContent
+
+    fields = {
+        SOURCE_LANGUAGE: [
+            (product.name, NAME_WEIGHT),
+            (product.short_description, SHORT_DESCRIPTION_WEIGHT),
+        ]
+    }
+    for language in SEARCH_LANGUAGES:
+        if language == SOURCE_LANGUAGE:
+            continue
+        fields[language] = [
+            (translations.get((TranslatedContent.CONTENT_TYPE_PRODUCT_NAME, language)), NAME_WEIGHT),
+            (translations.get((TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC, language)), SHORT_DESCRIPTION_WEIGHT),
+            (product.name, SOURCE_NAME_WEIGHT),
+        ]
+
+    terms = {}
+    for language, texts in fields.items():
+        weights = defaultdict(int)
+        for text, weight in texts:
+            # Un término cuenta una vez por campo
+            for term in set(tokenize(text, language)):
+                weights[term] += weight
+        terms[language] = weights
+    return terms
+
+
+def index_products(wc_ids):
+    """
+    (Re)build the index rows of the given products. Products that are missing
+    or not published lose their rows.
+
+    Returns:
+        int: Rows written
+    """
+    from ..models import ProductSearchTerm, TranslatedContent, WooCommerceProduct
+
+    wc_ids = sorted(set(wc_ids))
+    written = 0
+
+    for i in range(0, len(wc_ids), INDEX_CHUNK_SIZE):
+        chunk = wc_ids[i:i + INDEX_CHUNK_SIZE]
+
+        products = list(
+            WooCommerceProduct.objects.filter(wc_id__in=chunk, status='publish')
+            .only('wc_id', 'name', 'short_description', 'synced_at')
+        )
+        translations = defaultdict(dict)
+        updated = {}
+        for row in TranslatedContent.objects.filter(
+            object_id__in=[product.wc_id for product in products],
+            content_type__in=[
+                TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
+                TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC
+            ],
+            target_language__in=SEARCH_LANGUAGES
+        ).values('object_id', 'content_type', 'target_language', 'translated_text', 'updated_at'):
+            translations[row['object_id']][(row['content_type'], row['target_language'])] = row['translated_text']
+            updated[row['object_id']] = max(updated.get(row['object_id'], _EPOCH), row['updated_at'])
+
+        rows = []
+        for product in products:
+            source_updated_at = max(product.synced_at or _EPOCH, updated.get(product.wc_id, _EPOCH))
+            for language, weights in _product_terms(product, translations[product.wc_id]).items():
+                rows.extend(
+                    ProductSearchTerm(
+                        language=language,
+                        term=term,
+                        wc_id=product.wc_id,
+                        weight=min(weight, 32767),
+                        source_updated_at=source_updated_at
+                    )
+                    for term, weight in weights.items()
+                )
+
+        with transaction.atomic():
+            ProductSearchTerm.objects.filter(wc_id__in=chunk).delete()
+            ProductSearchTerm.objects.bulk_create(rows, batch_size=1000)
+        written += len(rows)
+
+    return written
+
+
+def refresh_product_search_index(full=False):
+    """
+    Re-index every product changed since the index watermark.
+
+    Args:
+        full: Rebuild the whole index
+
+    Returns:
+        dict: {'products', 'rows'}
+    """
+    from ..models import ProductSearchTerm, TranslatedContent, WooCommerceProduct
+
+    watermark = None if full else ProductSearchTerm.objects.aggregate(
+        latest=Max('source_updated_at')
+    )['latest']
+
+    if watermark is None:
+        wc_ids = set(WooCommerceProduct.objects.filter(status='publish').values_list('wc_id', flat=True))
+        # Full rebuild: rows of products that are gone are dropped too
+        wc_ids |= set(ProductSearchTerm.objects.values_list('wc_id', flat=True).distinct())
+    else:
+        wc_ids = set(
+            WooCommerceProduct.objects.filter(synced_at__gte=watermark).values_list('wc_id', flat=True)
+        )
+        wc_ids |= set(
+            TranslatedContent.objects.filter(
+                updated_at__gte=watermark,
+                content_type__in=[
+                    TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
+                    TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC
+                ],
+                target_language__in=SEARCH_LANGUAGES
+            ).values_list('object_id', flat=True)
+        )
+
+    rows = index_products(wc_ids) if wc_ids else 0
+    if wc_ids:
+        logger.info(f"🔎 Search index refreshed: {len(wc_ids)} products, {rows} rows")
+    return {'products': len(wc_ids), 'rows': rows}
+
+
+def ensure_product_search_index():
+    """Build the index on first use (before any sync or task filled it)"""
+    from ..models import ProductSearchTerm, WooCommerceProduct
+
+    if not ProductSearchTerm.objects.exists() and WooCommerceProduct.objects.filter(status='publish').exists():
+        refresh_product_search_index(full=True)
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+def search_product_ids(query, language):
+    """
+    Published product wc_ids matching a free-text query, best match first.
+
+    Every query term matches index terms it is a prefix of ("vibra" finds
+    "vibrador"); whole-term matches weigh double. Products matching more of
+    the query rank higher.
+
+    Returns:
+        list: wc_ids ordered by relevance
+    """
+    from ..models import ProductSearchTerm
+
+    if language not in SEARCH_LANGUAGES:
+        language = SOURCE_LANGUAGE
+
+    terms = list(dict.fromkeys(tokenize(query, language)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+
+    # Prefix matches (LIKE 'term%') use the (language, term) index
+    matches = Q()
+    for term in terms:
+        matches |= Q(term__startswith=term)
+
+    ranked = ProductSearchTerm.objects.filter(
+        matches, language=language
+    ).values('wc_id').annotate(
+        score=Sum(Case(
+            When(term__in=terms, then=F('weight') * EXACT_MATCH_FACTOR),
+            default=F('weight'),
+            output_field=IntegerField()
+        )),
+        matched=Count('term')
+    ).order_by('-score', '-matched', 'wc_id')
+
+    return [row['wc_id'] for row in ranked]
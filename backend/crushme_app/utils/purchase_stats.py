@@ -0,0 +1,125 @@
+"""
+Purchase Stats
+User purchase statistics in one aggregate query, cached in a UserPurchaseStats
+row that is updated incrementally from the purchase history m2m signals
+"""
+import logging
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+logger = logging.getLogger(__name__)
+
+STATS_FIELDS = ('total_purchases', 'gift_purchases', 'received_gifts_count', 'total_spent')
+
+
+def _count_subquery(rows):
+    return Coalesce(
+        Subquery(rows.annotate(n=Count('order_id')).values('n')),
+        Value(0),
+        output_field=IntegerField()
+    )
+
+
+def compute_purchase_stats(user_id):
+    """
+    Purchase statistics of a user in a single query (one scalar subquery per stat).
+
+    Returns:
+        dict: total_purchases, gift_purchases, received_gifts_count, total_spent
+    """
+    from ..models import User
+
+    purchases = User.purchase_history.through.objects.filter(
+        user_id=OuterRef('pk')
+    ).order_by().values('user_id')
+    received = User.received_gifts.through.objects.filter(
+        user_id=OuterRef('pk')
+    ).order_by().values('user_id')
+
+    stats = User.objects.filter(pk=user_id).annotate(
+        total_purchases=_count_subquery(purchases),
+        gift_purchases=_count_subquery(purchases.filter(order__is_gift=True)),
+        received_gifts_count=_count_subquery(received),
+        total_spent=Coalesce(
+            Subquery(purchases.annotate(s=Sum('order__total')).values('s')),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        )
+    ).values(*STATS_FIELDS).first()
+
+    return stats or {field: 0 for field in STATS_FIELDS}
+
+
+def get_purchase_stats(user):
+    """
+    Purchase statistics of a user from its stats row (created on first read).
+
+    Returns:
+        dict: STATS_FIELDS plus regular_purchases (total_spent as float)
+    """
+    from ..models import UserPurchaseStats
+
+    stats = UserPurchaseStats.objects.filter(user_id=user.pk).values(*STATS_FIELDS).first()
+    if stats is None:
+        stats = compute_purchase_stats(user.pk)
+        try:
+            UserPurchaseStats.objects.create(user_id=user.pk, **stats)
+        except IntegrityError:
+            # Otro request lo creó primero
+            pass
+
+    return {
+        'total_purchases': stats['total_purchases'],
+        'regular_purchases': stats['total_purchases'] - stats['gift_purchases'],
+        'gift_purchases': stats['gift_purchases'],
+        'received_gifts_count': stats['received_gifts_count'],
+        'total_spent': float(stats['total_spent'] or 0)
+    }
+
+
+def apply_purchase_delta(user_ids, order_ids, sign=1, received=False):
+    """
+    Add (sign=1) or subtract (sign=-1) orders from the stats rows of users.
+    Users without a row are skipped: their row is computed on first read.
+    """
+    from ..models import Order, UserPurchaseStats
+
+    rows = UserPurchaseStats.objects.filter(user_id__in=user_ids)
+    if not order_ids or not rows.exists():
+        return
+
+    if received:
+        rows.update(received_gifts_count=F('received_gifts_count') + sign * len(order_ids))
+        return
+
+    delta = Order.objects.filter(pk__in=order_ids).aggregate(
+        count=Count('id'),
+        gifts=Count('id', filter=Q(is_gift=True)),
+        spent=Sum('total')
+    )
+    rows.update(
+        total_purchases=F('total_purchases') + sign * delta['count'],
+        gift_purchases=F('gift_purchases') + sign * delta['gifts'],
+        total_spent=F('total_spent') + sign * (delta['spent'] or 0)
+    )
+
+
+def invalidate_purchase_stats(user_ids):
+    """Drop stats rows so they are recomputed on next read"""
+    from ..models import UserPurchaseStats
+
+    user_ids = list(user_ids)
+    if user_ids:
+        UserPurchaseStats.objects.filter(user_id__in=user_ids).delete()
+
+
+def order_stats_user_ids(order):
+    """Users whose stats include this order (purchasers and gift recipients)"""
+    from ..models import User
+
+    return set(User.objects.filter(
+        Q(purchase_history=order) | Q(received_gifts=order)
+    ).values_list('pk', flat=True))
@@ -0,0 +1,146 @@
+"""
+Review Summary
+Per-product review aggregates (ProductReviewSummary): active review count,
+rating sum and 1-5 star histogram. Review.save() and the Review post_delete
+signal apply each change as a delta on the locked summary row, inside the
+transaction that writes the review; rebuild_review_summaries recomputes rows
+from Review in one grouped query.
+"""
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+
+from .catalog_cache import purge_product_details_cache
+
+logger = logging.getLogger(__name__)
+
+STARS = range(1, 6)
+
+PRODUCT_CHUNK_SIZE = 500
+
+
+def _average(rating_sum, review_count):
+    if not review_count:
+        return Decimal('0')
+    return (Decimal(rating_sum) / review_count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def rebuild_review_summaries(product_ids=None):
+    """
+    Recompute review summaries from the active reviews.
+
+    Args:
+        product_ids: WooCommerce product IDs to rebuild (None = every product)
+
+    Returns:
+        int: Summary rows written
+    """
+    from ..models import ProductReviewSummary, Review
+
+    if product_ids is None:
+        product_ids = set(
+            Review.objects.values_list('woocommerce_product_id', flat=True).distinct()
+        ) | set(ProductReviewSummary.objects.values_list('woocommerce_product_id', flat=True))
+    product_ids = sorted(set(product_ids))
+    written = 0
+
+    for i in range(0, len(product_ids), PRODUCT_CHUNK_SIZE):
+        chunk = product_ids[i:i + PRODUCT_CHUNK_SIZE]
+        rows = Review.objects.filter(
+            woocommerce_product_id__in=chunk,
+            is_active=True
+        ).values('woocommerce_product_id').annotate(
+            review_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{f'stars_{star}': Count('id', filter=Q(rating=star)) for star in STARS}
+        ).order_by()
+
+        summaries = [
+            ProductReviewSummary(
+                average_rating=_average(row['rating_sum'], row['review_count']),
+                **row
+            )
+            for row in rows
+        ]
+
+        with transaction.atomic():
+            ProductReviewSummary.objects.filter(woocommerce_product_id__in=chunk).delete()
+            ProductReviewSummary.objects.bulk_create(summaries, batch_size=500)
+        written += len(summaries)
+
+    return written
+
+
+def _locked_summary(product_id):
+    """Summary row locked for update, or None if the product has none yet"""
+    from ..models import ProductReviewSummary
+
+    return ProductReviewSummary.objects.select_for_update().filter(
+        woocommerce_product_id=product_id
+    ).first()
+
+
+def apply_review_change(previous, current):
+    """
+    Move a review's contribution between summaries. Must run inside the
+    transaction that wrote the review.
+
+    Args:
+        previous: (product_id, rating, is_active) before the write, None if created
+        current: (product_id, rating, is_active) after the write, None if deleted
+    """
+    if previous == current:
+        return
+
+    changes = []
+    if previous and previous[2]:
+        changes.append((previous[0], previous[1], -1))
+    if current and current[2]:
+        changes.append((current[0], current[1], 1))
+
+    product_ids = {change[0] for change in changes}
+    for product_id in product_ids:
+        summary = _locked_summary(product_id)
+        if summary is None:
+            # Primera review del producto: el agregado ya incluye este cambio
+            try:
+                with transaction.atomic():
+                    rebuild_review_summaries([product_id])
+            except IntegrityError:
+                # Otra transacción creó la fila primero: aplicar el delta sobre ella
+                summary = _locked_summary(product_id)
+            if summary is None:
+                continue
+
+        for changed_id, rating, sign in changes:
+            if changed_id != product_id:
+                continue
+            summary.review_count += sign
+            summary.rating_sum += sign * rating
+            if rating in STARS:
+                star_field = f'stars_{rating}'
+                setattr(summary, star_field, getattr(summary, star_field) + sign)
+        summary.average_rating = _average(summary.rating_sum, summary.review_count)
+        summary.save()
+
+    if product_ids:
+        # Solo el detalle del producto: las listas y el índice de facetas
+        # recogen el rating al expirar (una reseña no invalida todo el catálogo)
+        transaction.on_commit(lambda: purge_product_details_cache(product_ids))
+
+
+def get_review_summaries(product_ids):
+    """
+    {product_id: (average_rating, review_count)} for products with active reviews.
+    """
+    from ..models import ProductReviewSummary
+
+    return {
+        product_id: (float(average), count)
+        for product_id, average, count in ProductReviewSummary.objects.filter(
+            woocommerce_product_id__in=list(product_ids),
+            review_count__gt=0
+        ).values_list('woocommerce_product_id', 'average_rating', 'review_count')
+    }
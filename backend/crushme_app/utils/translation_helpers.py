@@ -2,23 +2,90 @@
 Translation Helpers
 Utility functions to easily get translated content and apply price margins
 """
+from django.db.models import Count, prefetch_related_objects
+
 from ..models import (
     WooCommerceProduct,
     WooCommerceCategory,
-    TranslatedContent,
-    CategoryPriceMargin,
-    DefaultPriceMargin
+    WooCommerceProductVariation,
+    TranslatedContent
 )
 from .currency_converter import CurrencyConverter
+from .review_summary import get_review_summaries
+
+
+PRODUCT_TRANSLATION_TYPES = (
+    TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
+    TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
+    TranslatedContent.CONTENT_TYPE_PRODUCT_DESC,
+)
+
+PRODUCT_LIST_TRANSLATION_TYPES = (
+    TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
+    TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
+)
+
+CATEGORY_TRANSLATION_TYPES = (
+    TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,
+    TranslatedContent.CONTENT_TYPE_CATEGORY_DESC,
+)
+
+
+def get_translations_map(products=(), categories=(), target_language='en',
+                         product_types=PRODUCT_TRANSLATION_TYPES,
+                         category_types=CATEGORY_TRANSLATION_TYPES):
+    """
+    Resolve every translation needed for a page of products/categories in ONE query.
+    
+    Args:
+        products: Iterable of WooCommerceProduct instances
+        categories: Iterable of WooCommerceCategory instances
+        target_language: Target language code (default: 'en')
+        product_types: TranslatedContent content types to fetch for products
+        category_types: TranslatedContent content types to fetch for categories
+        
+    Returns:
+        dict: {(content_type, object_id, target_language): translated_text}
+    """
+    if target_language == 'es':
+        # Spanish is the source language, nothing to resolve
+        return {}
+    
+    lookups = set()
+    for product in products:
+        lookups.update((content_type, product.wc_id) for content_type in product_types)
+    for category in categories:
+        lookups.update((content_type, category.wc_id) for content_type in category_types)
+    
+    if not lookups:
+        return {}
+    
+    rows = TranslatedContent.objects.filter(
+        target_language=target_language,
+        content_type__in={content_type for content_type, _ in lookups},
+        object_id__in={object_id for _, object_id in lookups}
+    ).values_list('content_type', 'object_id', 'translated_text')
+    
+    return {
+        (content_type, object_id, target_language): translated_text
+        for content_type, object_id, translated_text in rows
+        if (content_type, object_id) in lookups
+    }
+
 
+def _resolve(translations, content_type, object_id, target_language, default):
+    """Get a translation from a translations map, falling back to the original text"""
+    return translations.get((content_type, object_id, target_language), default)
 
-def get_translated_product(product, target_language='en'):
+
+def get_translated_product(product, target_language='en', translations=None):
     """
     Get product with translated content.
     
     Args:
         product: WooCommerceProduct instance
         target_language: Target language code (default: 'en')
+        translations: Optional map from get_translations_map (avoids extra queries)
         
     Returns:
         dict: Product data with translations
@@ -32,52 +99,34 @@ def get_translated_product(product, target_language='en'):
             'description': product.description,
         }
     
-    # Get translations from cache
-    try:
-        name_trans = TranslatedContent.objects.get(
-            content_type=TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
-            object_id=product.wc_id,
-            target_language=target_language
-        )
-        name = name_trans.translated_text
-    except TranslatedContent.DoesNotExist:
-        name = product.name
-    
-    try:
-        short_desc_trans = TranslatedContent.objects.get(
-            content_type=TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
-            object_id=product.wc_id,
-            target_language=target_language
-        )
-        short_description = short_desc_trans.translated_text
-    except TranslatedContent.DoesNotExist:
-        short_description = product.short_description
-    
-    try:
-        desc_trans = TranslatedContent.objects.get(
-            content_type=TranslatedContent.CONTENT_TYPE_PRODUCT_DESC,
-            object_id=product.wc_id,
-            target_language=target_language
-        )
-        description = desc_trans.translated_text
-    except TranslatedContent.DoesNotExist:
-        description = product.description
+    if translations is None:
+        translations = get_translations_map(products=[product], target_language=target_language)
     
     return {
         'id': product.wc_id,
-        'name': name,
-        'short_description': short_description,
-        'description': description,
+        'name': _resolve(
+            translations, TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
+            product.wc_id, target_language, product.name
+        ),
+        'short_description': _resolve(
+            translations, TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
+            product.wc_id, target_language, product.short_description
+        ),
+        'description': _resolve(
+            translations, TranslatedContent.CONTENT_TYPE_PRODUCT_DESC,
+            product.wc_id, target_language, product.description
+        ),
     }
 
 
-def get_translated_category(category, target_language='en'):
+def get_translated_category(category, target_language='en', translations=None):
     """
     Get category with translated content.
     
     Args:
         category: WooCommerceCategory instance
         target_language: Target language code
+        translations: Optional map from get_translations_map (avoids extra queries)
         
     Returns:
         dict: Category data with translations
@@ -89,31 +138,19 @@ def get_translated_category(category, target_language='en'):
             'description': category.description,
         }
     
-    # Get translations
-    try:
-        name_trans = TranslatedContent.objects.get(
-            content_type=TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,
-            object_id=category.wc_id,
-            target_language=target_language
-        )
-        name = name_trans.translated_text
-    except TranslatedContent.DoesNotExist:
-        name = category.name
-    
-    try:
-        desc_trans = TranslatedContent.objects.get(
-            content_type=TranslatedContent.CONTENT_TYPE_CATEGORY_DESC,
-            object_id=category.wc_id,
-            target_language=target_language
-        )
-        description = desc_trans.translated_text
-    except TranslatedContent.DoesNotExist:
-        description = category.description
+    if translations is None:
+        translations = get_translations_map(categories=[category], target_language=target_language)
     
     return {
         'id': category.wc_id,
-        'name': name,
-        'description': description,
+        'name': _resolve(
+            translations, TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,
+            category.wc_id, target_language, category.name
+        ),
+        'description': _resolve(
+            translations, TranslatedContent.CONTENT_TYPE_CATEGORY_DESC,
+            category.wc_id, target_language, category.description
+        ),
     }
 
 
@@ -142,30 +179,8 @@ def calculate_product_price(product, target_currency='COP'):
     final_regular_price = product.final_regular_price
     final_sale_price = product.final_sale_price
     
-    # Get margin info for logging/debugging
-    margin = None
-    first_category = None
-    
-    # Get category for margin info
-    if hasattr(product, 'categories'):
-        # WooCommerceProduct
-        first_category = product.categories.first()
-    elif hasattr(product, 'product'):
-        # WooCommerceProductVariation - use parent's category
-        first_category = product.product.categories.first()
-    
-    if first_category:
-        try:
-            margin = CategoryPriceMargin.objects.get(
-                category=first_category,
-                is_active=True
-            )
-        except CategoryPriceMargin.DoesNotExist:
-            pass
-    
-    # Fallback to default margin for info
-    if not margin:
-        margin = DefaultPriceMargin.get_active()
+    # Margin info for logging/debugging (from the in-memory margin index)
+    margin_applied = product.get_margin_label()
     
     # Convert to target currency
     converted_price = CurrencyConverter.convert_price(final_price, target_currency)
@@ -178,12 +193,22 @@ def calculate_product_price(product, target_currency='COP'):
         'sale_price': converted_sale_price,
         'converted_price': converted_price,
         'converted_regular_price': converted_regular_price,
-        'margin_applied': str(margin) if margin else None,
+        'margin_applied': margin_applied,
         'currency': target_currency,
         'on_sale': product.on_sale
     }
 
 
+def get_product_rating(product, review_summaries=None):
+    """
+    (average_rating, rating_count) of a product: local review summary, or the
+    WooCommerce rating if it has no active local reviews.
+    """
+    if review_summaries is None:
+        review_summaries = get_review_summaries([product.wc_id])
+    return review_summaries.get(product.wc_id, (float(product.average_rating), product.rating_count))
+
+
 def get_product_full_data(product, target_language='en', include_stock=True, target_currency='COP'):
     """
     Get complete product data with translations, prices with margin, and optionally fresh stock.
@@ -197,25 +222,31 @@ def get_product_full_data(product, target_language='en', include_stock=True, tar
     Returns:
         dict: Complete product data
     """
-    from ..services.translation_service import TranslationService
+    from ..services.attribute_dictionary import attribute_dictionary, clean_attribute_name
     
     # Get product instance if ID was provided
     if isinstance(product, int):
-        product = WooCommerceProduct.objects.get(wc_id=product)
+        product = WooCommerceProduct.objects.prefetch_related('categories', 'images').get(wc_id=product)
     
-    # Create translator for attribute translations
-    translator = TranslationService(target_language=target_language)
+    # Attribute names/options are looked up in the precomputed dictionary
+    attribute_terms = attribute_dictionary.get_terms(target_language)
     
-    # Get translations
-    translated = get_translated_product(product, target_language)
+    # Resolve product and category translations in a single query
+    product_categories = list(product.categories.all())
+    translations = get_translations_map(
+        products=[product],
+        categories=product_categories,
+        target_language=target_language
+    )
+    translated = get_translated_product(product, target_language, translations)
     
     # Calculate prices with margin and currency conversion
     prices = calculate_product_price(product, target_currency)
     
     # Get categories with translations
     categories = []
-    for cat in product.categories.all():
-        cat_translated = get_translated_category(cat, target_language)
+    for cat in product_categories:
+        cat_translated = get_translated_category(cat, target_language, translations)
         categories.append({
             'id': cat.wc_id,
             'name': cat_translated['name'],
@@ -233,6 +264,8 @@ def get_product_full_data(product, target_language='en', include_stock=True, tar
             'position': img.position
         })
     
+    average_rating, rating_count = get_product_rating(product)
+    
     # Base data
     data = {
         'id': product.wc_id,
@@ -248,8 +281,8 @@ def get_product_full_data(product, target_language='en', include_stock=True, tar
         'on_sale': prices['on_sale'],
         'categories': categories,
         'images': images,
-        'average_rating': float(product.average_rating),
-        'rating_count': product.rating_count,
+        'average_rating': average_rating,
+        'rating_count': rating_count,
         'featured': product.featured,
         'status': product.status,
         # Stock info (always included, from local DB)
@@ -312,16 +345,14 @@ def get_product_full_data(product, target_language='en', include_stock=True, tar
         attributes_list = []
         for attr_key, attr_values in attributes_map.items():
             # Clean attribute key (remove 'attribute_pa_' prefix if exists)
-            clean_key = attr_key.replace('attribute_pa_', '').replace('attribute_', '')
-            
-            # Translate attribute name
-            translated_attr_name = translator.translate_if_needed(clean_key, content_language='es')
+            clean_key = clean_attribute_name(attr_key)
             
-            # Translate attribute values
-            translated_options = []
-            for option_value in sorted(list(attr_values)):
-                translated_value = translator.translate_if_needed(option_value, content_language='es')
-                translated_options.append(translated_value)
+            # Translate attribute name and values
+            translated_attr_name = attribute_terms.get(clean_key, clean_key)
+            translated_options = [
+                attribute_terms.get(option_value, option_value)
+                for option_value in sorted(attr_values)
+            ]
             
             attributes_list.append({
                 'name': translated_attr_name,
@@ -335,14 +366,9 @@ def get_product_full_data(product, target_language='en', include_stock=True, tar
         # Translate attributes in variations summary
         translated_variations_summary = []
         for variation in variations_summary:
-            translated_attributes = {}
-            for attr_key, attr_value in variation['attributes'].items():
-                # Clean attribute key
-                clean_key = attr_key.replace('attribute_pa_', '').replace('attribute_', '')
-                # Translate both key and value
-                translated_key = translator.translate_if_needed(clean_key, content_language='es')
-                translated_value = translator.translate_if_needed(attr_value, content_language='es')
-                translated_attributes[translated_key] = translated_value
+            translated_attributes = attribute_dictionary.translate_attributes(
+                variation['attributes'], target_language, attribute_terms
+            )
             
             translated_variations_summary.append({
                 'id': variation['id'],
@@ -375,40 +401,65 @@ def get_products_list(queryset, target_language='en', include_stock=False, targe
     Returns:
         list: List of product data
     """
-    products = []
+    products = list(queryset)
+    
+    # Batch-load everything the page needs so the query count stays constant
+    prefetch_related_objects(products, 'categories', 'images')
+    
+    first_categories = {}
+    for product in products:
+        product_categories = list(product.categories.all())
+        first_categories[product.wc_id] = product_categories[0] if product_categories else None
     
-    for product in queryset:
+    translations = get_translations_map(
+        products=products,
+        categories=[cat for cat in first_categories.values() if cat],
+        target_language=target_language,
+        product_types=PRODUCT_LIST_TRANSLATION_TYPES,
+        category_types=(TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,)
+    )
+    
+    # Local review aggregates (one row per product)
+    review_summaries = get_review_summaries([product.wc_id for product in products])
+    
+    variable_ids = [product.id for product in products if product.is_variable]
+    variations_counts = {}
+    if variable_ids:
+        variations_counts = dict(
+            WooCommerceProductVariation.objects.filter(
+                product_id__in=variable_ids,
+                status='publish'
+            ).values('product_id').annotate(total=Count('id')).order_by().values_list('product_id', 'total')
+        )
+    
+    results = []
+    
+    for product in products:
         # Get basic translations (name and short description only)
-        try:
-            name_trans = TranslatedContent.objects.get(
-                content_type=TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
-                object_id=product.wc_id,
-                target_language=target_language
-            ) if target_language != 'es' else None
-            name = name_trans.translated_text if name_trans else product.name
-        except TranslatedContent.DoesNotExist:
-            name = product.name
-        
-        try:
-            short_desc_trans = TranslatedContent.objects.get(
-                content_type=TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
-                object_id=product.wc_id,
-                target_language=target_language
-            ) if target_language != 'es' else None
-            short_description = short_desc_trans.translated_text if short_desc_trans else product.short_description
-        except TranslatedContent.DoesNotExist:
-            short_description = product.short_description
+        name = _resolve(
+            translations, TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
+            product.wc_id, target_language, product.name
+        )
+        short_description = _resolve(
+            translations, TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
+            product.wc_id, target_language, product.short_description
+        )
         
         # Calculate prices with currency conversion
         prices = calculate_product_price(product, target_currency)
         
+        average_rating, rating_count = get_product_rating(product, review_summaries)
+        
+        # Get all images ordered by position (from prefetch cache)
+        product_images = sorted(product.images.all(), key=lambda img: img.position)
+        
         # Get primary image (single URL for simple display)
-        primary_image = product.primary_image
+        primary_image = next((img for img in product_images if img.position == 0), None)
         image_url = primary_image.src if primary_image else None
         
         # Get all images in WooCommerce format
         images_data = []
-        for img in product.images.all().order_by('position'):
+        for img in product_images:
             images_data.append({
                 'id': img.wc_id,
                 'src': img.src,
@@ -418,19 +469,13 @@ def get_products_list(queryset, target_language='en', include_stock=False, targe
             })
         
         # Get first category
-        first_category = product.categories.first()
-        category_name = first_category.name if first_category else None
-        
-        if first_category and target_language != 'es':
-            try:
-                cat_trans = TranslatedContent.objects.get(
-                    content_type=TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,
-                    object_id=first_category.wc_id,
-                    target_language=target_language
-                )
-                category_name = cat_trans.translated_text
-            except TranslatedContent.DoesNotExist:
-                pass
+        first_category = first_categories[product.wc_id]
+        category_name = None
+        if first_category:
+            category_name = _resolve(
+                translations, TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,
+                first_category.wc_id, target_language, first_category.name
+            )
         
         product_data = {
             'id': product.wc_id,
@@ -449,14 +494,14 @@ def get_products_list(queryset, target_language='en', include_stock=False, targe
             'images': images_data,  # Full images array in WooCommerce format
             'category': category_name,
             'featured': product.featured,
-            'average_rating': float(product.average_rating),
-            'rating_count': product.rating_count,
+            'average_rating': average_rating,
+            'rating_count': rating_count,
         }
         
         # Add product type info for frontend logic
         if product.is_variable:
             product_data['is_variable'] = True
-            product_data['variations_count'] = product.variations.filter(status='publish').count()
+            product_data['variations_count'] = variations_counts.get(product.id, 0)
         else:
             product_data['is_variable'] = False
         
@@ -466,6 +511,6 @@ def get_products_list(queryset, target_language='en', include_stock=False, targe
                 product_data['stock_status'] = product.stock_status
                 product_data['in_stock'] = product.stock_status == 'instock'
         
-        products.append(product_data)
+        results.append(product_data)
     
-    return products
+    return results
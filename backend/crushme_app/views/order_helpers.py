@@ -7,11 +7,10 @@ from rest_framework import status
 from django.db import transaction
 from django.contrib.auth import get_user_model
 import logging
-import threading
 
-from ..models import Order, OrderItem, Feed
+from ..models import Order, OrderItem
 from ..serializers.order_serializers import OrderDetailSerializer
-from ..services.email_service import email_service
+from ..services.post_payment_service import post_payment_service
 from ..services.translation_service import get_language_from_request
 
 logger = logging.getLogger(__name__)
@@ -72,6 +71,28 @@ def process_order_after_payment(request_data, payment_info, payment_provider='pa
         transaction_id = payment_info.get('transaction_id')
         gift_data = cache.get(f'gift_data_{transaction_id}', {})
         
+        # Email amounts: Wompi = COP, PayPal = USD
+        currency = 'COP' if payment_provider == 'wompi' else 'USD'
+        email_context = post_payment_service.build_email_context(items, shipping_cost, total_amount, currency)
+        shipping_cost_cents = int(request_data.get('shipping', 0))
+        
+        # Idempotency: a retried confirm/webhook for the same payment returns the existing order
+        # (and re-queues its post-payment tasks if they didn't finish; they skip completed steps)
+        if transaction_id:
+            existing_order = Order.objects.filter(transaction_id=transaction_id).first()
+            if existing_order:
+                logger.info(f"⏭️ Order {existing_order.order_number} already exists for transaction {transaction_id}")
+                if existing_order.post_payment_status != Order.POST_PAYMENT_COMPLETED:
+                    post_payment_service.enqueue(existing_order, lang, email_context, shipping_cost_cents)
+                return Response({
+                    'success': True,
+                    'already_processed': True,
+                    'message': 'Order already processed',
+                    'order': OrderDetailSerializer(existing_order).data
+                }, status=status.HTTP_200_OK)
+        
+        receiver_username = gift_data.get('receiver_username', request_data.get('receiver_username'))
+        
         # STEP 3: Create local order
         with transaction.atomic():
             order = Order.objects.create(
@@ -90,16 +111,12 @@ def process_order_after_payment(request_data, payment_info, payment_provider='pa
                 gift_message=gift_data.get('gift_message', request_data.get('gift_message', '')),
                 is_gift=gift_data.get('is_gift', request_data.get('is_gift', False)),
                 sender_username=gift_data.get('sender_username', request_data.get('sender_username')),
-                receiver_username=gift_data.get('receiver_username', request_data.get('receiver_username')),
+                receiver_username=receiver_username,
                 transaction_id=transaction_id,  # Save payment transaction ID
                 payment_provider=payment_provider,  # Save payment provider
                 status='processing'  # Payment confirmed, processing order
             )
             
-            # Clean up cache after successful order creation
-            if gift_data:
-                cache.delete(f'gift_data_{transaction_id}')
-            
             # Create order items
             for item in items:
                 OrderItem.objects.create(
@@ -112,171 +129,32 @@ def process_order_after_payment(request_data, payment_info, payment_provider='pa
                     product_description=f"Price: ${item['unit_price']}"
                 )
             
+            # STEP 4: Update user history and gift tracking
+            from .paypal_order_views import _update_user_history_and_gifts
+            _update_user_history_and_gifts(order, receiver_username)
+            
+            # STEP 5: Emails, feed entries and WooCommerce sync run as Huey tasks after commit
+            post_payment_service.enqueue(order, lang, email_context, shipping_cost_cents)
+            
             logger.info(f"✅ Order {order.order_number} created locally")
         
-        # STEP 4: Remove purchased items from wishlist (if purchase is from wishlist)
+        # Clean up cache after successful order creation
+        if gift_data:
+            cache.delete(f'gift_data_{transaction_id}')
+        
+        # STEP 6: Remove purchased items from wishlist (if purchase is from wishlist)
         is_from_wishlist = gift_data.get('is_from_wishlist', request_data.get('is_from_wishlist', False))
         wishlist_id = gift_data.get('wishlist_id', request_data.get('wishlist_id'))
         
         if is_from_wishlist and wishlist_id:
             try:
                 from .gift_views import _remove_purchased_items_from_wishlist
-                receiver_username = gift_data.get('receiver_username', request_data.get('receiver_username'))
                 _remove_purchased_items_from_wishlist(wishlist_id, items, receiver_username)
                 logger.info(f"✅ Removed purchased items from wishlist {wishlist_id}")
             except Exception as e:
                 logger.error(f"⚠️ Error removing items from wishlist: {str(e)}")
                 # Don't fail the order if wishlist update fails
         
-        # STEP 5: Update user history and gift tracking
-        from .paypal_order_views import _update_user_history_and_gifts
-        receiver_username = gift_data.get('receiver_username', request_data.get('receiver_username'))
-        _update_user_history_and_gifts(order, receiver_username)
-        
-        # STEP 5.5: Send email notifications
-        try:
-            # Detect currency based on payment provider
-            # Wompi = COP, PayPal = USD
-            currency = 'COP' if payment_provider == 'wompi' else 'USD'
-            
-            # Prepare items for email (filter out dropshipping products)
-            from ..models import WooCommerceProduct
-            email_items = []
-            dropshipping_cost = 0
-            
-            for item in items:
-                # Check if product is dropshipping (ID 48500 or contains "dropshipping" in name)
-                is_dropshipping = (
-                    item.get('woocommerce_product_id') == 48500 or
-                    'dropshipping' in item.get('product_name', '').lower()
-                )
-                
-                if is_dropshipping:
-                    # Add dropshipping cost to shipping
-                    dropshipping_cost += float(item['unit_price']) * item['quantity']
-                    logger.info(f"📦 Dropshipping product found: {item['product_name']} - Adding ${dropshipping_cost} to shipping")
-                else:
-                    # Use product name from request (frontend sends it)
-                    product_name = item.get('product_name', 'Product')
-                    # Price with margin (unit_price already includes margin from frontend)
-                    unit_price = float(item['unit_price'])
-                    logger.info(f"📧 Adding product to email: {product_name} x{item['quantity']} @ ${unit_price}")
-                    
-                    # Format price based on currency
-                    if currency == 'COP':
-                        formatted_price = f"{int(round(unit_price))}"
-                    else:
-                        formatted_price = f"{round(unit_price, 2):.2f}"
-                    
-                    # Add regular product to email items (name, quantity, and price)
-                    email_items.append({
-                        'name': product_name,
-                        'quantity': item['quantity'],
-                        'price': formatted_price
-                    })
-            
-            # Calculate shipping for email (includes dropshipping cost)
-            email_shipping = shipping_cost + dropshipping_cost
-            
-            # Calculate subtotal (only regular products)
-            email_subtotal = sum(float(item['unit_price']) * item['quantity'] for item in items if not (
-                item.get('woocommerce_product_id') == 48500 or 'dropshipping' in item.get('product_name', '').lower()
-            ))
-            
-            # Format amounts based on currency
-            if currency == 'COP':
-                # COP: no decimals
-                formatted_total = f"{int(round(total_amount))}"
-                formatted_subtotal = f"{int(round(email_subtotal))}"
-                formatted_shipping = f"{int(round(email_shipping))}"
-            else:
-                # USD: 2 decimals
-                formatted_total = f"{round(total_amount, 2):.2f}"
-                formatted_subtotal = f"{round(email_subtotal, 2):.2f}"
-                formatted_shipping = f"{round(email_shipping, 2):.2f}"
-            
-            # Send order confirmation to purchaser
-            email_service.send_order_confirmation(
-                to_email=customer_email,
-                order_number=order.order_number,
-                total=formatted_total,
-                subtotal=formatted_subtotal,
-                shipping=formatted_shipping,
-                currency=currency,
-                items=email_items,
-                username=user.username,
-                lang=lang
-            )
-            logger.info(f"📧 Order confirmation email sent to {customer_email} (lang: {lang}, currency: {currency})")
-            
-            # Create feed entry for order confirmation
-            try:
-                Feed.create_feed_entry(
-                    user=user,
-                    action='order_confirmation',
-                    lang=lang
-                )
-            except Exception as feed_error:
-                logger.error(f"Feed creation error: {str(feed_error)}")
-            
-            # If it's a gift, send notifications
-            if order.is_gift and receiver_username:
-                try:
-                    receiver_user = User.objects.get(username=receiver_username)
-                    
-                    # Send gift received notification to receiver
-                    email_service.send_gift_received_notification(
-                        to_email=receiver_user.email,
-                        sender_username=user.username,
-                        gift_message=order.gift_message or '',
-                        order_number=order.order_number,
-                        username=receiver_user.username,
-                        lang=lang
-                    )
-                    logger.info(f"📧 Gift received notification sent to {receiver_user.email}")
-                    
-                    # Create feed entry for gift received
-                    try:
-                        Feed.create_feed_entry(
-                            user=receiver_user,
-                            action='gift_received',
-                            lang=lang,
-                            sender_username=user.username
-                        )
-                    except Exception as feed_error:
-                        logger.error(f"Feed creation error: {str(feed_error)}")
-                    
-                    # Send gift sent confirmation to sender
-                    email_service.send_gift_sent_confirmation(
-                        to_email=customer_email,
-                        receiver_username=receiver_user.username,
-                        order_number=order.order_number,
-                        username=user.username,
-                        lang=lang
-                    )
-                    logger.info(f"📧 Gift sent confirmation sent to {customer_email}")
-                    
-                    # Create feed entry for gift sent
-                    try:
-                        Feed.create_feed_entry(
-                            user=user,
-                            action='gift_sent',
-                            lang=lang,
-                            receiver_username=receiver_user.username
-                        )
-                    except Exception as feed_error:
-                        logger.error(f"Feed creation error: {str(feed_error)}")
-                    
-                except User.DoesNotExist:
-                    logger.warning(f"⚠️ Receiver user {receiver_username} not found for gift notifications")
-        except Exception as e:
-            logger.error(f"❌ Error sending email notifications: {str(e)}")
-            # Don't fail the order if email fails
-        
-        # STEP 6: Send order to WooCommerce in background (non-blocking)
-        from .paypal_order_views import send_to_woocommerce_async
-        
-        # Build response first (immediate, doesn't wait for WooCommerce)
         order_serializer = OrderDetailSerializer(order)
         
         response_data = {
@@ -296,19 +174,6 @@ def process_order_after_payment(request_data, payment_info, payment_provider='pa
             }
         }
         
-        # Start WooCommerce sync in background
-        shipping_cost_cents = int(request_data.get('shipping', 0))
-        woocommerce_thread = threading.Thread(
-            target=send_to_woocommerce_async,
-            args=(order.id, shipping_cost_cents),
-            name=f"WooCommerce-Sync-{order.order_number}"
-        )
-        woocommerce_thread.daemon = False
-        
-        logger.info(f"🔧 [ORDER HELPER] Iniciando thread WooCommerce para orden {order.order_number}")
-        woocommerce_thread.start()
-        logger.info(f"⏳ WooCommerce sync started in background for order {order.order_number}")
-        
         return Response(response_data, status=status.HTTP_201_CREATED)
     
     except Exception as e:
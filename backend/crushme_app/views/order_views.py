@@ -6,7 +6,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
+from django.db.models import Count, Q
 import logging
 
 from ..models import Order, Cart
@@ -16,6 +16,7 @@ from ..serializers.order_serializers import (
     OrderCancelSerializer, OrderPrivateSerializer
 )
 from ..services.woocommerce_order_service import woocommerce_order_service
+from ..utils.purchase_stats import get_purchase_stats
 
 logger = logging.getLogger(__name__)
 
@@ -306,46 +307,60 @@ def update_order_status(request, order_id):
 def get_order_statistics(request):
     """
     Get order statistics (Admin only)
+    Reads the hourly rollups (today is computed live); the pending/processing
+    work queue is always counted live
+    
+    Query Parameters:
+    - date_from: First day included (YYYY-MM-DD, optional)
+    - date_to: Last day included (YYYY-MM-DD, optional)
     """
-    from django.db.models import Count, Sum
+    from datetime import datetime, time, timedelta
     from django.utils import timezone
-    from datetime import timedelta
+    from ..utils.order_stats import ensure_order_stats_rollups, get_order_stats
+    
+    try:
+        date_from = request.query_params.get('date_from')
+        date_to = request.query_params.get('date_to')
+        start = timezone.make_aware(datetime.combine(datetime.strptime(date_from, '%Y-%m-%d'), time.min)) if date_from else None
+        end = timezone.make_aware(datetime.combine(datetime.strptime(date_to, '%Y-%m-%d'), time.min)) + timedelta(days=1) if date_to else None
+    except ValueError:
+        return Response({
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Calculate statistics
-    total_orders = Order.objects.count()
-    total_revenue = Order.objects.filter(
-        status__in=['delivered', 'shipped']
-    ).aggregate(Sum('total'))['total__sum'] or 0
+    ensure_order_stats_rollups()
     
-    # Orders by status
-    orders_by_status = Order.objects.values('status').annotate(
-        count=Count('id')
-    ).order_by('status')
+    # Statistics for the requested range (all time by default)
+    stats = get_order_stats(start, end)
     
     # Recent orders (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_orders = Order.objects.filter(created_at__gte=thirty_days_ago).count()
-    recent_revenue = Order.objects.filter(
-        created_at__gte=thirty_days_ago,
-        status__in=['delivered', 'shipped']
-    ).aggregate(Sum('total'))['total__sum'] or 0
+    recent = get_order_stats(start=timezone.now() - timedelta(days=30))
     
-    # Pending orders requiring attention
-    pending_orders = Order.objects.filter(status='pending').count()
-    processing_orders = Order.objects.filter(status='processing').count()
+    # Work queue: live counts (rollups only see status changes after the next run)
+    status_counts = dict(
+        Order.objects.filter(status__in=('pending', 'processing'))
+        .values('status').annotate(count=Count('id')).order_by()
+        .values_list('status', 'count')
+    )
     
     return Response({
         'statistics': {
-            'total_orders': total_orders,
-            'total_revenue': str(total_revenue),
-            'orders_by_status': list(orders_by_status),
+            'total_orders': stats['total_orders'],
+            'total_revenue': stats['total_revenue'],
+            'orders_by_status': stats['orders_by_status'],
+            'orders_by_gift': stats['orders_by_gift'],
+            'orders_by_payment_provider': stats['orders_by_payment_provider'],
+            'range': {
+                'date_from': date_from,
+                'date_to': date_to
+            },
             'recent_30_days': {
-                'orders': recent_orders,
-                'revenue': str(recent_revenue)
+                'orders': recent['total_orders'],
+                'revenue': recent['total_revenue']
             },
             'requires_attention': {
-                'pending_orders': pending_orders,
-                'processing_orders': processing_orders
+                'pending_orders': status_counts.get('pending', 0),
+                'processing_orders': status_counts.get('processing', 0)
             }
         }
     }, status=status.HTTP_200_OK)
@@ -393,6 +408,8 @@ def get_gift_orders(request):
     end_index = start_index + page_size
 
     paginated_orders = gift_orders[start_index:end_index]
+    total_orders = gift_orders.count()
+    user_stats = get_purchase_stats(user)
 
     # Serialize orders using FAST local DB serializer (no WooCommerce queries)
     from ..serializers.order_serializers import OrderHistorySerializer
@@ -406,21 +423,21 @@ def get_gift_orders(request):
         'pagination': {
             'current_page': page,
             'page_size': page_size,
-            'total_orders': gift_orders.count(),
-            'total_pages': (gift_orders.count() + page_size - 1) // page_size,
-            'has_next': end_index < gift_orders.count(),
+            'total_orders': total_orders,
+            'total_pages': (total_orders + page_size - 1) // page_size,
+            'has_next': end_index < total_orders,
             'has_previous': page > 1
         },
         'gift_summary': {
             'type': gift_type,
-            'total_gifts': gift_orders.count(),
+            'total_gifts': total_orders,
             'sent_gifts': Order.objects.filter(is_gift=True, sender_username=user.username).count(),
             'received_gifts': Order.objects.filter(is_gift=True, receiver_username=user.username).count()
         },
         'user_stats': {
-            'total_purchases': user.purchase_history.count(),
+            'total_purchases': user_stats['total_purchases'],
             'sent_gifts_count': user.sent_gifts_count,
-            'received_gifts_count': user.received_gifts.count()
+            'received_gifts_count': user_stats['received_gifts_count']
         }
     }
     
@@ -454,6 +471,10 @@ def get_user_purchase_history(request):
     else:
         purchases = user.purchase_history.prefetch_related('items').filter(is_gift=False).order_by('-created_at')
 
+    # Stats row (one aggregate query the first time, then a single-row read)
+    user_stats = get_purchase_stats(user)
+    total_count = user_stats['total_purchases'] if include_gifts else user_stats['regular_purchases']
+
     # Paginate results
     page = int(request.GET.get('page', 1))
     page_size = int(request.GET.get('page_size', 10))
@@ -474,18 +495,18 @@ def get_user_purchase_history(request):
         'pagination': {
             'current_page': page,
             'page_size': page_size,
-            'total_purchases': purchases.count(),
-            'total_pages': (purchases.count() + page_size - 1) // page_size,
-            'has_next': end_index < purchases.count(),
+            'total_purchases': total_count,
+            'total_pages': (total_count + page_size - 1) // page_size,
+            'has_next': end_index < total_count,
             'has_previous': page > 1
         },
         'user_stats': {
-            'total_purchases': user.purchase_history.count(),
-            'regular_purchases': user.purchase_history.filter(is_gift=False).count(),
-            'gift_purchases': user.purchase_history.filter(is_gift=True).count(),
+            'total_purchases': user_stats['total_purchases'],
+            'regular_purchases': user_stats['regular_purchases'],
+            'gift_purchases': user_stats['gift_purchases'],
             'sent_gifts_count': user.sent_gifts_count,
-            'received_gifts_count': user.received_gifts.count(),
-            'total_spent': float(sum(order.total for order in user.purchase_history.all()))
+            'received_gifts_count': user_stats['received_gifts_count'],
+            'total_spent': user_stats['total_spent']
         },
         'currency': currency  # Add currency to response
     }
@@ -10,13 +10,12 @@ from django.db import transaction
 from django.contrib.auth import get_user_model
 import logging
 import secrets
-import threading
 
 from ..models import Order, OrderItem
 from ..serializers.order_serializers import OrderDetailSerializer
 from ..services.paypal_service import paypal_service
 from ..services.woocommerce_order_service import woocommerce_order_service
-from ..services.email_service import email_service
+from ..services.post_payment_service import post_payment_service
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -213,111 +212,6 @@ def create_paypal_order_data(data_dict):
         }, status=500)
 
 
-def send_to_woocommerce_async(order_id, shipping_cost_cents=0):
-    """
-    Send order to WooCommerce in background thread
-    This prevents blocking the response to the frontend
-
-    Args:
-        order_id: ID of the order to send to WooCommerce
-        shipping_cost_cents: Shipping cost in cents for WooCommerce
-    """
-    import sys
-    import time
-
-    # Force flush to ensure logs appear immediately
-    print(f"\n{'='*80}", file=sys.stderr, flush=True)
-    print(f"🚀 [WOOCOMMERCE THREAD] Thread iniciado para Order ID: {order_id}", file=sys.stderr, flush=True)
-    print(f"{'='*80}\n", file=sys.stderr, flush=True)
-
-    try:
-        # Small delay to ensure the main transaction is committed
-        time.sleep(0.1)
-
-        print(f"📊 [WOOCOMMERCE THREAD] Obteniendo orden de la base de datos...", file=sys.stderr, flush=True)
-
-        # Check if order exists before trying to get it
-        if not Order.objects.filter(id=order_id).exists():
-            print(f"❌ [WOOCOMMERCE THREAD] Orden {order_id} no existe en la base de datos", file=sys.stderr, flush=True)
-            print(f"{'='*80}\n", file=sys.stderr, flush=True)
-            return
-
-        # Get the order (fresh query in this thread)
-        order = Order.objects.get(id=order_id)
-        
-        print(f"✅ [WOOCOMMERCE THREAD] Orden obtenida: {order.order_number}", file=sys.stderr, flush=True)
-        
-        logger.info("=" * 80)
-        logger.info(f"🔄 [WOOCOMMERCE SYNC] Iniciando sincronización...")
-        logger.info(f"📦 [WOOCOMMERCE SYNC] Orden Local: {order.order_number}")
-        logger.info(f"💰 [WOOCOMMERCE SYNC] Total: ${order.total}")
-        logger.info(f"📧 [WOOCOMMERCE SYNC] Cliente: {order.name} ({order.email})")
-        logger.info(f"📍 [WOOCOMMERCE SYNC] Destino: {order.city}, {order.state}, {order.country}")
-        
-        print(f"🔄 [WOOCOMMERCE THREAD] Enviando a WooCommerce...", file=sys.stderr, flush=True)
-        # Use shipping cost passed as parameter
-        print(f"📦 [WOOCOMMERCE THREAD] Shipping cost: {shipping_cost_cents} cents", file=sys.stderr, flush=True)
-        wc_result = woocommerce_order_service.send_order(order, shipping_cost=shipping_cost_cents)
-        
-        if wc_result['success']:
-            try:
-                # Update order with WooCommerce ID (check if order still exists)
-                if Order.objects.filter(id=order.id).exists():
-                    order.woocommerce_order_id = wc_result.get('woocommerce_order_id')
-                    order.save(update_fields=['woocommerce_order_id'])
-
-                    logger.info("=" * 80)
-                    logger.info(f"✅ [WOOCOMMERCE SYNC] ¡ORDEN ENVIADA EXITOSAMENTE!")
-                    logger.info(f"🆔 [WOOCOMMERCE SYNC] WooCommerce Order ID: {wc_result.get('woocommerce_order_id')}")
-                    logger.info(f"🔢 [WOOCOMMERCE SYNC] WooCommerce Order Number: {wc_result.get('woocommerce_order_number')}")
-                    logger.info(f"📦 [WOOCOMMERCE SYNC] Orden Local: {order.order_number}")
-                    logger.info(f"🔗 [WOOCOMMERCE SYNC] URL: {wc_result.get('woocommerce_url', 'N/A')}")
-                    logger.info("=" * 80)
-
-                    print(f"\n{'='*80}", file=sys.stderr, flush=True)
-                    print(f"✅ [WOOCOMMERCE THREAD] ÉXITO! WC Order ID: {wc_result.get('woocommerce_order_id')}", file=sys.stderr, flush=True)
-                    print(f"{'='*80}\n", file=sys.stderr, flush=True)
-                else:
-                    logger.warning(f"⚠️ [WOOCOMMERCE SYNC] Orden {order.order_number} ya no existe para actualizar ID de WooCommerce")
-                    logger.warning(f"🆔 [WOOCOMMERCE SYNC] WooCommerce Order ID: {wc_result.get('woocommerce_order_id')} (pero orden local eliminada)")
-
-                    print(f"\n{'='*80}", file=sys.stderr, flush=True)
-                    print(f"⚠️ [WOOCOMMERCE THREAD] Orden eliminada después de envío a WooCommerce", file=sys.stderr, flush=True)
-                    print(f"🆔 [WOOCOMMERCE THREAD] WC Order ID: {wc_result.get('woocommerce_order_id')}", file=sys.stderr, flush=True)
-                    print(f"{'='*80}\n", file=sys.stderr, flush=True)
-            except Exception as update_error:
-                logger.error(f"❌ [WOOCOMMERCE SYNC] Error actualizando orden con WC ID: {update_error}")
-
-                print(f"\n{'='*80}", file=sys.stderr, flush=True)
-                print(f"❌ [WOOCOMMERCE THREAD] Error actualizando orden: {update_error}", file=sys.stderr, flush=True)
-                print(f"{'='*80}\n", file=sys.stderr, flush=True)
-        else:
-            logger.error("=" * 80)
-            logger.error(f"❌ [WOOCOMMERCE SYNC] ERROR AL ENVIAR ORDEN")
-            logger.error(f"📦 [WOOCOMMERCE SYNC] Orden Local: {order.order_number}")
-            logger.error(f"⚠️  [WOOCOMMERCE SYNC] Error: {wc_result.get('error')}")
-            logger.error(f"📝 [WOOCOMMERCE SYNC] Detalles: {wc_result.get('details', 'N/A')}")
-            logger.error("=" * 80)
-            
-            print(f"\n{'='*80}", file=sys.stderr, flush=True)
-            print(f"❌ [WOOCOMMERCE THREAD] ERROR: {wc_result.get('error')}", file=sys.stderr, flush=True)
-            print(f"{'='*80}\n", file=sys.stderr, flush=True)
-            
-    except Exception as e:
-        logger.error("=" * 80)
-        logger.error(f"❌ [WOOCOMMERCE SYNC] EXCEPCIÓN EN THREAD")
-        logger.error(f"📦 [WOOCOMMERCE SYNC] Order ID: {order_id}")
-        logger.error(f"⚠️  [WOOCOMMERCE SYNC] Error: {str(e)}")
-        logger.error("=" * 80)
-        import traceback
-        logger.error(traceback.format_exc())
-        
-        print(f"\n{'='*80}", file=sys.stderr, flush=True)
-        print(f"❌ [WOOCOMMERCE THREAD] EXCEPCIÓN: {str(e)}", file=sys.stderr, flush=True)
-        print(f"{'='*80}\n", file=sys.stderr, flush=True)
-        traceback.print_exc(file=sys.stderr)
-
-
 def get_or_create_user(email, name):
     """
     Get existing user by email or create a new one
@@ -498,9 +392,9 @@ def capture_paypal_order(request):
     2. Get or create user account (auto-register if new email)
     3. If successful → Create local order
     4. Return immediate response to frontend (fast)
-    5. Send order to WooCommerce in background (slow, non-blocking)
+    5. Emails and WooCommerce sync run as Huey tasks after commit (with retries)
     
-    Note: WooCommerce sync happens asynchronously to prevent timeout issues.
+    Note: A retried capture for the same paypal_order_id returns the existing order.
     """
     try:
         paypal_order_id = request.data.get('paypal_order_id')
@@ -525,6 +419,17 @@ def capture_paypal_order(request):
                     'error': 'Invalid item format'
                 }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Already captured (retried request): return the existing order
+        existing_order = Order.objects.filter(transaction_id=paypal_order_id).first()
+        if existing_order:
+            logger.info(f"⏭️ Order {existing_order.order_number} already exists for PayPal order {paypal_order_id}")
+            return Response({
+                'success': True,
+                'already_processed': True,
+                'message': 'Order already processed',
+                'order': OrderDetailSerializer(existing_order).data
+            }, status=status.HTTP_200_OK)
+        
         # STEP 1: Capture PayPal payment
         logger.info(f"Capturing PayPal payment: {paypal_order_id}")
         capture_result = paypal_service.capture_order(paypal_order_id)
@@ -576,6 +481,8 @@ def capture_paypal_order(request):
             is_gift=gift_data.get('is_gift', request.data.get('is_gift', False)),  # From cache or request
             sender_username=gift_data.get('sender_username', request.data.get('sender_username')),  # From cache or request
             receiver_username=gift_data.get('receiver_username', request.data.get('receiver_username')),  # From cache or request
+            transaction_id=paypal_order_id,  # Idempotency key for the post-payment tasks
+            payment_provider='paypal',
             status='processing'  # Payment confirmed, processing order
         )
 
@@ -601,115 +508,14 @@ def capture_paypal_order(request):
         receiver_username_value = gift_data.get('receiver_username', request.data.get('receiver_username'))
         _update_user_history_and_gifts(order, receiver_username_value)
         
-        # STEP 4.5: Send email notifications
-        try:
-            # Get language from request (default to 'en')
-            lang = request.GET.get('lang', 'en')
-            
-            # PayPal always uses USD
-            currency = 'USD'
-            
-            # Prepare items for email (filter out dropshipping products)
-            from ..models import WooCommerceProduct
-            email_items = []
-            dropshipping_cost = 0
-            
-            for item in items:
-                # Check if product is dropshipping (ID 48500 or contains "dropshipping" in name)
-                is_dropshipping = (
-                    item.get('woocommerce_product_id') == 48500 or
-                    'dropshipping' in item.get('product_name', '').lower()
-                )
-                
-                if is_dropshipping:
-                    # Add dropshipping cost to shipping
-                    dropshipping_cost += float(item['unit_price']) * item['quantity']
-                    logger.info(f"📦 Dropshipping product found: {item['product_name']} - Adding ${dropshipping_cost} to shipping")
-                else:
-                    # Use product name from request (frontend sends it)
-                    product_name = item.get('product_name', 'Product')
-                    # Price with margin (unit_price already includes margin from frontend)
-                    unit_price = round(float(item['unit_price']), 2)
-                    logger.info(f"📧 Adding product to email: {product_name} x{item['quantity']} @ ${unit_price}")
-                    
-                    # Format price for USD (2 decimals)
-                    formatted_price = f"{unit_price:.2f}"
-                    
-                    # Add regular product to email items (name, quantity, and price)
-                    email_items.append({
-                        'name': product_name,
-                        'quantity': item['quantity'],
-                        'price': formatted_price
-                    })
-            
-            # Calculate shipping for email (includes dropshipping cost)
-            email_shipping = round(shipping_cost + dropshipping_cost, 2)
-            
-            # Calculate subtotal (only regular products)
-            email_subtotal = round(sum(float(item['unit_price']) * item['quantity'] for item in items if not (
-                item.get('woocommerce_product_id') == 48500 or 'dropshipping' in item.get('product_name', '').lower()
-            )), 2)
-            
-            # Format amounts for USD (2 decimals)
-            email_total = round(total_amount, 2)
-            
-            # DEBUG: Log email items
-            logger.info(f"📧 [EMAIL DEBUG] Items count: {len(email_items)}")
-            logger.info(f"📧 [EMAIL DEBUG] Items: {email_items}")
-            logger.info(f"📧 [EMAIL DEBUG] Subtotal: {email_subtotal}, Shipping: {email_shipping}, Total: {email_total}")
-            
-            # Send order confirmation to purchaser
-            email_service.send_order_confirmation(
-                to_email=customer_email,
-                order_number=order.order_number,
-                total=f"{email_total:.2f}",
-                subtotal=f"{email_subtotal:.2f}",
-                shipping=f"{email_shipping:.2f}",
-                currency=currency,
-                items=email_items,
-                username=user.username,
-                lang=lang
-            )
-            logger.info(f"📧 Order confirmation email sent to {customer_email} (lang: {lang}, currency: {currency})")
-            
-            # If it's a gift, send notifications
-            if order.is_gift and receiver_username_value:
-                try:
-                    receiver_user = User.objects.get(username=receiver_username_value)
-                    
-                    # Send gift received notification to receiver
-                    email_service.send_gift_received_notification(
-                        to_email=receiver_user.email,
-                        sender_username=user.username,
-                        gift_message=order.gift_message or '',
-                        order_number=order.order_number,
-                        username=receiver_user.username,
-                        lang=lang
-                    )
-                    logger.info(f"📧 Gift received notification sent to {receiver_user.email} (lang: {lang})")
-                    
-                    # Send gift sent confirmation to sender
-                    email_service.send_gift_sent_confirmation(
-                        to_email=customer_email,
-                        receiver_username=receiver_user.username,
-                        order_number=order.order_number,
-                        username=user.username,
-                        lang=lang
-                    )
-                    logger.info(f"📧 Gift sent confirmation sent to {customer_email} (lang: {lang})")
-                    
-                except User.DoesNotExist:
-                    logger.warning(f"⚠️ Receiver user {receiver_username_value} not found for gift notifications")
-        except Exception as e:
-            logger.error(f"❌ Error sending email notifications: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
-            # Don't fail the order if email fails
-
-        # STEP 5: Send order to WooCommerce in background (non-blocking)
-        # This prevents timeout issues - WooCommerce sync can take time
-
-        # Build response first (immediate, doesn't wait for WooCommerce)
+        # STEP 5: Emails and WooCommerce sync run as Huey tasks once the transaction commits
+        # (PayPal always uses USD)
+        lang = request.GET.get('lang', 'en')
+        email_context = post_payment_service.build_email_context(items, shipping_cost, total_amount, 'USD')
+        shipping_cost_cents = int(request.data.get('shipping', 0))
+        post_payment_service.enqueue(order, lang, email_context, shipping_cost_cents, create_feed=False)
+
+        # Build response (doesn't wait for emails or WooCommerce)
         order_serializer = OrderDetailSerializer(order)
 
         response_data = {
@@ -729,22 +535,6 @@ def capture_paypal_order(request):
             }
         }
 
-        # Start WooCommerce sync in background AFTER building response
-        # This ensures the transaction is committed before the thread tries to read
-        shipping_cost_cents = int(request.data.get('shipping', 0))
-        woocommerce_thread = threading.Thread(
-            target=send_to_woocommerce_async,
-            args=(order.id, shipping_cost_cents),
-            name=f"WooCommerce-Sync-{order.order_number}"
-        )
-        woocommerce_thread.daemon = False  # Allow thread to complete even if main thread ends
-
-        logger.info(f"🔧 [DEBUG] Iniciando thread DESPUÉS de preparar respuesta...")
-        woocommerce_thread.start()
-        logger.info(f"🔧 [DEBUG] Thread iniciado! Thread name: {woocommerce_thread.name}, is_alive: {woocommerce_thread.is_alive()}")
-
-        logger.info(f"⏳ WooCommerce sync started in background for order {order.order_number}")
-
         return Response(response_data, status=status.HTTP_201_CREATED)
     
     except Exception as e:
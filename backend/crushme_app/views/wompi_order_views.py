@@ -500,7 +500,8 @@ def wompi_webhook(request):
         )
         
         # Store success status in cache for frontend polling
-        if result.status_code == 201:
+        # (200 = the confirm endpoint created the order concurrently)
+        if result.status_code in (200, 201):
             cache.set(f'wompi_payment_status_{reference}', {
                 'status': 'success',
                 'order_id': result.data.get('order_id'),
@@ -6,7 +6,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Count, Q, Prefetch
+from django.db.models import Count, F, Q, Prefetch
 import logging
 import random
 
@@ -14,18 +14,100 @@ from ..models import (
     WooCommerceProduct,
     WooCommerceCategory,
     WooCommerceProductVariation,
-    TranslatedContent
+    TranslatedContent,
+    ProductPopularity
 )
 from ..utils.translation_helpers import (
     get_products_list,
     get_product_full_data,
-    get_translated_category
+    get_product_rating,
+    get_translated_category,
+    get_translations_map
+)
+from ..utils.catalog_cache import (
+    ALL_PRODUCTS_SCOPE,
+    build_cache_key,
+    cached_catalog_response,
+    get_cached_response,
+    set_cached_response,
+    product_scopes,
+    product_list_scopes
 )
 from ..services.translation_service import get_language_from_request
+from ..services.attribute_dictionary import attribute_dictionary
+from ..services.autocomplete_index import autocomplete_index
+from ..services.facet_index import facet_index, RATING_THRESHOLDS, SORT_OPTIONS
+from ..utils.product_search import ensure_product_search_index, search_product_ids
 
 logger = logging.getLogger(__name__)
 
 
+# Productos en el endpoint de tendencias
+TRENDING_LIMIT = 8
+
+
+def _is_true(value):
+    return (value or '').lower() in ('true', '1', 'yes')
+
+
+def _product_list_cache_scopes(request, *args, **kwargs):
+    """Cached product lists are purged with the category they filter by"""
+    category_id = request.query_params.get('category_id')
+    try:
+        return product_list_scopes(int(category_id) if category_id else None)
+    except ValueError:
+        return product_list_scopes()
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def autocomplete_woocommerce_products(request):
+    """
+    Sugerencias para el buscador (typeahead): productos, categorías y atributos
+    cuyo nombre (o una de sus palabras) empieza por el texto escrito.
+    Se responde desde un índice en memoria, sin traducir ni calcular precios.
+    
+    Query params:
+    - q: Texto escrito (requerido)
+    - limit: Número de sugerencias (default: 8, máx: 20)
+    - lang: Idioma (es/en, también soporta Accept-Language header)
+    """
+    try:
+        search_query = request.query_params.get('q', '').strip()
+        
+        if not search_query:
+            return Response({
+                'error': 'Query de búsqueda requerido',
+                'message': 'Debe proporcionar el parámetro "q" con el texto a completar'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        limit = max(1, min(int(request.query_params.get('limit', 8)), 20))  # Máximo 20
+        target_lang = get_language_from_request(request)
+        
+        suggestions = autocomplete_index.suggest(search_query, target_lang, limit=limit)
+        
+        return Response({
+            'success': True,
+            'data': suggestions,
+            'count': len(suggestions),
+            'query': search_query,
+            'language': target_lang,
+            'source': 'memory_index'
+        }, status=status.HTTP_200_OK)
+        
+    except ValueError:
+        return Response({
+            'error': 'Parámetros inválidos',
+            'details': 'El parámetro limit debe ser un número entero'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"❌ Error en autocompletado: {str(e)}")
+        return Response({
+            'error': 'Error interno del servidor',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search_woocommerce_products(request):
@@ -63,118 +145,22 @@ def search_woocommerce_products(request):
         
         logger.info(f"🔍 Búsqueda de productos: '{search_query}' (lang={target_lang}, currency={target_currency}, page={page})")
         
-        # Normalizar búsqueda: quitar acentos y convertir a minúsculas
-        from django.db.models import Q
-        import unicodedata
-        
-        def normalize_text(text):
-            """Normaliza texto: quita acentos, convierte a minúsculas"""
-            text = text.lower()
-            # Quitar acentos
-            text = ''.join(
-                c for c in unicodedata.normalize('NFD', text)
-                if unicodedata.category(c) != 'Mn'
-            )
-            return text
+        # Índice de búsqueda: wc_ids ordenados por relevancia (una consulta indexada)
+        ensure_product_search_index()
+        ranked_ids = search_product_ids(search_query, target_lang)
         
-        def get_search_variations(word):
-            """Genera variaciones de una palabra (singular/plural)"""
-            variations = [word]
-            
-            # Si termina en 's', quitar la 's' (plural -> singular)
-            if word.endswith('s') and len(word) > 3:
-                variations.append(word[:-1])
-            
-            # Si termina en 'es', quitar 'es' (plural -> singular)
-            if word.endswith('es') and len(word) > 4:
-                variations.append(word[:-2])
-            
-            # Si no termina en 's', agregar 's' (singular -> plural)
-            if not word.endswith('s'):
-                variations.append(word + 's')
-                variations.append(word + 'es')
-            
-            return variations
-        
-        # Normalizar query
-        normalized_query = normalize_text(search_query)
-        
-        # Dividir en palabras y generar variaciones
-        search_words = []
-        for word in normalized_query.split():
-            search_words.extend(get_search_variations(word))
-        
-        # Buscar según idioma
-        if target_lang == 'es':
-            # Buscar en español (nombre y descripción corta)
-            # Incluir coincidencias EXACTAS del nombre/descripción
-            q_objects = Q(name__iexact=search_query) | Q(short_description__iexact=search_query)
-            # Crear query que busque cada palabra en nombre o descripción (coincidencias parciales)
-            for word in search_words:
-                q_objects |= Q(name__icontains=word) | Q(short_description__icontains=word)
-            
-            # También buscar la frase completa como coincidencia parcial
-            q_objects |= Q(name__icontains=search_query) | Q(short_description__icontains=search_query)
-            
-            queryset = WooCommerceProduct.objects.filter(
-                status='publish'
-            ).filter(q_objects).prefetch_related('categories', 'images').select_related().distinct()
-            
-            logger.info(f"📝 Búsqueda en español: {queryset.count()} resultados totales")
-            
-        else:
-            # Buscar en inglés (traducciones de nombre y descripción)
-            # Incluir coincidencias EXACTAS en el texto traducido
-            q_objects = Q(translated_text__iexact=search_query)
-            # Crear query para búsqueda por palabras en traducciones (coincidencias parciales)
-            for word in search_words:
-                q_objects |= Q(translated_text__icontains=word)
-            
-            # También buscar la frase completa como coincidencia parcial
-            q_objects |= Q(translated_text__icontains=search_query)
-            
-            # Buscar en nombres traducidos
-            translated_names = TranslatedContent.objects.filter(
-                content_type=TranslatedContent.CONTENT_TYPE_PRODUCT_NAME,
-                target_language=target_lang
-            ).filter(q_objects).values_list('object_id', flat=True)
-            
-            # Buscar en descripciones cortas traducidas
-            translated_descriptions = TranslatedContent.objects.filter(
-                content_type=TranslatedContent.CONTENT_TYPE_PRODUCT_SHORT_DESC,
-                target_language=target_lang
-            ).filter(q_objects).values_list('object_id', flat=True)
-            
-            # Combinar IDs de ambas búsquedas
-            translated_products = set(list(translated_names) + list(translated_descriptions))
-            
-            # Si no hay traducciones, buscar en el nombre original como fallback
-            if not translated_products:
-                logger.info(f"⚠️ No se encontraron traducciones, buscando en nombres originales")
-                # Incluir coincidencias EXACTAS en el nombre original
-                q_objects_fallback = Q(name__iexact=search_query)
-                # Y coincidencias parciales por palabra y por frase completa
-                for word in search_words:
-                    q_objects_fallback |= Q(name__icontains=word)
-                q_objects_fallback |= Q(name__icontains=search_query)
-                
-                queryset = WooCommerceProduct.objects.filter(
-                    status='publish'
-                ).filter(q_objects_fallback).prefetch_related('categories', 'images').select_related()
-            else:
-                # Obtener productos por IDs encontrados
-                queryset = WooCommerceProduct.objects.filter(
-                    wc_id__in=list(translated_products),
-                    status='publish'
-                ).prefetch_related('categories', 'images').select_related()
-            
-            logger.info(f"📝 Búsqueda en inglés: {queryset.count()} resultados totales")
-        
-        # Aplicar paginación
-        total_count = queryset.count()
+        # Aplicar paginación sobre el ranking e hidratar solo la página
+        total_count = len(ranked_ids)
         start = (page - 1) * per_page
         end = start + per_page
-        products_page = queryset[start:end]
+        page_ids = ranked_ids[start:end]
+        
+        products_by_id = WooCommerceProduct.objects.filter(
+            wc_id__in=page_ids, status='publish'
+        ).in_bulk(field_name='wc_id')
+        products_page = [products_by_id[wc_id] for wc_id in page_ids if wc_id in products_by_id]
+        
+        logger.info(f"📝 Búsqueda ({target_lang}): {total_count} resultados totales")
         
         # Convertir a lista con traducciones y conversión de moneda
         products_data = get_products_list(
@@ -223,6 +209,7 @@ def search_woocommerce_products(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_catalog_response('products', scopes=_product_list_cache_scopes)
 def get_woocommerce_products_local(request):
     """
     Obtener productos desde la base de datos local (OPTIMIZADO).
@@ -232,6 +219,12 @@ def get_woocommerce_products_local(request):
     - per_page: Productos por página (máx 100, default 20)
     - page: Número de página (default 1)
     - lang: Idioma (es/en, también soporta Accept-Language header)
+    - min_price / max_price: Rango de precio final en COP (opcional)
+    - on_sale: true para solo productos en oferta (opcional)
+    - in_stock: true para solo productos con stock (opcional)
+    - min_rating: Rating promedio mínimo 1-4 (opcional)
+    - attr_<atributo>: Valores del atributo separados por coma, ej. attr_color=Rojo,Azul (opcional)
+    - facets: false para omitir los conteos de facetas (default true)
     - sort_by: Ordenamiento (opcional):
         * 'popular' - Más vendidos (por número de compras)
         * 'price_asc' - Precio menor a mayor
@@ -244,79 +237,74 @@ def get_woocommerce_products_local(request):
     - Traducciones pre-calculadas
     - Precios con margen aplicado
     - Datos locales (ultra rápido)
+    - Conteos por faceta (precio, oferta, stock, rating, atributos) sobre el conjunto filtrado
     """
     try:
-        from django.db.models import Count, Avg, Q
-        from ..models.order import OrderItem
-        from ..models.review import Review
-        
         # Obtener parámetros
         category_id = request.query_params.get('category_id')
         per_page = min(int(request.query_params.get('per_page', 20)), 100)
         page = int(request.query_params.get('page', 1))
         sort_by = request.query_params.get('sort_by', '').lower()
+        min_price = request.query_params.get('min_price')
+        max_price = request.query_params.get('max_price')
+        min_rating = request.query_params.get('min_rating')
+        on_sale = _is_true(request.query_params.get('on_sale'))
+        in_stock = _is_true(request.query_params.get('in_stock'))
+        include_facets = request.query_params.get('facets', 'true').lower() not in ('false', '0', 'no')
         target_lang = get_language_from_request(request)
+        target_currency = getattr(request, 'currency', 'COP')
         
-        # Base queryset: solo productos publicados
-        queryset = WooCommerceProduct.objects.filter(
-            status='publish'
-        ).prefetch_related('categories', 'images').select_related()
-        
-        # Filtrar por categoría si se especifica
-        if category_id:
-            category_id = int(category_id)
-            queryset = queryset.filter(categories__wc_id=category_id)
-        
-        # Aplicar ordenamiento según el parámetro sort_by
-        if sort_by == 'popular':
-            # Ordenar por número de compras (más vendidos primero)
-            queryset = queryset.annotate(
-                purchase_count=Count('wc_id', filter=Q(
-                    wc_id__in=OrderItem.objects.values_list('woocommerce_product_id', flat=True)
-                ))
-            ).order_by('-purchase_count', '-wc_id')
-            
-        elif sort_by == 'price_asc':
-            # Precio menor a mayor
-            queryset = queryset.order_by('price')
-            
-        elif sort_by == 'price_desc':
-            # Precio mayor a menor
-            queryset = queryset.order_by('-price')
-            
-        elif sort_by == 'rating':
-            # Ordenar por rating promedio (mejor calificados primero)
-            # Subconsulta para obtener el rating promedio de cada producto
-            from django.db.models import Subquery, OuterRef
-            
-            # Obtener rating promedio para cada producto
-            rating_subquery = Review.objects.filter(
-                woocommerce_product_id=OuterRef('wc_id'),
-                is_active=True
-            ).values('woocommerce_product_id').annotate(
-                avg_rating=Avg('rating')
-            ).values('avg_rating')
-            
-            queryset = queryset.annotate(
-                avg_rating=Subquery(rating_subquery)
-            ).order_by('-avg_rating', '-wc_id')
-            
-        elif sort_by == 'newest':
-            # Más recientes primero (por fecha de creación en WooCommerce)
-            queryset = queryset.order_by('-date_created_wc')
+        category_id = int(category_id) if category_id else None
+        # Rango de precio final (con margen, materializado en la DB)
+        min_price = float(min_price) if min_price else None
+        max_price = float(max_price) if max_price else None
+        if min_rating:
+            min_rating = int(min_rating)
+            if min_rating not in RATING_THRESHOLDS:
+                raise ValueError(f"min_rating debe ser uno de {sorted(RATING_THRESHOLDS)}")
+        else:
+            min_rating = None
+        
+        # Atributos de variación: attr_color=Rojo,Azul
+        attributes = {}
+        for name in request.query_params:
+            if name.startswith('attr_'):
+                values = [
+                    value.strip()
+                    for raw in request.query_params.getlist(name)
+                    for value in raw.split(',') if value.strip()
+                ]
+                if values:
+                    attributes[name[len('attr_'):]] = values
         
         # Si no hay sort_by o es inválido, usar orden por defecto (ID descendente)
-        else:
-            queryset = queryset.order_by('-wc_id')
+        if sort_by not in SORT_OPTIONS:
+            sort_by = 'default'
         
-        # Paginación
-        total_count = queryset.count()
-        start = (page - 1) * per_page
-        end = start + per_page
-        products_page = queryset[start:end]
+        # Filtros, orden y facetas desde el índice en memoria; la DB solo hidrata la página
+        result = facet_index.query(
+            filters={
+                'category_id': category_id,
+                'min_price': min_price,
+                'max_price': max_price,
+                'on_sale': on_sale,
+                'in_stock': in_stock,
+                'min_rating': min_rating,
+                'attributes': attributes
+            },
+            sort_by=sort_by,
+            offset=(page - 1) * per_page,
+            limit=per_page,
+            target_language=target_lang,
+            include_facets=include_facets
+        )
         
-        # Get currency from request (set by CurrencyMiddleware)
-        target_currency = getattr(request, 'currency', 'COP')
+        # Paginación
+        total_count = result['total']
+        products_by_id = WooCommerceProduct.objects.filter(
+            wc_id__in=result['wc_ids'], status='publish'
+        ).in_bulk(field_name='wc_id')
+        products_page = [products_by_id[wc_id] for wc_id in result['wc_ids'] if wc_id in products_by_id]
         
         # Convertir a lista optimizada con traducciones y conversión de moneda
         products_data = get_products_list(
@@ -343,9 +331,16 @@ def get_woocommerce_products_local(request):
             },
             'filters': {
                 'category_id': category_id,
+                'min_price': min_price,
+                'max_price': max_price,
+                'on_sale': on_sale,
+                'in_stock': in_stock,
+                'min_rating': min_rating,
+                'attributes': attributes,
                 'language': target_lang,
-                'sort_by': sort_by if sort_by else 'default'
+                'sort_by': sort_by
             },
+            'facets': result['facets'],
             'source': 'local_db'  # Indicador de que viene de DB local
         }, status=status.HTTP_200_OK)
         
@@ -405,9 +400,9 @@ def get_woocommerce_product_detail_local(request, product_id):
                 wc_product = wc_result.get('data', {})
                 
                 # Construir respuesta básica desde datos de WooCommerce
-                # Aplicar margen si existe (usar default margin)
-                from ..models import DefaultPriceMargin
-                default_margin = DefaultPriceMargin.get_active()
+                # Aplicar margen si existe (usar default margin del índice en memoria)
+                from ..utils.margin_index import get_margin_index
+                default_margin = get_margin_index().default_margin
                 
                 base_price = float(wc_product.get('price', 0))
                 if default_margin and base_price > 0:
@@ -462,12 +457,20 @@ def get_woocommerce_product_detail_local(request, product_id):
                 }, status=status.HTTP_404_NOT_FOUND)
         
         # Obtener producto completo con traducciones y conversión de moneda
-        product_data = get_product_full_data(
-            product=product_id,
-            target_language=target_lang,
-            include_stock=False,  # Siempre false aquí, lo consultamos aparte
-            target_currency=target_currency
-        )
+        # (cacheado; el stock en tiempo real se superpone después)
+        cache_key = build_cache_key('product_detail', product_scopes(product_id), {
+            'lang': target_lang,
+            'currency': target_currency,
+        })
+        product_data = get_cached_response(cache_key)
+        if product_data is None:
+            product_data = get_product_full_data(
+                product=product_id,
+                target_language=target_lang,
+                include_stock=False,  # Siempre false aquí, lo consultamos aparte
+                target_currency=target_currency
+            )
+            set_cached_response(cache_key, product_data)
         
         # Si se requiere stock en tiempo real, consultarlo de WooCommerce
         if real_time_stock:
@@ -661,18 +664,34 @@ def get_product_stock_local(request, product_id):
 @permission_classes([AllowAny])
 def get_trending_products_local(request):
     """
-    Obtener productos en tendencia (top 8 con mejor rating y más reviews).
+    Obtener productos en tendencia (top 8 por popularidad: ventas recientes,
+    ventas totales, favoritos y wishlists). Si no hay suficientes, se completa
+    con los de mejor rating y más reviews.
     Usa base de datos local.
     """
     try:
         target_lang = get_language_from_request(request)
         target_currency = getattr(request, 'currency', 'COP')
         
-        # Obtener productos publicados ordenados por rating y reviews
-        queryset = WooCommerceProduct.objects.filter(
-            status='publish',
-            stock_status='instock'  # Solo con stock
-        ).order_by('-rating_count', '-average_rating')[:8]
+        # Solo publicados y con stock
+        available = WooCommerceProduct.objects.filter(status='publish', stock_status='instock')
+        
+        # Ranking precalculado (ProductPopularity, índice por score)
+        trending_ids = list(
+            ProductPopularity.objects.filter(
+                score__gt=0,
+                wc_id__in=available.values('wc_id')
+            ).order_by('-score', '-wc_id').values_list('wc_id', flat=True)[:TRENDING_LIMIT]
+        )
+        products_by_id = available.filter(wc_id__in=trending_ids).in_bulk(field_name='wc_id')
+        queryset = [products_by_id[wc_id] for wc_id in trending_ids if wc_id in products_by_id]
+        
+        # Completar con productos ordenados por rating y reviews
+        if len(queryset) < TRENDING_LIMIT:
+            queryset += list(
+                available.exclude(wc_id__in=trending_ids)
+                .order_by('-rating_count', '-average_rating')[:TRENDING_LIMIT - len(queryset)]
+            )
         
         products_data = get_products_list(
             queryset=queryset,
@@ -734,13 +753,10 @@ def get_product_variations_local(request, product_id):
         end = start + per_page
         variations = variations_qs[start:end]
         
-        # Formatear variaciones
+        # Formatear variaciones (atributos traducidos con el diccionario precalculado)
+        attribute_terms = attribute_dictionary.get_terms(target_lang)
         variations_data = []
         for var in variations:
-            # Aplicar margen de precio
-            from ..utils.translation_helpers import calculate_product_price
-            prices = calculate_product_price(product)  # Usar precios del producto padre
-            
             variations_data.append({
                 'id': var.wc_id,
                 'product_id': var.wc_product_id,
@@ -753,6 +769,9 @@ def get_product_variations_local(request, product_id):
                 'stock_quantity': var.stock_quantity,
                 'manage_stock': var.manage_stock,
                 'attributes': var.attributes,
+                'attributes_translated': attribute_dictionary.translate_attributes(
+                    var.attributes, target_lang, attribute_terms
+                ),
                 'image': var.image_url if var.image_url else None,
                 'weight': var.weight,
                 'dimensions': {
@@ -823,9 +842,15 @@ def get_product_variation_detail_local(request, product_id, variation_id):
                 'variation_id': variation_id
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Obtener información traducida del producto padre
+        # Obtener información traducida del producto padre (y sus categorías) en una sola consulta
         from ..utils.translation_helpers import get_translated_product, calculate_product_price
-        product_translated = get_translated_product(product, target_lang)
+        product_categories = list(product.categories.all())
+        translations = get_translations_map(
+            products=[product],
+            categories=product_categories,
+            target_language=target_lang
+        )
+        product_translated = get_translated_product(product, target_lang, translations)
         
         # Get currency from request
         target_currency = getattr(request, 'currency', 'COP')
@@ -837,9 +862,8 @@ def get_product_variation_detail_local(request, product_id, variation_id):
         
         # Obtener categorías del producto padre (traducidas)
         categories = []
-        for cat in product.categories.all():
-            from ..utils.translation_helpers import get_translated_category
-            cat_translated = get_translated_category(cat, target_lang)
+        for cat in product_categories:
+            cat_translated = get_translated_category(cat, target_lang, translations)
             categories.append({
                 'id': cat.wc_id,
                 'name': cat_translated['name'],
@@ -877,6 +901,7 @@ def get_product_variation_detail_local(request, product_id, variation_id):
         converted_price = CurrencyConverter.convert_price(variation.final_price, target_currency) if variation.final_price else None
         converted_regular_price = CurrencyConverter.convert_price(variation.final_regular_price, target_currency) if variation.final_regular_price else None
         converted_sale_price = CurrencyConverter.convert_price(variation.final_sale_price, target_currency) if variation.final_sale_price else None
+        average_rating, rating_count = get_product_rating(product)
         
         variation_data = {
             'id': variation.wc_id,
@@ -909,8 +934,8 @@ def get_product_variation_detail_local(request, product_id, variation_id):
                 'width': variation.width,
                 'height': variation.height
             },
-            'average_rating': float(product.average_rating),
-            'rating_count': product.rating_count,
+            'average_rating': average_rating,
+            'rating_count': rating_count,
             'featured': product.featured
         }
         
@@ -957,6 +982,7 @@ def get_product_variation_detail_local(request, product_id, variation_id):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_catalog_response('categories')
 def get_woocommerce_categories_local(request):
     """
     Obtener categorías desde la base de datos local con traducciones.
@@ -988,12 +1014,13 @@ def get_woocommerce_categories_local(request):
         total_count = queryset.count()
         start = (page - 1) * per_page
         end = start + per_page
-        categories_page = queryset[start:end]
+        categories_page = list(queryset[start:end])
+        translations = get_translations_map(categories=categories_page, target_language=target_lang)
         
         # Formatear categorías con traducciones
         categories_data = []
         for category in categories_page:
-            cat_translated = get_translated_category(category, target_lang)
+            cat_translated = get_translated_category(category, target_lang, translations)
             
             categories_data.append({
                 'id': category.wc_id,
@@ -1030,6 +1057,7 @@ def get_woocommerce_categories_local(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_catalog_response('stats', scopes=lambda request, *args, **kwargs: [ALL_PRODUCTS_SCOPE])
 def get_woocommerce_stats_local(request):
     """
     Obtener estadísticas globales de productos y categorías.
@@ -1051,13 +1079,14 @@ def get_woocommerce_stats_local(request):
         ).count()
         
         # Top categorías por cantidad de productos
-        top_categories = WooCommerceCategory.objects.filter(
+        top_categories = list(WooCommerceCategory.objects.filter(
             product_count__gt=0
-        ).order_by('-product_count')[:10]
+        ).order_by('-product_count')[:10])
+        translations = get_translations_map(categories=top_categories, target_language=target_lang)
         
         top_categories_data = []
         for cat in top_categories:
-            cat_translated = get_translated_category(cat, target_lang)
+            cat_translated = get_translated_category(cat, target_lang, translations)
             top_categories_data.append({
                 'id': cat.wc_id,
                 'name': cat_translated['name'],
@@ -1088,6 +1117,38 @@ def get_woocommerce_stats_local(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_catalog_response('attribute_glossary')
+def get_attribute_glossary_local(request):
+    """
+    Glosario de atributos de variaciones (nombres y opciones) para el idioma pedido.
+    El frontend lo descarga una vez y traduce los atributos localmente.
+    
+    Query params:
+        lang: Idioma (es/en)
+    """
+    try:
+        target_lang = get_language_from_request(request)
+        terms = attribute_dictionary.get_terms(target_lang)
+        
+        return Response({
+            'success': True,
+            'data': terms,
+            'count': len(terms),
+            'language': target_lang,
+            'source': 'local_db'
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error getting attribute glossary: {str(e)}")
+        return Response({
+            'error': 'Error interno del servidor',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cached_catalog_response('organized_categories')
 def get_organized_categories_local(request):
     """
     Obtener categorías organizadas por temas desde la base de datos local.
@@ -1104,8 +1165,9 @@ def get_organized_categories_local(request):
     try:
         target_lang = get_language_from_request(request)
         
-        # Obtener todas las categorías de la DB local
-        all_categories = WooCommerceCategory.objects.all()
+        # Obtener todas las categorías de la DB local (y sus traducciones en una sola consulta)
+        all_categories = list(WooCommerceCategory.objects.all())
+        translations = get_translations_map(categories=all_categories, target_language=target_lang)
         
         # Definir las categorías por tema
         themes = {
@@ -1183,13 +1245,13 @@ def get_organized_categories_local(request):
                     if cat.product_count == 0:
                         continue
                     
-                    cat_translated = get_translated_category(cat, target_lang)
+                    cat_translated = get_translated_category(cat, target_lang, translations)
                     
                     # Buscar subcategorías (solo las que tienen productos)
                     subcategories = []
                     for sub in all_categories:
                         if sub.wc_parent_id == cat_id and sub.product_count > 0:
-                            sub_translated = get_translated_category(sub, target_lang)
+                            sub_translated = get_translated_category(sub, target_lang, translations)
                             subcategories.append({
                                 'id': sub.wc_id,
                                 'name': sub_translated['name'],
@@ -1241,7 +1303,7 @@ def get_organized_categories_local(request):
             'success': True,
             'message': 'Categorías organizadas exitosamente',
             'data': result,
-            'total_categories': all_categories.count(),
+            'total_categories': len(all_categories),
             'language': target_lang,
             'source': 'local_db'
         }, status=status.HTTP_200_OK)
@@ -1257,6 +1319,7 @@ def get_organized_categories_local(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_catalog_response('category_tree')
 def get_category_tree_local(request):
     """
     Obtener árbol completo de categorías con jerarquía desde la base de datos local.
@@ -1265,12 +1328,13 @@ def get_category_tree_local(request):
         target_lang = get_language_from_request(request)
         
         # Obtener todas las categorías
-        all_categories = WooCommerceCategory.objects.all().order_by('display_order', 'name')
+        all_categories = list(WooCommerceCategory.objects.all().order_by('display_order', 'name'))
+        translations = get_translations_map(categories=all_categories, target_language=target_lang)
         
         # Crear mapa de categorías
         category_map = {}
         for cat in all_categories:
-            cat_translated = get_translated_category(cat, target_lang)
+            cat_translated = get_translated_category(cat, target_lang, translations)
             category_map[cat.wc_id] = {
                 'id': cat.wc_id,
                 'name': cat_translated['name'],
@@ -1294,7 +1358,7 @@ def get_category_tree_local(request):
         return Response({
             'success': True,
             'data': tree,
-            'total': all_categories.count(),
+            'total': len(all_categories),
             'language': target_lang,
             'source': 'local_db'
         }, status=status.HTTP_200_OK)
@@ -1335,6 +1399,18 @@ def get_random_featured_categories_local(request):
         
         featured_categories = []
         
+        # Categorías de los temas y sus traducciones (una sola consulta cada una)
+        theme_categories = {
+            cat.wc_id: cat for cat in WooCommerceCategory.objects.filter(
+                wc_id__in=[theme['category_id'] for theme in main_themes]
+            )
+        }
+        translations = get_translations_map(
+            categories=theme_categories.values(),
+            target_language=target_lang,
+            category_types=(TranslatedContent.CONTENT_TYPE_CATEGORY_NAME,)
+        )
+        
         # Intentar obtener 4 categorías con imagen
         for theme in shuffled_themes:
             # Si ya tenemos 4, detener
@@ -1359,9 +1435,9 @@ def get_random_featured_categories_local(request):
                 if target_lang != 'es':
                     try:
                         # Intentar obtener traducción del caché
-                        category = WooCommerceCategory.objects.filter(wc_id=theme['category_id']).first()
+                        category = theme_categories.get(theme['category_id'])
                         if category:
-                            cat_translated = get_translated_category(category, target_lang)
+                            cat_translated = get_translated_category(category, target_lang, translations)
                             theme_name = cat_translated['name']
                     except:
                         pass
@@ -0,0 +1,94 @@
+"""
+WooCommerce Webhook Views
+Receives signed product webhooks and queues the local catalog update on Huey
+"""
+from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework import status
+from django.conf import settings
+import base64
+import hashlib
+import hmac
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Topics handled by the receiver (configured in WooCommerce > Settings > Advanced > Webhooks)
+PRODUCT_WEBHOOK_TOPICS = {
+    'product.created',
+    'product.updated',
+    'product.deleted',
+    'product.restored',
+}
+
+
+def verify_woocommerce_signature(raw_body, signature):
+    """
+    Verify X-WC-Webhook-Signature: base64(HMAC-SHA256(body, secret))
+    """
+    secret = getattr(settings, 'WOOCOMMERCE_WEBHOOK_SECRET', '')
+    if not secret or not signature:
+        return False
+
+    expected = base64.b64encode(
+        hmac.new(secret.encode('utf-8'), raw_body, hashlib.sha256).digest()
+    ).decode('ascii')
+    return hmac.compare_digest(expected, signature)
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def woocommerce_product_webhook(request):
+    """
+    Webhook endpoint for WooCommerce product events (PUBLIC ENDPOINT)
+
+    Handles product.created / product.updated / product.deleted / product.restored.
+    The signature is verified and the sync + cache purge is queued on Huey,
+    so WooCommerce gets an immediate response.
+    """
+    # Leer el cuerpo crudo antes que request.data (necesario para la firma)
+    raw_body = request.body
+    topic = request.headers.get('X-WC-Webhook-Topic', '')
+
+    # WooCommerce envía un "ping" sin firma al crear el webhook (webhook_id=N)
+    if not topic and raw_body.startswith(b'webhook_id='):
+        logger.info(f"📬 [WC WEBHOOK] Ping received: {raw_body.decode('utf-8', 'ignore')}")
+        return Response({
+            'success': True,
+            'message': 'Ping received'
+        }, status=status.HTTP_200_OK)
+
+    if not verify_woocommerce_signature(raw_body, request.headers.get('X-WC-Webhook-Signature', '')):
+        logger.warning(f"❌ [WC WEBHOOK] Invalid signature (topic: {topic})")
+        return Response({
+            'error': 'Invalid signature'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    if topic not in PRODUCT_WEBHOOK_TOPICS:
+        logger.info(f"⏭️ [WC WEBHOOK] Ignoring topic: {topic}")
+        return Response({
+            'success': True,
+            'message': 'Event received but not processed'
+        }, status=status.HTTP_200_OK)
+
+    try:
+        payload = json.loads(raw_body)
+        product_id = int(payload['id'])
+    except (ValueError, KeyError, TypeError):
+        return Response({
+            'error': 'Invalid payload'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    from ..tasks import process_product_webhook
+    process_product_webhook(topic, product_id)
+
+    logger.info(f"📬 [WC WEBHOOK] Queued {topic} for product {product_id}")
+    return Response({
+        'success': True,
+        'message': 'Event queued',
+        'topic': topic,
+        'product_id': product_id
+    }, status=status.HTTP_202_ACCEPTED)
@@ -186,6 +186,11 @@ USE_I18N = True
 
 USE_TZ = True
 
+# Offline translation models (argostranslate): loaded by each gunicorn worker
+# before it serves requests (see gunicorn_config.py)
+TRANSLATION_WARMUP = config('TRANSLATION_WARMUP', default=True, cast=bool)
+TRANSLATION_WARMUP_PAIRS = [('es', 'en'), ('en', 'es')]
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -253,6 +258,10 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = f"CrushMe Support <{config('EMAIL_HOST_USER', default='support@crushme.com.co')}>"
 SERVER_EMAIL = config('EMAIL_HOST_USER', default='support@crushme.com.co')
 
+# Bulk email dispatch (send_bulk_email): max emails per second and emails per SMTP connection
+BULK_EMAIL_RATE = config('BULK_EMAIL_RATE', default=5, cast=float)
+BULK_EMAIL_RECONNECT_EVERY = config('BULK_EMAIL_RECONNECT_EVERY', default=100, cast=int)
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
@@ -320,6 +329,10 @@ THUMBNAIL_ALIASES = {
 WOOCOMMERCE_CONSUMER_KEY = config('WOOCOMMERCE_CONSUMER_KEY', default='')
 WOOCOMMERCE_CONSUMER_SECRET = config('WOOCOMMERCE_CONSUMER_SECRET', default='')
 WOOCOMMERCE_API_URL = 'https://distrisexcolombia.com/wp-json/wc/v3'
+# Parallel page downloads during catalog sync (pooled keep-alive connections)
+WOOCOMMERCE_MAX_CONCURRENCY = config('WOOCOMMERCE_MAX_CONCURRENCY', default=8, cast=int)
+# Secret configured on the WooCommerce product webhooks (X-WC-Webhook-Signature)
+WOOCOMMERCE_WEBHOOK_SECRET = config('WOOCOMMERCE_WEBHOOK_SECRET', default='')
 
 PAYPAL_CLIENT_ID = config('PAYPAL_CLIENT_ID', default='')
 PAYPAL_CLIENT_SECRET = config('PAYPAL_CLIENT_SECRET', default='')
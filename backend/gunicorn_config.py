@@ -62,6 +62,21 @@ def on_starting(server):
     """Called just before the master process is initialized."""
     print("🚀 Gunicorn is starting...")
 
+def warm_up_models():
+    """
+    Pre-carga los modelos de traducción en cada worker, antes de que atienda
+    requests, así el primer request después de un deploy o un reciclaje por
+    max_requests no paga la carga.
+    Nunca en el master: los hilos de CTranslate2 no sobreviven al fork() y el
+    primer translate_batch del worker se quedaría colgado.
+    Desactivar con TRANSLATION_WARMUP=False.
+    """
+    try:
+        from crushme_app.services.translation_service import warm_up_translation_models
+        warm_up_translation_models()
+    except Exception as e:
+        print(f"⚠️ Translation model warm-up failed: {e}")
+
 def on_reload(server):
     """Called to recycle workers during a reload via SIGHUP."""
     print("🔄 Gunicorn is reloading...")
@@ -84,6 +99,10 @@ def post_fork(server, worker):
     """Called just after a worker has been forked."""
     print(f"👷 Worker {worker.pid} spawned")
 
+def post_worker_init(worker):
+    """Called just after a worker has initialized the application."""
+    warm_up_models()
+
 def worker_exit(server, worker):
     """Called just after a worker has been exited."""
     print(f"💀 Worker {worker.pid} exited")